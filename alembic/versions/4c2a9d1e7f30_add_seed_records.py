@@ -0,0 +1,33 @@
+"""Add seed_records table
+
+Revision ID: 4c2a9d1e7f30
+Revises: b3f13893f3a7
+Create Date: 2026-10-19 10:12:41.318204
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4c2a9d1e7f30'
+down_revision: Union[str, None] = 'b3f13893f3a7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Content hashes of seed records, used by incremental seed sync
+    op.create_table(
+        'seed_records',
+        sa.Column('kind', sa.String(), nullable=False),
+        sa.Column('name', sa.String(), nullable=False),
+        sa.Column('content_hash', sa.String(length=64), nullable=False),
+        sa.PrimaryKeyConstraint('kind', 'name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('seed_records')
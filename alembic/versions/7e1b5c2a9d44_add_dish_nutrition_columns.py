@@ -0,0 +1,76 @@
+"""Add precomputed nutrition columns to dishes
+
+Revision ID: 7e1b5c2a9d44
+Revises: 4c2a9d1e7f30
+Create Date: 2026-10-19 14:03:27.511920
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7e1b5c2a9d44'
+down_revision: Union[str, None] = '4c2a9d1e7f30'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TOTAL_COLUMNS = ('weight_g', 'energy_kcal', 'protein_g', 'fat_g', 'carbohydrates_g')
+DENSITY_COLUMNS = ('energy_kcal_per_100g', 'protein_per_100g', 'fat_per_100g', 'carbohydrates_per_100g')
+INDEXED_COLUMNS = TOTAL_COLUMNS[1:] + DENSITY_COLUMNS
+
+
+def _round(expression: str) -> str:
+    # ROUND(x, n) needs a numeric argument on PostgreSQL
+    return f"ROUND(CAST({expression} AS NUMERIC), 2)"
+
+
+def _macro_sum(column: str) -> str:
+    return (
+        f"COALESCE((SELECT SUM(di.amount * i.{column}) / 100 FROM dish_ingredients di "
+        f"JOIN ingredients i ON i.id = di.ingredient_id WHERE di.dish_id = dishes.id), 0)"
+    )
+
+
+def _density(column: str) -> str:
+    return f"CASE WHEN weight_g > 0 THEN {_round(f'{column} * 100 / weight_g')} ELSE 0 END"
+
+
+def upgrade() -> None:
+    for column in TOTAL_COLUMNS + DENSITY_COLUMNS:
+        op.add_column('dishes', sa.Column(column, sa.Float(), nullable=False, server_default='0'))
+    for column in INDEXED_COLUMNS:
+        op.create_index(op.f(f'ix_dishes_{column}'), 'dishes', [column], unique=False)
+
+    # Backfill from existing compositions
+    op.execute(
+        "UPDATE dishes SET "
+        "weight_g = COALESCE((SELECT SUM(di.amount) FROM dish_ingredients di WHERE di.dish_id = dishes.id), 0), "
+        f"protein_g = {_macro_sum('protein_g')}, "
+        f"fat_g = {_macro_sum('fat_g')}, "
+        f"carbohydrates_g = {_macro_sum('carbohydrates_g')}"
+    )
+    op.execute(
+        "UPDATE dishes SET "
+        f"energy_kcal = {_round('protein_g * 4 + fat_g * 9 + carbohydrates_g * 4')}, "
+        f"weight_g = {_round('weight_g')}, "
+        f"protein_g = {_round('protein_g')}, "
+        f"fat_g = {_round('fat_g')}, "
+        f"carbohydrates_g = {_round('carbohydrates_g')}"
+    )
+    op.execute(
+        "UPDATE dishes SET "
+        f"energy_kcal_per_100g = {_density('energy_kcal')}, "
+        f"protein_per_100g = {_density('protein_g')}, "
+        f"fat_per_100g = {_density('fat_g')}, "
+        f"carbohydrates_per_100g = {_density('carbohydrates_g')}"
+    )
+
+
+def downgrade() -> None:
+    for column in reversed(INDEXED_COLUMNS):
+        op.drop_index(op.f(f'ix_dishes_{column}'), table_name='dishes')
+    for column in reversed(TOTAL_COLUMNS + DENSITY_COLUMNS):
+        op.drop_column('dishes', column)
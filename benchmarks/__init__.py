@@ -0,0 +1,6 @@
+"""
+Performance benchmarks for the menu application.
+
+Each benchmark module can be run with `python -m benchmarks.<name>` and
+prints its results as JSON.
+"""
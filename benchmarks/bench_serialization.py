@@ -0,0 +1,159 @@
+"""
+Serialization benchmark: standard FastAPI path vs the orjson fast path.
+
+Measures encoding of `/api/dishes` and `/api/ingredients` payloads and
+decoding of `MenuProcessRequest` bodies at several row counts.
+
+Usage:
+    python -m benchmarks.bench_serialization [--rows 100 10000 100000] [--output FILE]
+"""
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, List
+
+from pydantic import TypeAdapter
+
+from src.api import serialization
+from src.api.schemas import (
+    DishResponse,
+    IngredientResponse,
+    MenuProcessRequest,
+    NutritionCreate,
+)
+
+DEFAULT_ROWS = [100, 10_000, 100_000]
+
+
+def _best_of(func: Callable[[], object], repeat: int) -> float:
+    """Return the best wall time of `repeat` runs in milliseconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return round(best * 1000, 3)
+
+
+def _stdlib_dumps(content) -> bytes:
+    """Encode like starlette's JSONResponse."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def make_dish_rows(count: int) -> List[Dict]:
+    """Build dish rows shaped like NutritionService output."""
+    return [
+        {
+            "id": i,
+            "name": f"Блюдо №{i}",
+            "weight_g": 350.0 + i % 100,
+            "energy_kcal": round(420.5 + i % 37, 2),
+            "protein_g": round(25.3 + i % 11, 2),
+            "fat_g": round(12.1 + i % 7, 2),
+            "carbohydrates_g": round(48.9 + i % 13, 2),
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+def make_ingredient_rows(count: int) -> List[Dict]:
+    """Build ingredient rows as (id, name, protein, fat, carbs) tuples."""
+    return [
+        (i, f"Ингредиент №{i}", 10.0 + i % 20, 5.0 + i % 9, 30.0 + i % 40)
+        for i in range(1, count + 1)
+    ]
+
+
+def bench_dishes(rows: List[Dict], repeat: int) -> Dict[str, float]:
+    """Benchmark encoding of the dish listing."""
+    adapter = TypeAdapter(List[DishResponse])
+
+    def standard():
+        return _stdlib_dumps(adapter.dump_python(adapter.validate_python(rows), mode="json"))
+
+    return {
+        "standard_ms": _best_of(standard, repeat),
+        "fast_ms": _best_of(lambda: serialization.dumps(rows), repeat),
+    }
+
+
+def bench_ingredients(rows: List[tuple], repeat: int) -> Dict[str, float]:
+    """Benchmark building and encoding the ingredient listing."""
+    adapter = TypeAdapter(List[IngredientResponse])
+
+    def standard():
+        models = [
+            IngredientResponse(
+                id=i, name=name,
+                nutrition=NutritionCreate(
+                    calories=p * 4 + f * 9 + c * 4, proteins=p, fats=f, carbohydrates=c
+                )
+            )
+            for i, name, p, f, c in rows
+        ]
+        return _stdlib_dumps(adapter.dump_python(adapter.validate_python(models), mode="json"))
+
+    def fast():
+        return serialization.dumps([
+            {
+                "id": i, "name": name,
+                "nutrition": {
+                    "calories": p * 4 + f * 9 + c * 4, "proteins": p, "fats": f, "carbohydrates": c
+                },
+            }
+            for i, name, p, f, c in rows
+        ])
+
+    return {
+        "standard_ms": _best_of(standard, repeat),
+        "fast_ms": _best_of(fast, repeat),
+    }
+
+
+def bench_menu_decode(count: int, repeat: int) -> Dict[str, float]:
+    """Benchmark decoding of a menu request with `count` dishes."""
+    body = _stdlib_dumps({"dishes": [{"id": i, "portions": 1 + i % 3} for i in range(count)]})
+
+    return {
+        "standard_ms": _best_of(lambda: MenuProcessRequest.model_validate(json.loads(body)), repeat),
+        "fast_ms": _best_of(lambda: MenuProcessRequest.model_validate(serialization.loads(body)), repeat),
+    }
+
+
+def run(row_counts: List[int], repeat: int) -> Dict:
+    """Run all serialization benchmarks."""
+    results = {
+        "benchmark": "serialization",
+        "fast_backend": "orjson" if serialization.orjson is not None else "json",
+        "results": [],
+    }
+    for count in row_counts:
+        results["results"].append({
+            "rows": count,
+            "dishes": bench_dishes(make_dish_rows(count), repeat),
+            "ingredients": bench_ingredients(make_ingredient_rows(count), repeat),
+            "menu_decode": bench_menu_decode(count, repeat),
+        })
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--rows", type=int, nargs="+", default=DEFAULT_ROWS)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = run(args.rows, args.repeat)
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
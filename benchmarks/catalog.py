@@ -0,0 +1,222 @@
+"""
+Synthetic catalog generator.
+
+Produces deterministic, realistic-looking Russian ingredient and dish
+catalogs in the seed file format (`data/ingredients.json`,
+`data/dishes.json`) at a given scale.
+
+Usage:
+    python -m benchmarks.catalog --scale 100k --output-dir /tmp/catalog
+"""
+
+import argparse
+import json
+import os
+import random
+from typing import Dict, List, Tuple
+
+# Named scales: number of dishes
+SCALES = {
+    "1k": 1_000,
+    "10k": 10_000,
+    "100k": 100_000,
+    "1m": 1_000_000,
+}
+
+# Ingredients per dish in the generated catalog
+INGREDIENTS_PER_DISH_RATIO = 10
+MIN_INGREDIENTS = 100
+
+# Base products with typical (protein, fat, carbohydrates) per 100 g
+PRODUCTS: List[Tuple[str, Tuple[float, float, float]]] = [
+    ("Гречка", (12.6, 3.3, 62.1)),
+    ("Рис", (7.0, 1.0, 74.0)),
+    ("Овсянка", (12.3, 6.1, 59.5)),
+    ("Пшено", (11.5, 3.3, 66.5)),
+    ("Картофель", (2.0, 0.4, 16.3)),
+    ("Морковь", (1.3, 0.1, 6.9)),
+    ("Свёкла", (1.5, 0.1, 8.8)),
+    ("Капуста", (1.8, 0.1, 4.7)),
+    ("Лук репчатый", (1.4, 0.0, 10.4)),
+    ("Чеснок", (6.5, 0.5, 29.9)),
+    ("Помидор", (1.1, 0.2, 3.8)),
+    ("Огурец", (0.8, 0.1, 2.8)),
+    ("Перец болгарский", (1.3, 0.0, 5.3)),
+    ("Кабачок", (0.6, 0.3, 4.6)),
+    ("Баклажан", (1.2, 0.1, 4.5)),
+    ("Тыква", (1.0, 0.1, 4.4)),
+    ("Горох", (20.5, 2.0, 53.3)),
+    ("Фасоль", (21.0, 2.0, 47.0)),
+    ("Чечевица", (24.0, 1.5, 42.7)),
+    ("Курица", (18.2, 18.4, 0.7)),
+    ("Куриное филе", (23.6, 1.9, 0.4)),
+    ("Индейка", (19.2, 0.7, 0.0)),
+    ("Говядина", (18.9, 12.4, 0.0)),
+    ("Свинина", (16.0, 21.6, 0.0)),
+    ("Баранина", (16.3, 15.3, 0.0)),
+    ("Треска", (16.0, 0.6, 0.0)),
+    ("Лосось", (20.0, 8.1, 0.0)),
+    ("Минтай", (15.9, 0.9, 0.0)),
+    ("Креветки", (18.9, 2.2, 0.0)),
+    ("Яйцо куриное", (12.7, 11.5, 0.7)),
+    ("Молоко", (3.0, 3.2, 4.7)),
+    ("Кефир", (2.8, 3.2, 4.1)),
+    ("Творог", (16.7, 9.0, 2.0)),
+    ("Сметана", (2.8, 20.0, 3.2)),
+    ("Сыр", (24.1, 29.5, 0.3)),
+    ("Масло сливочное", (0.5, 82.5, 0.8)),
+    ("Масло подсолнечное", (0.0, 99.9, 0.0)),
+    ("Мука пшеничная", (10.3, 1.1, 70.0)),
+    ("Хлеб ржаной", (6.6, 1.2, 34.2)),
+    ("Макароны", (10.4, 1.1, 69.7)),
+    ("Сахар", (0.0, 0.0, 99.7)),
+    ("Мёд", (0.8, 0.0, 81.5)),
+    ("Яблоко", (0.4, 0.4, 9.8)),
+    ("Груша", (0.4, 0.3, 10.9)),
+    ("Банан", (1.5, 0.2, 21.8)),
+    ("Клюква", (0.5, 0.2, 3.7)),
+    ("Грибы шампиньоны", (4.3, 1.0, 1.0)),
+    ("Орехи грецкие", (15.2, 65.2, 7.0)),
+    ("Изюм", (2.9, 0.6, 66.0)),
+    ("Зелень укропа", (2.5, 0.5, 6.3)),
+]
+
+# Qualifiers combined with base products to create distinct ingredients
+QUALIFIERS = [
+    "", "фермерский", "органический", "отборный", "домашний", "молодой",
+    "охлаждённый", "замороженный", "сушёный", "копчёный", "варёный",
+    "тушёный", "печёный", "маринованный", "квашеный", "свежий",
+]
+
+# Dish templates: {main} and {extra} are filled with ingredient names
+DISH_TEMPLATES = [
+    "Салат «{main}» с {extra}",
+    "Суп из {main}",
+    "Каша «{main}»",
+    "Рагу: {main} и {extra}",
+    "Запеканка «{main}»",
+    "Плов с {main}",
+    "Котлеты «{main}»",
+    "Омлет с {extra}",
+    "Гуляш: {main}",
+    "Пирог «{main}» с {extra}",
+    "Борщ с {extra}",
+    "Щи с {main}",
+    "Сырники с {extra}",
+    "Блины с {main}",
+    "Тефтели «{main}»",
+]
+
+STYLES = ["", " по-домашнему", " по-деревенски", " по-купечески", " постный", " праздничный"]
+
+
+def scale_to_rows(scale: str) -> int:
+    """Number of dishes for a named scale or a plain integer."""
+    scale = scale.lower()
+    if scale in SCALES:
+        return SCALES[scale]
+    return int(scale)
+
+
+def generate_ingredients(count: int, rng: random.Random) -> List[Dict]:
+    """
+    Generate ingredients with unique names and plausible macros.
+
+    Args:
+        count: Number of ingredients
+        rng: Random generator
+
+    Returns:
+        Ingredients in seed file format
+    """
+    ingredients = []
+    combinations = len(PRODUCTS) * len(QUALIFIERS)
+    for i in range(count):
+        name, (protein, fat, carbohydrates) = PRODUCTS[i % len(PRODUCTS)]
+        qualifier = QUALIFIERS[(i // len(PRODUCTS)) % len(QUALIFIERS)]
+        if qualifier:
+            name = f"{name} {qualifier}"
+        if i >= combinations:
+            name = f"{name} №{i // combinations + 1}"
+
+        def vary(value: float) -> float:
+            return round(max(0.0, value * rng.uniform(0.85, 1.15)), 1)
+
+        ingredients.append({
+            "name": name,
+            "protein_g": vary(protein),
+            "fat_g": vary(fat),
+            "carbohydrates_g": vary(carbohydrates),
+        })
+    return ingredients
+
+
+def generate_dishes(count: int, ingredient_names: List[str], rng: random.Random) -> List[Dict]:
+    """
+    Generate dishes of 3-8 ingredients each.
+
+    Args:
+        count: Number of dishes
+        ingredient_names: Names to compose dishes from
+        rng: Random generator
+
+    Returns:
+        Dishes in seed file format
+    """
+    dishes = []
+    seen = set()
+    for i in range(count):
+        composition = rng.sample(ingredient_names, rng.randint(3, min(8, len(ingredient_names))))
+        template = DISH_TEMPLATES[i % len(DISH_TEMPLATES)]
+        name = template.format(
+            main=composition[0].lower(), extra=composition[1].lower()
+        ) + STYLES[rng.randrange(len(STYLES))]
+        if name in seen:
+            name = f"{name} №{i}"
+        seen.add(name)
+        dishes.append({
+            "name": name,
+            "ingredients": {
+                ingredient: float(rng.randrange(10, 300, 5))
+                for ingredient in composition
+            },
+        })
+    return dishes
+
+
+def generate_catalog(dishes: int, seed: int = 42) -> Tuple[List[Dict], List[Dict]]:
+    """
+    Generate a full catalog.
+
+    Args:
+        dishes: Number of dishes; ingredients scale with it
+        seed: Random seed, so runs are reproducible
+
+    Returns:
+        Tuple of (ingredients, dishes) in seed file format
+    """
+    rng = random.Random(seed)
+    ingredients = generate_ingredients(max(MIN_INGREDIENTS, dishes // INGREDIENTS_PER_DISH_RATIO), rng)
+    return ingredients, generate_dishes(dishes, [i["name"] for i in ingredients], rng)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", default="1k", help=f"One of {', '.join(SCALES)} or a dish count")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output-dir", required=True)
+    args = parser.parse_args()
+
+    ingredients, dishes = generate_catalog(scale_to_rows(args.scale), args.seed)
+    os.makedirs(args.output_dir, exist_ok=True)
+    for filename, key, rows in (
+        ("ingredients.json", "ingredients", ingredients),
+        ("dishes.json", "dishes", dishes),
+    ):
+        with open(os.path.join(args.output_dir, filename), "w", encoding="utf-8") as f:
+            json.dump({key: rows}, f, ensure_ascii=False)
+    print(f"Wrote {len(ingredients)} ingredients and {len(dishes)} dishes to {args.output_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Compare two benchmark suite or load generator results.
+
+Prints the p50 of every benchmark present in both files along with the
+relative change, flagging regressions beyond a threshold.
+
+Usage:
+    python -m benchmarks.compare BASELINE.json CANDIDATE.json [--threshold 10]
+"""
+
+import argparse
+import json
+from typing import Dict, Iterator, Tuple
+
+
+def _index(results: Dict) -> Dict[Tuple[str, str, str], Dict]:
+    """Key every benchmark by (database, scale or concurrency, name)."""
+    if results.get("benchmark") == "loadgen":
+        return {
+            (results.get("database", "-"), f"c={step['concurrency']}", name): stats
+            for step in results["steps"]
+            for name, stats in step["endpoints"].items()
+            if "p50_ms" in stats
+        }
+    return {
+        (run["database"], run["scale"], name): stats
+        for run in results["runs"]
+        for name, stats in run["results"].items()
+        if "p50_ms" in stats
+    }
+
+
+def compare(baseline: Dict, candidate: Dict, threshold: float) -> Iterator[str]:
+    """Yield one report line per benchmark found in both results."""
+    before, after = _index(baseline), _index(candidate)
+    yield f"{'database':<10} {'run':<6} {'benchmark':<52} {'p50 before':>11} {'p50 after':>10} {'change':>8}"
+    for key in sorted(before.keys() & after.keys()):
+        old, new = before[key]["p50_ms"], after[key]["p50_ms"]
+        change = (new - old) / old * 100 if old else 0.0
+        flag = "  REGRESSION" if change > threshold else ""
+        database, run, name = key
+        yield f"{database:<10} {run:<6} {name:<52} {old:>11.3f} {new:>10.3f} {change:>+7.1f}%{flag}"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("candidate")
+    parser.add_argument("--threshold", type=float, default=10.0,
+                        help="Percent slowdown of p50 reported as a regression")
+    args = parser.parse_args()
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    with open(args.candidate, encoding="utf-8") as f:
+        candidate = json.load(f)
+    for line in compare(baseline, candidate, args.threshold):
+        print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,329 @@
+"""
+Load generator replaying a realistic traffic mix against a running API.
+
+Closed-loop workers issue catalog browsing, dish detail, batch lookup,
+menu processing (5-200 dishes) and occasional ingredient updates. The
+concurrency is ramped up in steps; each step reports throughput, status
+codes and p50/p95/p99 latency per endpoint as JSON. Request choices come
+from a seeded random generator, so runs are comparable across commits
+with `python -m benchmarks.compare`.
+
+Either point it at a running server with `--url`, or let it start one
+with `--database` (`sqlite` for a scratch file, or a SQLAlchemy URL such
+as a local Postgres container). With `--scale` the database is dropped
+and seeded with a synthetic catalog first.
+
+Usage:
+    python -m benchmarks.loadgen --database sqlite --scale 10k [--concurrency 1 8 32 64]
+                                 [--duration 10] [--workers 1] [--output FILE]
+    python -m benchmarks.loadgen --url http://127.0.0.1:8000 --no-writes
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+import httpx
+
+DEFAULT_CONCURRENCY = [1, 8, 32, 64]
+
+# Relative weights of request kinds in the traffic mix
+DEFAULT_MIX = {
+    "browse": 35,
+    "ingredients": 10,
+    "detail": 30,
+    "batch": 5,
+    "menu": 15,
+    "write": 5,
+}
+
+MENU_SIZES = (5, 200)
+BATCH_SIZE = 20
+# Dish and ingredient IDs sampled from the listings for detail lookups
+ID_PAGES = 20
+PAGE_SIZE = 100
+
+SORTS = ["name", "kcal_desc", "protein_desc", "protein_density_desc", "carbs_asc"]
+
+
+def _percentile(ordered: List[float], p: float) -> float:
+    return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+
+def _summarize(samples: List[float], statuses: Dict[int, int]) -> Dict:
+    """Latency percentiles in milliseconds and status counts."""
+    ordered = sorted(samples)
+    summary = {"n": len(ordered), "statuses": {str(code): n for code, n in sorted(statuses.items())}}
+    if ordered:
+        summary.update({
+            "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+            "p50_ms": _percentile(ordered, 0.50),
+            "p95_ms": _percentile(ordered, 0.95),
+            "p99_ms": _percentile(ordered, 0.99),
+            "max_ms": round(ordered[-1] * 1000, 3),
+        })
+    return summary
+
+
+class TrafficMix:
+    """Builds requests of each kind from sampled catalog IDs."""
+
+    def __init__(self, dish_ids: List[int], ingredients: List[Dict], weights: Dict[str, int]):
+        self.dish_ids = dish_ids
+        self.ingredients = ingredients
+        self.kinds = [kind for kind, weight in weights.items() if weight > 0]
+        self.weights = [weights[kind] for kind in self.kinds]
+
+    def next_request(self, rng: random.Random):
+        """Return (endpoint name, method, path, params, body)."""
+        kind = rng.choices(self.kinds, self.weights)[0]
+        if kind == "browse":
+            params = {"skip": rng.randrange(0, 10) * PAGE_SIZE, "limit": PAGE_SIZE, "sort": rng.choice(SORTS)}
+            if rng.random() < 0.3:
+                params["protein_min"] = rng.choice([10, 20, 30])
+            if rng.random() < 0.3:
+                params["fields"] = "id,name"
+            return "GET /api/dishes", "GET", "/api/dishes", params, None
+        if kind == "ingredients":
+            params = {"skip": rng.randrange(0, 5) * PAGE_SIZE, "limit": PAGE_SIZE}
+            return "GET /api/ingredients", "GET", "/api/ingredients", params, None
+        if kind == "detail":
+            return "GET /api/dishes/{id}", "GET", f"/api/dishes/{rng.choice(self.dish_ids)}", None, None
+        if kind == "batch":
+            ids = rng.sample(self.dish_ids, min(BATCH_SIZE, len(self.dish_ids)))
+            return "POST /api/dishes/batch", "POST", "/api/dishes/batch", None, {"ids": ids}
+        if kind == "menu":
+            size = min(rng.randint(*MENU_SIZES), len(self.dish_ids))
+            dishes = [{"id": dish_id, "portions": rng.randint(1, 4)} for dish_id in rng.sample(self.dish_ids, size)]
+            return "POST /api/menu", "POST", "/api/menu", None, {"dishes": dishes}
+        # Nudge an ingredient's macros; invalidates caches like a real edit
+        ingredient = rng.choice(self.ingredients)
+        nutrition = ingredient["nutrition"]
+        body = {
+            "calories": nutrition["calories"],
+            "proteins": round(nutrition["proteins"] * rng.uniform(0.95, 1.05), 1),
+            "fats": nutrition["fats"],
+            "carbohydrates": nutrition["carbohydrates"],
+        }
+        return "PUT /api/ingredients/{id}", "PUT", f"/api/ingredients/{ingredient['id']}", None, body
+
+
+async def _sample_catalog(client: httpx.AsyncClient):
+    """Collect dish IDs and ingredients from the first listing pages."""
+    dish_ids, ingredients = [], []
+    for page in range(ID_PAGES):
+        response = await client.get("/api/dishes", params={"skip": page * PAGE_SIZE, "limit": PAGE_SIZE, "fields": "id"})
+        response.raise_for_status()
+        rows = response.json()
+        dish_ids.extend(row["id"] for row in rows)
+        if len(rows) < PAGE_SIZE:
+            break
+    for page in range(ID_PAGES):
+        response = await client.get("/api/ingredients", params={"skip": page * PAGE_SIZE, "limit": PAGE_SIZE})
+        response.raise_for_status()
+        rows = response.json()
+        ingredients.extend(rows)
+        if len(rows) < PAGE_SIZE:
+            break
+    if not dish_ids or not ingredients:
+        raise SystemExit("The target catalog is empty")
+    return dish_ids, ingredients
+
+
+async def run_step(client: httpx.AsyncClient, mix: TrafficMix, concurrency: int, duration: float, seed: int) -> Dict:
+    """Run `concurrency` closed-loop workers for `duration` seconds."""
+    samples: Dict[str, List[float]] = {}
+    statuses: Dict[str, Dict[int, int]] = {}
+    failures = 0
+    deadline = time.perf_counter() + duration
+
+    async def worker(index: int):
+        nonlocal failures
+        rng = random.Random(seed * 1000 + index)
+        while time.perf_counter() < deadline:
+            name, method, path, params, body = mix.next_request(rng)
+            start = time.perf_counter()
+            try:
+                response = await client.request(method, path, params=params, json=body)
+                await response.aread()
+            except httpx.HTTPError:
+                failures += 1
+                continue
+            samples.setdefault(name, []).append(time.perf_counter() - start)
+            counts = statuses.setdefault(name, {})
+            counts[response.status_code] = counts.get(response.status_code, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    total = sum(len(s) for s in samples.values())
+    errors = sum(n for counts in statuses.values() for code, n in counts.items() if code >= 400)
+    return {
+        "concurrency": concurrency,
+        "duration_s": round(elapsed, 3),
+        "requests": total,
+        "throughput_rps": round(total / elapsed, 1),
+        "error_responses": errors,
+        "transport_failures": failures,
+        "endpoints": {name: _summarize(samples[name], statuses[name]) for name in sorted(samples)},
+    }
+
+
+async def run_load(
+    url: str, concurrency_steps: List[int], duration: float, warmup: float, weights: Dict[str, int], seed: int
+) -> List[Dict]:
+    """Sample the catalog, warm up, then run every concurrency step."""
+    limits = httpx.Limits(max_connections=max(concurrency_steps), max_keepalive_connections=max(concurrency_steps))
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=60) as client:
+        dish_ids, ingredients = await _sample_catalog(client)
+        mix = TrafficMix(dish_ids, ingredients, weights)
+        if warmup > 0:
+            await run_step(client, mix, concurrency_steps[0], warmup, seed)
+        return [
+            await run_step(client, mix, concurrency, duration, seed + step)
+            for step, concurrency in enumerate(concurrency_steps)
+        ]
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _wait_until_healthy(url: str, process: subprocess.Popen, timeout: float = 60) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise SystemExit(f"Server exited with code {process.returncode}")
+        try:
+            if httpx.get(f"{url}/health", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise SystemExit("Server did not become healthy in time")
+
+
+def start_server(database_url: str, workers: int) -> Tuple[subprocess.Popen, str]:
+    """Start uvicorn on a free local port against `database_url`."""
+    port = _free_port()
+    env = {**os.environ, "DATABASE_URL": database_url, "DEBUG": "false", "WEB_CONCURRENCY": str(workers)}
+    process = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "src.api.main:app",
+         "--host", "127.0.0.1", "--port", str(port), "--workers", str(workers), "--log-level", "warning"],
+        env=env,
+    )
+    url = f"http://127.0.0.1:{port}"
+    _wait_until_healthy(url, process)
+    return process, url
+
+
+def seed_database(database_url: str, scale: str) -> Dict:
+    """Recreate the schema and seed a synthetic catalog."""
+    from sqlalchemy import create_engine
+    from sqlalchemy.orm import sessionmaker
+
+    # Imports the app, so only done when seeding
+    from benchmarks.catalog import generate_catalog, scale_to_rows
+    from benchmarks.suite import seed
+    from src.database import Base
+
+    engine = create_engine(database_url)
+    try:
+        Base.metadata.drop_all(engine)
+        Base.metadata.create_all(engine)
+        ingredients, dishes = generate_catalog(scale_to_rows(scale))
+        return seed(sessionmaker(bind=engine), ingredients, dishes)
+    finally:
+        engine.dispose()
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _parse_mix(value: str) -> Dict[str, int]:
+    """Parse `browse=35,detail=30,...` overriding the default weights."""
+    weights = dict(DEFAULT_MIX)
+    for item in value.split(","):
+        kind, _, weight = item.partition("=")
+        if kind not in weights:
+            raise argparse.ArgumentTypeError(f"Unknown request kind {kind!r}; known: {', '.join(weights)}")
+        weights[kind] = int(weight)
+    return weights
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    target = parser.add_mutually_exclusive_group(required=True)
+    target.add_argument("--url", help="Base URL of a running server")
+    target.add_argument("--database", help="Start a server on `sqlite` (scratch file) or a SQLAlchemy URL")
+    parser.add_argument("--scale", help="Seed a synthetic catalog first (1k, 10k, 100k, 1m); drops the database")
+    parser.add_argument("--workers", type=int, default=1, help="uvicorn workers for a started server")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--duration", type=float, default=10.0, help="Seconds per concurrency step")
+    parser.add_argument("--warmup", type=float, default=3.0, help="Untimed seconds before the first step")
+    parser.add_argument("--mix", type=_parse_mix, default=dict(DEFAULT_MIX), help="Weights, e.g. menu=30,write=0")
+    parser.add_argument("--no-writes", action="store_true", help="Do not send ingredient updates")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    weights = dict(args.mix, write=0) if args.no_writes else args.mix
+    results = {
+        "benchmark": "loadgen",
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "mix": weights,
+        "seed": args.seed,
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process = None
+        url = args.url
+        if args.database:
+            database_url = args.database
+            if database_url == "sqlite":
+                database_url = f"sqlite:///{os.path.join(workdir, 'load.db')}"
+            results["database"] = database_url.split(":", 1)[0]
+            if args.scale:
+                results["scale"] = args.scale
+                results["seed_ms"] = seed_database(database_url, args.scale)
+            process, url = start_server(database_url, args.workers)
+            results["workers"] = args.workers
+        results["target"] = url
+
+        try:
+            results["steps"] = asyncio.run(
+                run_load(url, args.concurrency, args.duration, args.warmup, weights, args.seed)
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                process.wait(timeout=30)
+
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,394 @@
+"""
+Catalog benchmark suite.
+
+Seeds a synthetic catalog (see `benchmarks/catalog.py`) into each target
+database and measures seeding, the nutrition service, menu processing,
+the legacy DishService, the name search, autocomplete and composition
+indexes and
+the HTTP endpoints (through an in-process ASGI client), reporting
+latency percentiles as JSON so runs can be compared with
+`python -m benchmarks.compare`.
+
+Each target database is dropped and recreated: point `--database` at a
+scratch database, never at real data.
+
+Usage:
+    python -m benchmarks.suite [--scale 1k 100k] [--database sqlite postgresql://localhost/menu_bench]
+                               [--repeat 20] [--output FILE]
+"""
+
+import os
+
+# The app creates its own engine on import; it is never used here
+os.environ.setdefault("DATABASE_URL", "sqlite://")
+# Debug mode echoes every SQL statement
+os.environ.setdefault("DEBUG", "false")
+
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import httpx
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.orm import Session, sessionmaker
+
+from benchmarks.catalog import PRODUCTS, generate_catalog, scale_to_rows
+from src.api.caching import payload_cache
+from src.api.main import app
+from src.api.routes.menu import _build_menu
+from src.database import Base, Dish, DishIngredient, Ingredient, get_db
+from src.database_init import sync_dishes, sync_ingredients
+from src.models import Dish as LegacyDish, Ingredient as LegacyIngredient, NutritionCalculator
+from src.models import NutritionInfo as LegacyNutritionInfo
+from src.models.interfaces import DishLoaderInterface, IngredientLoaderInterface
+from src.repositories import DishRepository, IngredientRepository
+from src.services.dish_service import DishService
+from src.services.composition_index import CompositionIndex
+from src.services.ingredient_autocomplete import IngredientAutocomplete
+from src.services.name_search import NameSearchIndex
+from src.services.nutrition_service import NutritionService
+
+DEFAULT_SCALES = ["1k"]
+DEFAULT_DATABASES = ["sqlite"]
+
+# Dishes per menu request and per batch lookup
+MENU_SIZE = 10
+BATCH_SIZE = 50
+
+
+def _stats(samples: List[float]) -> Dict[str, float]:
+    """Summarize wall times in seconds as millisecond percentiles."""
+    ordered = sorted(samples)
+
+    def pct(p: float) -> float:
+        return round(ordered[min(len(ordered) - 1, int(p * len(ordered)))] * 1000, 3)
+
+    return {
+        "n": len(ordered),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "mean_ms": round(sum(ordered) / len(ordered) * 1000, 3),
+        "p50_ms": pct(0.5),
+        "p95_ms": pct(0.95),
+        "max_ms": round(ordered[-1] * 1000, 3),
+    }
+
+
+def _measure(func: Callable[[], object], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    """Time `repeat` calls after `warmup` untimed ones."""
+    for _ in range(warmup):
+        func()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    return _stats(samples)
+
+
+def _resolve_url(database: str, workdir: str) -> str:
+    """Turn `sqlite` into a scratch file URL; pass other URLs through."""
+    if database == "sqlite":
+        return f"sqlite:///{os.path.join(workdir, 'bench.db')}"
+    return database
+
+
+def _git_commit() -> Optional[str]:
+    """Current commit of the working tree, if available."""
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def seed(session_factory: sessionmaker, ingredients: List[Dict], dishes: List[Dict]) -> Dict[str, float]:
+    """
+    Seed the catalog through the incremental sync path.
+
+    Returns:
+        Wall time of each seeding stage in milliseconds
+    """
+    timings = {}
+    with session_factory() as session:
+        start = time.perf_counter()
+        sync_ingredients(session, ingredients)
+        timings["ingredients_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        start = time.perf_counter()
+        sync_dishes(session, dishes)
+        timings["dishes_ms"] = round((time.perf_counter() - start) * 1000, 3)
+
+        start = time.perf_counter()
+        DishRepository(session).refresh_nutrition()
+        session.commit()
+        timings["nutrition_refresh_ms"] = round((time.perf_counter() - start) * 1000, 3)
+    timings["total_ms"] = round(sum(timings.values()), 3)
+    return timings
+
+
+class _SessionIngredientLoader(IngredientLoaderInterface):
+    """Ingredient loader bound to the benchmark database."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def load_ingredients(self) -> Dict[str, LegacyIngredient]:
+        return {
+            name: LegacyIngredient(
+                name=name,
+                nutrition=LegacyNutritionInfo.from_protein_fat_carb(protein, fat, carbohydrates),
+            )
+            for name, protein, fat, carbohydrates in self.session.execute(
+                select(Ingredient.name, Ingredient.protein_g, Ingredient.fat_g, Ingredient.carbohydrates_g)
+            )
+        }
+
+
+class _SessionDishLoader(DishLoaderInterface):
+    """Dish loader bound to the benchmark database."""
+
+    def __init__(self, session: Session):
+        self.session = session
+
+    def load_dishes(self, ingredient_dict: Dict[str, LegacyIngredient]) -> List[LegacyDish]:
+        dishes: Dict[int, LegacyDish] = {}
+        rows = self.session.execute(
+            select(Dish.id, Dish.name, Ingredient.name, DishIngredient.amount)
+            .join(DishIngredient, DishIngredient.dish_id == Dish.id)
+            .join(Ingredient, Ingredient.id == DishIngredient.ingredient_id)
+            .order_by(Dish.id)
+        )
+        for dish_id, dish_name, ingredient_name, amount in rows:
+            dish = dishes.get(dish_id)
+            if dish is None:
+                dish = dishes[dish_id] = LegacyDish(id=dish_id, name=dish_name)
+            dish.ingredients[ingredient_name] = amount
+        return list(dishes.values())
+
+
+def bench_services(session: Session, dish_ids: List[int], repeat: int) -> Dict:
+    """Benchmark NutritionService, menu building and DishService in-process."""
+    rng = random.Random(7)
+    dish_repo = DishRepository(session)
+    service = NutritionService(dish_repo, IngredientRepository(session))
+    menu = [{"id": dish_id, "portions": 1 + i % 3} for i, dish_id in enumerate(rng.sample(dish_ids, MENU_SIZE))]
+    selection = tuple((item["id"], item["portions"]) for item in menu)
+    batch = rng.sample(dish_ids, BATCH_SIZE)
+
+    def one_dish():
+        return service.get_dish_with_ingredients(rng.choice(dish_ids))
+
+    results = {
+        "nutrition.get_dishes_with_nutrition": _measure(
+            lambda: service.get_dishes_with_nutrition(limit=100), repeat),
+        "nutrition.get_dishes_with_nutrition[filtered]": _measure(
+            lambda: service.get_dishes_with_nutrition(
+                limit=100, ranges={"protein": (20, None)}, sort="protein_desc"), repeat),
+        "nutrition.get_dish_with_ingredients": _measure(one_dish, repeat),
+        "nutrition.get_dishes_with_ingredients": _measure(
+            lambda: service.get_dishes_with_ingredients(batch), repeat),
+        "nutrition.calculate_menu_nutrition": _measure(
+            lambda: service.calculate_menu_nutrition(menu), repeat),
+        "menu.build": _measure(lambda: _build_menu(selection, dish_repo, service), repeat),
+    }
+    session.rollback()
+
+    # Construction loads the whole catalog, so fewer runs
+    dish_service = None
+
+    def construct():
+        nonlocal dish_service
+        dish_service = DishService(
+            _SessionDishLoader(session), _SessionIngredientLoader(session), NutritionCalculator()
+        )
+
+    results["dish_service.load"] = _measure(construct, max(1, repeat // 5), warmup=0)
+    results["dish_service.get_dish_ingredients"] = _measure(
+        lambda: dish_service.get_dish_ingredients(rng.choice(dish_ids)), repeat)
+    results["dish_service.process_menu"] = _measure(lambda: dish_service.process_menu(menu), repeat)
+    results["dish_service.get_dishes"] = _measure(dish_service.get_dishes, repeat)
+    session.rollback()
+
+    search_index = NameSearchIndex()
+
+    def build_search_index():
+        search_index.invalidate()
+        search_index.sync(session)
+
+    # Queries are dish name beginnings with one letter replaced
+    queries = []
+    for dish in dish_service.raw_dishes[:200]:
+        position = rng.randrange(min(12, len(dish.name)))
+        queries.append(dish.name[:position] + "о" + dish.name[position + 1:12])
+
+    results["name_search.build"] = _measure(build_search_index, max(1, repeat // 5), warmup=0)
+    results["name_search.search"] = _measure(lambda: search_index.search(rng.choice(queries)), repeat)
+
+    autocomplete = IngredientAutocomplete()
+
+    def build_autocomplete():
+        autocomplete.invalidate()
+        autocomplete.sync(session)
+
+    prefixes = [query[:length] for query in queries for length in (1, 3, 6)]
+    results["ingredient_autocomplete.build"] = _measure(build_autocomplete, max(1, repeat // 5), warmup=0)
+    results["ingredient_autocomplete.suggest"] = _measure(
+        lambda: autocomplete.suggest(rng.choice(prefixes)), repeat)
+
+    composition = CompositionIndex()
+
+    def build_composition():
+        composition.invalidate()
+        composition.sync(session)
+
+    results["composition_index.build"] = _measure(build_composition, max(1, repeat // 5), warmup=0)
+    # Two required ingredients, one excluded, among the most used ones
+    popular = sorted(composition._postings, key=lambda id: -composition._postings[id].bit_count())[:50]
+
+    def search_composition():
+        include, exclude = rng.sample(popular, 2), [rng.choice(popular)]
+        return composition.rows(composition.match(include, (), exclude), limit=20)
+
+    results["composition_index.search"] = _measure(search_composition, repeat)
+    session.rollback()
+    return results
+
+
+async def bench_http(session_factory: sessionmaker, dish_ids: List[int], repeat: int) -> Dict:
+    """Benchmark HTTP endpoints through an in-process ASGI client."""
+    rng = random.Random(11)
+
+    def override_get_db():
+        db = session_factory()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    app.dependency_overrides[get_db] = override_get_db
+    menu = {"dishes": [{"id": dish_id, "portions": 2} for dish_id in rng.sample(dish_ids, MENU_SIZE)]}
+    batch = {"ids": rng.sample(dish_ids, BATCH_SIZE)}
+    requests = {
+        "GET /api/dishes": lambda c: c.get("/api/dishes", params={"limit": 100}),
+        "GET /api/dishes?fields=id,name": lambda c: c.get(
+            "/api/dishes", params={"limit": 100, "fields": "id,name"}),
+        "GET /api/dishes?protein_min=20&sort=protein_desc": lambda c: c.get(
+            "/api/dishes", params={"limit": 100, "protein_min": 20, "sort": "protein_desc"}),
+        "GET /api/dishes/{id}": lambda c: c.get(f"/api/dishes/{rng.choice(dish_ids)}"),
+        "POST /api/dishes/batch": lambda c: c.post("/api/dishes/batch", json=batch),
+        "GET /api/ingredients": lambda c: c.get("/api/ingredients", params={"limit": 100}),
+        "GET /api/search": lambda c: c.get("/api/search", params={"q": "суп из курийа"}),
+        "GET /api/ingredients/autocomplete": lambda c: c.get(
+            "/api/ingredients/autocomplete", params={"prefix": "кур"}),
+        "GET /api/dishes/search": lambda c: c.get("/api/dishes/search", params={
+            "include": PRODUCTS[0][0], "exclude": PRODUCTS[1][0], "protein_min": 20, "limit": 20}),
+        "POST /api/menu": lambda c: c.post("/api/menu", json=menu),
+    }
+
+    results = {}
+    try:
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            for name, send in requests.items():
+                for cache in ("cold", "warm"):
+                    samples = []
+                    for _ in range(repeat):
+                        if cache == "cold":
+                            payload_cache.clear()
+                        start = time.perf_counter()
+                        response = await send(client)
+                        samples.append(time.perf_counter() - start)
+                        response.raise_for_status()
+                    results[f"{name} [{cache}]"] = _stats(samples)
+    finally:
+        app.dependency_overrides.pop(get_db, None)
+    return results
+
+
+def run_one(database: str, scale: str, repeat: int, workdir: str) -> Dict:
+    """Seed one database at one scale and run every benchmark against it."""
+    url = _resolve_url(database, workdir)
+    engine = create_engine(url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+    try:
+        start = time.perf_counter()
+        ingredients, dishes = generate_catalog(scale_to_rows(scale))
+        generate_ms = round((time.perf_counter() - start) * 1000, 3)
+        seeding = seed(session_factory, ingredients, dishes)
+        del ingredients, dishes
+
+        with session_factory() as session:
+            dish_ids = list(session.scalars(select(Dish.id)))
+            ingredient_count = session.scalar(select(func.count(Ingredient.id)))
+            composition_rows = session.scalar(select(func.count()).select_from(DishIngredient))
+            services = bench_services(session, dish_ids, repeat)
+
+        http = asyncio.run(bench_http(session_factory, dish_ids, repeat))
+    finally:
+        engine.dispose()
+
+    return {
+        "database": engine.dialect.name,
+        "scale": scale,
+        "dishes": len(dish_ids),
+        "ingredients": ingredient_count,
+        "composition_rows": composition_rows,
+        "generate_ms": generate_ms,
+        "seed": seeding,
+        "results": {**services, **http},
+    }
+
+
+def run(scales: List[str], databases: List[str], repeat: int) -> Dict:
+    """Run the suite for every (database, scale) pair."""
+    results = {
+        "benchmark": "suite",
+        "commit": _git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "repeat": repeat,
+        "runs": [],
+    }
+    with tempfile.TemporaryDirectory() as workdir:
+        for database in databases:
+            for scale in scales:
+                results["runs"].append(run_one(database, scale, repeat, workdir))
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", nargs="+", default=DEFAULT_SCALES,
+                        help="Catalog sizes: 1k, 10k, 100k, 1m or a dish count")
+    parser.add_argument("--database", nargs="+", default=DEFAULT_DATABASES,
+                        help="`sqlite` for a scratch file or a SQLAlchemy URL")
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--output", help="Write JSON results to this file")
+    args = parser.parse_args()
+
+    results = run(args.scale, args.database, args.repeat)
+    output = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output)
+    print(output)
+
+
+if __name__ == "__main__":
+    main()
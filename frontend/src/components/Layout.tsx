@@ -1,6 +1,9 @@
 import { Outlet, NavLink } from 'react-router-dom';
+import { useCatalogEvents } from '../hooks/useCatalogEvents';
 
 export function Layout() {
+  useCatalogEvents();
+
   const navLinks = [
     { to: '/', label: 'Планировщик' },
     { to: '/dishes', label: 'Блюда' },
@@ -0,0 +1,51 @@
+import { useEffect } from 'react';
+import { useQueryClient } from '@tanstack/react-query';
+import { eventsApi } from '../services/api';
+import { dishesKeys } from './useDishes';
+import { ingredientsKeys } from './useIngredients';
+import type { CatalogEvent, Dish, Ingredient } from '../types';
+
+// Apply a change to a cached list, keeping the API's order by name
+function patchList<T extends { id: number; name: string }>(list: T[] | undefined, event: CatalogEvent, item?: T) {
+  if (!list) return list;
+  const next = list.filter((entry) => entry.id !== event.id);
+  if (event.op === 'deleted' || !item) return next;
+  const index = next.findIndex((entry) => entry.name.localeCompare(item.name) > 0);
+  next.splice(index === -1 ? next.length : index, 0, item);
+  return next;
+}
+
+// Hook that keeps React Query caches in sync with server-side catalog changes
+export function useCatalogEvents() {
+  const queryClient = useQueryClient();
+
+  useEffect(() => {
+    const source = eventsApi.subscribe();
+
+    source.addEventListener('change', (message) => {
+      const event: CatalogEvent = JSON.parse((message as MessageEvent).data);
+
+      if (event.entity === 'dish') {
+        const dish = event.nutrition && { id: event.id, name: event.name ?? '', ...event.nutrition };
+        queryClient.setQueryData<Dish[]>(dishesKeys.all, (list) => patchList(list, event, dish));
+        if (event.op === 'deleted') {
+          queryClient.removeQueries({ queryKey: dishesKeys.detail(event.id), exact: true });
+        } else {
+          // Details list ingredients, which the event does not carry
+          queryClient.invalidateQueries({ queryKey: dishesKeys.detail(event.id), exact: true });
+        }
+      } else {
+        const ingredient = event.nutrition && { id: event.id, name: event.name ?? '', nutrition: event.nutrition };
+        queryClient.setQueryData<Ingredient[]>(ingredientsKeys.all, (list) => patchList(list, event, ingredient));
+      }
+    });
+
+    // The server dropped us for falling behind: refetch everything
+    source.addEventListener('reset', () => {
+      queryClient.invalidateQueries({ queryKey: dishesKeys.all });
+      queryClient.invalidateQueries({ queryKey: ingredientsKeys.all });
+    });
+
+    return () => source.close();
+  }, [queryClient]);
+}
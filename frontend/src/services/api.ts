@@ -96,3 +96,8 @@ export const menuApi = {
       body: JSON.stringify({ dishes }),
     }),
 };
+
+// Catalog change feed (Server-Sent Events)
+export const eventsApi = {
+  subscribe: () => new EventSource(`${API_BASE}/events`),
+};
@@ -74,6 +74,25 @@ export interface MenuResult {
   };
 }
 
+// Catalog change pushed by the server over /api/events
+export type CatalogEvent =
+  | {
+      entity: 'dish';
+      id: number;
+      op: 'created' | 'updated' | 'deleted';
+      version: number;
+      name?: string;
+      nutrition?: Omit<Dish, 'id' | 'name'>;
+    }
+  | {
+      entity: 'ingredient';
+      id: number;
+      op: 'created' | 'updated' | 'deleted';
+      version: number;
+      name?: string;
+      nutrition?: Nutrition;
+    };
+
 // API Response types
 export interface ApiResponse<T> {
   status: 'success' | 'error';
@@ -0,0 +1,23 @@
+"""
+Admin access checks shared by admin routes and diagnostics middleware.
+"""
+
+import secrets
+from typing import Optional
+
+from src.api.config import get_settings
+
+
+def is_admin(token: Optional[str]) -> bool:
+    """
+    Check whether a request may use admin diagnostics.
+
+    The X-Admin-Token header must match the configured token, in debug mode
+    too; with no token configured admin access is closed. Tokens are compared
+    as bytes, since compare_digest rejects non-ASCII strings.
+    """
+    settings = get_settings()
+    return bool(
+        settings.admin_token and token
+        and secrets.compare_digest(token.encode("utf-8"), settings.admin_token.encode("utf-8"))
+    )
@@ -0,0 +1,150 @@
+"""
+Fan-out of catalog change events to Server-Sent Events subscribers.
+
+Each subscriber owns a bounded asyncio queue. An event is encoded into an
+SSE frame once and the same bytes object is enqueued for every subscriber,
+so publishing costs one queue append per connection. Subscribers that fall
+behind are dropped instead of buffering without limit: their queue is
+replaced by a single `reset` frame and the stream ends, telling the client
+to refetch and reconnect.
+
+Events are committed from threadpool workers, so publishing hops onto each
+subscriber's event loop with `call_soon_threadsafe`.
+"""
+
+import asyncio
+import threading
+from typing import Dict, List, Optional, Set
+
+from src.api.serialization import dumps
+from src.services.catalog_version import catalog_version
+
+# Frames buffered per subscriber before it is considered too slow
+QUEUE_SIZE = 64
+
+# Reconnection delay suggested to EventSource clients, in milliseconds
+RETRY_MS = 3000
+
+# Sentinel that ends a subscriber's stream
+CLOSE = b""
+
+# Comment frame that keeps idle connections and proxies alive
+HEARTBEAT = b": keep-alive\n\n"
+
+
+def encode_event(event: str, data, event_id: Optional[int] = None) -> bytes:
+    """
+    Encode one SSE frame.
+
+    Args:
+        event: Event type
+        data: JSON-serializable payload
+        event_id: Optional id, sent back by clients as Last-Event-ID
+
+    Returns:
+        Frame bytes terminated by a blank line
+    """
+    frame = b""
+    if event_id is not None:
+        frame += b"id: %d\n" % event_id
+    return frame + b"event: " + event.encode() + b"\ndata: " + dumps(data) + b"\n\n"
+
+
+class Subscriber:
+    """A connected client and its bounded frame queue."""
+
+    __slots__ = ("queue", "loop", "closed")
+
+    def __init__(self, loop: asyncio.AbstractEventLoop, maxsize: int):
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+        self.loop = loop
+        self.closed = False
+
+
+class Broadcaster:
+    """Publishes change frames to all subscribers; drops slow consumers."""
+
+    def __init__(self, queue_size: int = QUEUE_SIZE):
+        self.queue_size = queue_size
+        self._subscribers: Set[Subscriber] = set()
+        self._lock = threading.Lock()
+        self.published = 0
+        self.dropped = 0
+
+    @property
+    def active(self) -> bool:
+        """Whether anyone is listening."""
+        return bool(self._subscribers)
+
+    def subscribe(self) -> Subscriber:
+        """Register a subscriber bound to the running event loop."""
+        subscriber = Subscriber(asyncio.get_running_loop(), self.queue_size)
+        with self._lock:
+            self._subscribers.add(subscriber)
+        return subscriber
+
+    def unsubscribe(self, subscriber: Subscriber) -> None:
+        """Forget a subscriber."""
+        subscriber.closed = True
+        with self._lock:
+            self._subscribers.discard(subscriber)
+
+    def publish(self, version: int, events: List[Dict]) -> None:
+        """
+        Send change events to every subscriber. Safe to call from any thread.
+
+        Args:
+            version: Catalog version the events produced
+            events: Change events
+        """
+        frames = [encode_event("change", dict(item, version=version), version) for item in events]
+        with self._lock:
+            by_loop: Dict[asyncio.AbstractEventLoop, List[Subscriber]] = {}
+            for subscriber in self._subscribers:
+                by_loop.setdefault(subscriber.loop, []).append(subscriber)
+        self.published += len(frames)
+
+        for loop, subscribers in by_loop.items():
+            try:
+                running = asyncio.get_running_loop()
+            except RuntimeError:
+                running = None
+            if loop is running:
+                self._deliver(subscribers, frames)
+            elif not loop.is_closed():
+                loop.call_soon_threadsafe(self._deliver, subscribers, frames)
+
+    def _deliver(self, subscribers: List[Subscriber], frames: List[bytes]) -> None:
+        """Enqueue frames on the subscribers' loop, dropping those that overflow."""
+        for subscriber in subscribers:
+            if subscriber.closed:
+                continue
+            queue = subscriber.queue
+            if queue.qsize() + len(frames) > queue.maxsize:
+                self._drop(subscriber)
+                continue
+            for frame in frames:
+                queue.put_nowait(frame)
+
+    def _drop(self, subscriber: Subscriber) -> None:
+        """Replace a slow subscriber's backlog with a reset frame and close it."""
+        queue = subscriber.queue
+        while not queue.empty():
+            queue.get_nowait()
+        queue.put_nowait(encode_event("reset", {"version": catalog_version.value}))
+        queue.put_nowait(CLOSE)
+        self.dropped += 1
+        self.unsubscribe(subscriber)
+
+    def stats(self) -> Dict[str, int]:
+        """Broadcaster counters."""
+        return {
+            "subscribers": len(self._subscribers),
+            "published": self.published,
+            "dropped": self.dropped,
+        }
+
+
+# Global broadcaster fed by committed catalog writes
+broadcaster = Broadcaster()
+catalog_version.add_sink(broadcaster)
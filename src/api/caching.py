@@ -0,0 +1,205 @@
+"""
+HTTP caching helpers: catalog ETags, conditional GET, Cache-Control policies
+and the precompressed catalog payload cache.
+"""
+
+import hashlib
+import logging
+from functools import lru_cache
+from typing import Any, Callable, Optional, Tuple
+
+from fastapi import Request, Response, status
+from pydantic import TypeAdapter
+from sqlalchemy.orm import Session
+
+from src.api.config import Settings, get_settings
+from src.api.payload_cache import CachedPayload, PayloadCache
+from src.api.serialization import dumps, fast_json_enabled, trusted_response
+from src.api.single_flight import single_flight
+from src.database import with_own_session
+from src.services.catalog_snapshot import catalog_snapshot
+from src.services.catalog_version import catalog_version
+
+logger = logging.getLogger(__name__)
+
+
+def shared_catalog_version(settings: Settings) -> bool:
+    """
+    Check whether the catalog version seen by this process covers every write.
+    
+    Without the shared snapshot the version is per process, so with several
+    workers one that did not handle a write keeps its old version.
+    """
+    return settings.web_concurrency <= 1 or bool(settings.catalog_snapshot_path)
+
+
+def payload_cache_bytes(settings: Settings) -> int:
+    """
+    Memory budget of the payload cache.
+    
+    Cache keys carry the catalog version, so unless that version is shared
+    by all workers (`shared_catalog_version`) the cache is off.
+    """
+    if not shared_catalog_version(settings):
+        if settings.payload_cache_mb:
+            logger.warning(
+                "Payload cache disabled: %d workers without CATALOG_SNAPSHOT_PATH "
+                "cannot see each other's catalog writes",
+                settings.web_concurrency,
+            )
+        return 0
+    return settings.payload_cache_mb * 1024 * 1024
+
+
+# Serialized catalog payloads keyed by ETag (catalog version + query shape)
+payload_cache = PayloadCache(payload_cache_bytes(get_settings()))
+
+# Cache-Control policy per route. Catalog reads are shared by all clients
+# and must be revalidated on every use; the revalidation is a cheap 304.
+CACHE_CONTROL = {
+    "dishes": "public, no-cache",
+    "dish": "public, no-cache",
+    "ingredients": "public, no-cache",
+    "goals": "no-store",
+    "menu": "no-store",
+}
+
+
+def catalog_etag(route: str, *params: Any) -> str:
+    """
+    Build a strong ETag for a catalog read.
+
+    Args:
+        route: Route name (key of CACHE_CONTROL)
+        params: Query parameters that shape the response
+
+    Returns:
+        Quoted ETag value derived from the current catalog version
+    """
+    shape = hashlib.blake2b(repr((route, params)).encode("utf-8"), digest_size=6).hexdigest()
+    # The snapshot version is shared by all workers; the in-process one is not.
+    # Until this process's last writes are published, both are needed
+    local = f"{catalog_version.epoch}-{catalog_version.value}"
+    version = catalog_snapshot.version()
+    if version is None:
+        version = local
+    elif catalog_snapshot.pending:
+        version = f"{version}.{local}"
+    return f'"{version}-{shape}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """
+    Check the request's If-None-Match header against an ETag.
+    
+    Never matches while the catalog version is not shared by all workers:
+    another worker may have handed out the ETag before a write this one
+    did not see.
+    """
+    header = request.headers.get("if-none-match")
+    if not header or not shared_catalog_version(get_settings()):
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*":
+            return True
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def cache_headers(route: str, etag: str) -> dict:
+    """Response headers for a cacheable catalog read; no ETag unless it can be revalidated."""
+    if not shared_catalog_version(get_settings()):
+        return {"Cache-Control": CACHE_CONTROL[route]}
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL[route]}
+
+
+def not_modified(route: str, etag: str) -> Response:
+    """Build a 304 Not Modified response."""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cache_headers(route, etag))
+
+
+async def catalog_response(
+    request: Request,
+    response: Response,
+    route: str,
+    params: Tuple,
+    db: Session,
+    build: Callable[[Session], Any],
+    model: Any = None,
+    partial: bool = False
+) -> Any:
+    """
+    Serve a catalog read through conditional GET and the payload cache.
+    
+    The payload is built, serialized and precompressed once per catalog
+    version and query shape; later requests are answered from cached bytes
+    in the best encoding the client accepts. Concurrent misses for the same
+    ETag share one computation. Unless the fast JSON path is on, the cached
+    bytes are validated and encoded through the response model, as FastAPI
+    would.
+    
+    Args:
+        request: Incoming request
+        response: Injected response used when the cache is disabled
+        route: Route name (key of CACHE_CONTROL)
+        params: Query parameters that shape the response
+        db: Request session, whose engine the computation uses
+        build: Computes the response content on a cache miss, in a session
+            of its own since coalesced requests share it
+        model: Response model of the route
+        partial: Content is a sparse fieldset the response model cannot validate
+    """
+    etag = catalog_etag(route, *params)
+    if etag_matches(request, etag):
+        return not_modified(route, etag)
+    
+    headers = cache_headers(route, etag)
+    if not payload_cache.max_bytes:
+        content = await single_flight.do(etag, with_own_session(db, build))
+        if partial:
+            return Response(content=dumps(content), media_type="application/json", headers=headers)
+        return trusted_response(content, response, headers)
+    
+    payload = payload_cache.get(etag)
+    if payload is None:
+        compute = with_own_session(db, build)
+        payload = await single_flight.do(
+            etag, lambda: _build_payload(etag, compute, None if partial else model)
+        )
+    
+    body, encoding = payload.encoded(request.headers.get("accept-encoding"))
+    headers["Vary"] = "Accept-Encoding"
+    if encoding:
+        headers["Content-Encoding"] = encoding
+    return Response(content=body, media_type="application/json", headers=headers)
+
+
+@lru_cache(maxsize=None)
+def _adapter(model: Any) -> TypeAdapter:
+    return TypeAdapter(model)
+
+
+def serialize_payload(content: Any, model: Optional[Any] = None) -> bytes:
+    """
+    Encode catalog content for the payload cache.
+    
+    Args:
+        content: Payload built by the server
+        model: Response model to validate and encode with; skipped on the
+            fast JSON path and for sparse fieldsets (None)
+    """
+    if model is None or fast_json_enabled():
+        return dumps(content)
+    adapter = _adapter(model)
+    return adapter.dump_json(adapter.validate_python(content))
+
+
+def _build_payload(etag: str, build: Callable[[], Any], model: Optional[Any]) -> CachedPayload:
+    """Compute, serialize, precompress and cache a catalog payload."""
+    payload = CachedPayload.build(serialize_payload(build(), model))
+    payload_cache.put(etag, payload)
+    return payload
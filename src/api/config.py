@@ -15,14 +15,73 @@ class Settings(BaseSettings):
     db_host: str = "db"
     db_port: int = 5432
     
+    # Seed data: incrementally sync changed records from data/*.json on startup
+    seed_sync: bool = False
+    
     # API
     api_prefix: str = "/api"
     cors_origins: list[str] = ["http://localhost:3000", "http://localhost", "http://127.0.0.1:3000"]
     
+    # Encode/decode hot endpoints with orjson and skip response re-validation
+    fast_json: bool = False
+    
+    # Memory budget for cached, precompressed catalog payloads (0 disables);
+    # off with several workers unless the catalog snapshot is enabled
+    payload_cache_mb: int = 32
+    
+    # Number of worker processes, as passed to uvicorn/gunicorn
+    web_concurrency: int = 1
+    
+    # Memory-mapped catalog snapshot shared by workers on a host ("" disables)
+    catalog_snapshot_path: str = ""
+    
+    # File that persists nutrition goals across workers ("" keeps them in memory)
+    goals_path: str = ""
+    
+    # Admission control: concurrent requests per route class (0 = unlimited)
+    # and the longest a request may wait in the queue before being shed
+    admission_control: bool = True
+    admission_read_limit: int = 64
+    admission_heavy_limit: int = 8
+    admission_write_limit: int = 16
+    admission_max_queue_ms: int = 1000
+    
+    # Report per-request SQL query count and time in Server-Timing and
+    # X-DB-Queries headers; log requests issuing more queries than the budget
+    query_stats: bool = True
+    query_budget: int = 0
+    
+    # Expose Prometheus metrics at /metrics
+    metrics: bool = True
+    
+    # Admins may profile single requests with the X-Profile: 1 header;
+    # stacks are sampled at this interval
+    profiling: bool = True
+    profile_interval_ms: float = 1.0
+    
+    # Log SQL statements slower than this (0 disables) with the calling
+    # repository method; capture the plan of a sample of slow SELECTs,
+    # at most slow_query_explain_per_minute plans per minute
+    slow_query_ms: float = 100
+    slow_query_explain_sample: float = 1.0
+    slow_query_explain_per_minute: int = 10
+    slow_query_log_size: int = 100
+    
+    # OpenTelemetry spans for requests, services, repositories and SQL:
+    # none, console, file (JSON lines at tracing_file) or otlp (OTLP/HTTP
+    # collector at tracing_otlp_endpoint); a fraction of traces is sampled
+    tracing_exporter: str = "none"
+    tracing_sample_rate: float = 1.0
+    tracing_file: str = "traces.jsonl"
+    tracing_otlp_endpoint: str = ""
+    
     # App
     app_name: str = "Menu Management API"
     debug: bool = True
     
+    # Admin endpoints and X-Profile require X-Admin-Token ("" closes them)
+    admin_token: str = ""
+    
     class Config:
         env_file = ".env"
         env_file_encoding = "utf-8"
@@ -10,8 +10,18 @@ from fastapi.middleware.cors import CORSMiddleware
 
 from src.api.config import get_settings
 from src.api.routes import api_router
-from src.api.middleware import register_exception_handlers
+from src.api.routes.metrics import router as metrics_router
+from src.api.middleware import (
+    register_admission_control,
+    register_exception_handlers,
+    register_metrics,
+    register_profiler,
+    register_query_stats,
+    register_tracing,
+)
 from src.database_init import init_database, check_database_connection
+from src.services.catalog_snapshot import catalog_snapshot
+from src.tracing import disable_tracing
 
 settings = get_settings()
 
@@ -41,12 +51,18 @@ async def lifespan(app: FastAPI):
         print("Warning: Could not establish database connection")
     else:
         # Initialize database with seed data
-        init_database()
+        init_database(sync=settings.seed_sync)
+        
+        # Publish the shared catalog snapshot for all workers
+        if catalog_snapshot.enabled:
+            catalog_snapshot.publish()
     
     yield
     
-    # Shutdown: cleanup if needed
+    # Shutdown: publish the last catalog writes before exiting
     print("Shutting down...")
+    catalog_snapshot.flush(timeout=10)
+    disable_tracing()
 
 
 # Create FastAPI application
@@ -59,6 +75,20 @@ app = FastAPI(
     lifespan=lifespan,
 )
 
+# Profile requests on demand, record request metrics and count SQL queries
+# per request. All sit inside admission control, so only admitted work is timed
+register_profiler(app)
+register_metrics(app)
+register_query_stats(app)
+
+# Cap concurrent requests per route class and shed load when overloaded.
+# Added before CORS so that shed responses still carry CORS headers.
+register_admission_control(app)
+
+# Trace requests when an exporter is configured; outside admission control
+# so that spans include time spent queued
+register_tracing(app)
+
 # Configure CORS
 app.add_middleware(
     CORSMiddleware,
@@ -74,6 +104,10 @@ register_exception_handlers(app)
 # Include API routes
 app.include_router(api_router, prefix=settings.api_prefix)
 
+# Prometheus metrics
+if settings.metrics:
+    app.include_router(metrics_router)
+
 
 @app.get("/")
 async def root():
@@ -0,0 +1,220 @@
+"""
+Memory diagnostics with tracemalloc.
+
+Admins start tracing, take snapshots while the service runs and compare
+them: the growth between two snapshots taken under steady traffic points
+at what is holding memory. Allocation sites are also summed by module
+group (application packages, SQLAlchemy, pydantic, ...), which tells ORM
+identity maps and result rows apart from response models and caches.
+
+Tracing slows allocation-heavy code noticeably and keeps its own
+bookkeeping in memory, so it is off by default and meant to be stopped
+once the snapshots are taken.
+"""
+
+import itertools
+import os
+import sysconfig
+import threading
+import time
+import tracemalloc
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+SRC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PROJECT_ROOT = os.path.dirname(SRC_ROOT)
+STDLIB_ROOT = sysconfig.get_paths()["stdlib"]
+
+# Snapshots kept for the admin API
+MAX_SNAPSHOTS = 10
+# Allocation sites listed per report
+TOP_SITES = 25
+
+# Third-party packages reported as their own group
+LIBRARY_GROUPS = ("sqlalchemy", "pydantic", "pydantic_core", "starlette", "fastapi", "anyio", "orjson")
+
+# tracemalloc's own and import machinery allocations are left out of reports
+_FILTERS = (
+    tracemalloc.Filter(False, tracemalloc.__file__),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+    tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+    tracemalloc.Filter(False, "<unknown>"),
+)
+
+
+def module_group(filename: str) -> str:
+    """
+    Group an allocation site by where its code lives.
+
+    Application files are grouped by package (`src.services`,
+    `src.repositories`, ...), known libraries by name, the rest as
+    `stdlib` or `other`.
+    """
+    if filename.startswith(SRC_ROOT + os.sep):
+        parts = os.path.relpath(filename, PROJECT_ROOT).split(os.sep)
+        return ".".join(parts[:2]) if len(parts) > 2 else parts[0]
+    parts = filename.split(os.sep)
+    if "site-packages" in parts:
+        index = parts.index("site-packages") + 1
+        if index < len(parts):
+            package = parts[index].split(".")[0]
+            return package if package in LIBRARY_GROUPS else "other"
+    if filename.startswith(STDLIB_ROOT):
+        return "stdlib"
+    return "other"
+
+
+def _site_name(filename: str, line: int) -> str:
+    if filename.startswith(PROJECT_ROOT + os.sep):
+        filename = os.path.relpath(filename, PROJECT_ROOT)
+    elif "site-packages" + os.sep in filename:
+        filename = filename.split("site-packages" + os.sep, 1)[1]
+    elif filename.startswith(STDLIB_ROOT + os.sep):
+        filename = os.path.relpath(filename, STDLIB_ROOT)
+    return f"{filename}:{line}"
+
+
+class MemorySnapshot:
+    """A tracemalloc snapshot taken through the admin API."""
+
+    def __init__(self, snapshot_id: str, snapshot: tracemalloc.Snapshot, label: Optional[str] = None):
+        self.id = snapshot_id
+        self.label = label
+        self.taken_at = time.time()
+        self.snapshot = snapshot.filter_traces(_FILTERS)
+        self.traced_size = sum(stat.size for stat in self.snapshot.statistics("filename"))
+
+    def info(self) -> Dict:
+        """Short description used in listings."""
+        return {
+            "id": self.id,
+            "label": self.label,
+            "taken_at": self.taken_at,
+            "traced_kb": round(self.traced_size / 1024, 1),
+        }
+
+    def report(self, limit: int = TOP_SITES) -> Dict:
+        """Largest allocation sites and totals per module group."""
+        groups: Dict[str, Dict[str, int]] = {}
+        for stat in self.snapshot.statistics("filename"):
+            group = groups.setdefault(module_group(stat.traceback[0].filename), {"size": 0, "count": 0})
+            group["size"] += stat.size
+            group["count"] += stat.count
+        sites = [
+            {
+                "site": _site_name(stat.traceback[0].filename, stat.traceback[0].lineno),
+                "group": module_group(stat.traceback[0].filename),
+                "size_kb": round(stat.size / 1024, 1),
+                "count": stat.count,
+            }
+            for stat in self.snapshot.statistics("lineno")[:limit]
+        ]
+        return {
+            **self.info(),
+            "groups": _format_groups(groups, "size", "count"),
+            "top": sites,
+        }
+
+    def compare(self, base: "MemorySnapshot", limit: int = TOP_SITES) -> Dict:
+        """Allocation growth since an earlier snapshot, by site and group."""
+        groups: Dict[str, Dict[str, int]] = {}
+        for stat in self.snapshot.compare_to(base.snapshot, "filename"):
+            group = groups.setdefault(
+                module_group(stat.traceback[0].filename), {"size_diff": 0, "count_diff": 0}
+            )
+            group["size_diff"] += stat.size_diff
+            group["count_diff"] += stat.count_diff
+        sites = [
+            {
+                "site": _site_name(stat.traceback[0].filename, stat.traceback[0].lineno),
+                "group": module_group(stat.traceback[0].filename),
+                "size_diff_kb": round(stat.size_diff / 1024, 1),
+                "size_kb": round(stat.size / 1024, 1),
+                "count_diff": stat.count_diff,
+            }
+            for stat in self.snapshot.compare_to(base.snapshot, "lineno")[:limit]
+        ]
+        return {
+            "base": base.info(),
+            "target": self.info(),
+            "size_diff_kb": round((self.traced_size - base.traced_size) / 1024, 1),
+            "groups": _format_groups(groups, "size_diff", "count_diff"),
+            "top": sites,
+        }
+
+
+def _format_groups(groups: Dict[str, Dict[str, int]], size_key: str, count_key: str) -> List[Dict]:
+    """Groups sorted by absolute size, sizes in KiB."""
+    ordered = sorted(groups.items(), key=lambda item: abs(item[1][size_key]), reverse=True)
+    return [
+        {"group": name, f"{size_key}_kb": round(totals[size_key] / 1024, 1), count_key: totals[count_key]}
+        for name, totals in ordered
+    ]
+
+
+class MemoryTracer:
+    """Controls tracemalloc and keeps a ring of snapshots."""
+
+    def __init__(self, max_snapshots: int = MAX_SNAPSHOTS):
+        self.max_snapshots = max_snapshots
+        self._snapshots: "OrderedDict[str, MemorySnapshot]" = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def start(self, frames: int = 1) -> None:
+        """Start tracing with tracebacks of up to `frames` frames."""
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+
+    def stop(self) -> None:
+        """Stop tracing; stored snapshots are kept."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+    def take(self, label: Optional[str] = None) -> MemorySnapshot:
+        """
+        Take and store a snapshot.
+
+        Raises:
+            RuntimeError: If tracing is not running
+        """
+        if not tracemalloc.is_tracing():
+            raise RuntimeError("Memory tracing is not running")
+        snapshot = MemorySnapshot(f"{int(time.time())}-{next(self._ids)}", tracemalloc.take_snapshot(), label)
+        with self._lock:
+            self._snapshots[snapshot.id] = snapshot
+            while len(self._snapshots) > self.max_snapshots:
+                self._snapshots.popitem(last=False)
+        return snapshot
+
+    def get(self, snapshot_id: str) -> Optional[MemorySnapshot]:
+        return self._snapshots.get(snapshot_id)
+
+    def latest_pair(self) -> Optional[Tuple[MemorySnapshot, MemorySnapshot]]:
+        """The two most recent snapshots, oldest first."""
+        snapshots = list(self._snapshots.values())
+        return (snapshots[-2], snapshots[-1]) if len(snapshots) >= 2 else None
+
+    def list(self) -> List[Dict]:
+        """Stored snapshots, newest first."""
+        return [snapshot.info() for snapshot in reversed(self._snapshots.values())]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._snapshots.clear()
+
+    def stats(self) -> Dict:
+        """Tracing state and tracemalloc's own memory use."""
+        current, peak = tracemalloc.get_traced_memory()
+        return {
+            "tracing": tracemalloc.is_tracing(),
+            "frames": tracemalloc.get_traceback_limit() if tracemalloc.is_tracing() else None,
+            "traced_kb": round(current / 1024, 1),
+            "peak_kb": round(peak / 1024, 1),
+            "overhead_kb": round(tracemalloc.get_tracemalloc_memory() / 1024, 1),
+            "snapshots": len(self._snapshots),
+        }
+
+
+# Global tracer, driven by the admin API
+memory_tracer = MemoryTracer()
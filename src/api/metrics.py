@@ -0,0 +1,185 @@
+"""
+Prometheus metrics in the text exposition format.
+
+Request metrics are recorded by `MetricsMiddleware` on the event loop
+thread only, so updates need no locks: series are created once per
+(method, route) and observations just increment preallocated counters.
+Everything else (database pool, caches, admission control, process and
+garbage collector) is read from existing counters at scrape time.
+"""
+
+import gc
+import os
+import resource
+import time
+from bisect import bisect_left
+from typing import Callable, Dict, Iterable, Iterator, List, Tuple
+
+# Request latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if hasattr(os, "sysconf") else 4096
+_START_TIME = time.time()
+
+Sample = Tuple[str, Dict[str, str], float]
+
+
+def _escape(value: str) -> str:
+    """Escape a label value."""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Dict[str, str]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _RequestSeries:
+    """Counters of one (method, route) pair."""
+
+    __slots__ = ("buckets", "count", "duration", "queries", "db_duration", "statuses")
+
+    def __init__(self):
+        self.buckets = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.count = 0
+        self.duration = 0.0
+        self.queries = 0
+        self.db_duration = 0.0
+        self.statuses: Dict[int, int] = {}
+
+
+class RequestMetrics:
+    """Per-route latency histograms, status counts, query counts and in-flight gauge."""
+
+    def __init__(self):
+        self._series: Dict[Tuple[str, str], _RequestSeries] = {}
+        self.in_flight = 0
+
+    def observe(
+        self, method: str, route: str, status: int, duration: float, queries: int, db_duration: float
+    ) -> None:
+        """Record a finished request."""
+        series = self._series.get((method, route))
+        if series is None:
+            series = self._series[(method, route)] = _RequestSeries()
+        series.buckets[bisect_left(LATENCY_BUCKETS, duration)] += 1
+        series.count += 1
+        series.duration += duration
+        series.queries += queries
+        series.db_duration += db_duration
+        series.statuses[status] = series.statuses.get(status, 0) + 1
+
+    def collect(self) -> Iterator[Tuple[str, str, str, List[Sample]]]:
+        """Yield (name, type, help, samples) families."""
+        series = sorted(self._series.items())
+
+        histogram: List[Sample] = []
+        for (method, route), s in series:
+            cumulative = 0
+            for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), s.buckets):
+                cumulative += count
+                histogram.append((
+                    "http_request_duration_seconds_bucket",
+                    {"method": method, "route": route, "le": _format_value(bound)},
+                    cumulative,
+                ))
+            labels = {"method": method, "route": route}
+            histogram.append(("http_request_duration_seconds_sum", labels, s.duration))
+            histogram.append(("http_request_duration_seconds_count", labels, s.count))
+        yield ("http_request_duration_seconds", "histogram", "Request latency by route", histogram)
+
+        yield ("http_requests_total", "counter", "Finished requests by route and status", [
+            ("http_requests_total", {"method": method, "route": route, "status": str(status)}, count)
+            for (method, route), s in series
+            for status, count in sorted(s.statuses.items())
+        ])
+        yield ("http_requests_in_flight", "gauge", "Requests being processed", [
+            ("http_requests_in_flight", {}, self.in_flight),
+        ])
+        yield ("http_request_db_queries_total", "counter", "SQL statements issued by route", [
+            ("http_request_db_queries_total", {"method": method, "route": route}, s.queries)
+            for (method, route), s in series
+        ])
+        yield ("http_request_db_seconds_total", "counter", "Time spent in SQL statements by route", [
+            ("http_request_db_seconds_total", {"method": method, "route": route}, s.db_duration)
+            for (method, route), s in series
+        ])
+
+
+def _rss_bytes() -> float:
+    """Resident set size of this process."""
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * _PAGE_SIZE
+    except OSError:
+        # Peak RSS is the best portable approximation (KiB on Linux, bytes on macOS)
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+
+
+def collect_process() -> Iterator[Tuple[str, str, str, List[Sample]]]:
+    """Process memory, CPU and garbage collector metrics."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    yield ("process_resident_memory_bytes", "gauge", "Resident memory size", [
+        ("process_resident_memory_bytes", {}, _rss_bytes()),
+    ])
+    yield ("process_cpu_seconds_total", "counter", "User and system CPU time", [
+        ("process_cpu_seconds_total", {}, usage.ru_utime + usage.ru_stime),
+    ])
+    yield ("process_start_time_seconds", "gauge", "Start time since the epoch", [
+        ("process_start_time_seconds", {}, _START_TIME),
+    ])
+    stats = gc.get_stats()
+    yield ("python_gc_collections_total", "counter", "Garbage collections by generation", [
+        ("python_gc_collections_total", {"generation": str(i)}, s["collections"]) for i, s in enumerate(stats)
+    ])
+    yield ("python_gc_objects_collected_total", "counter", "Objects collected by generation", [
+        ("python_gc_objects_collected_total", {"generation": str(i)}, s["collected"]) for i, s in enumerate(stats)
+    ])
+    yield ("python_gc_objects_uncollectable_total", "counter", "Uncollectable objects by generation", [
+        ("python_gc_objects_uncollectable_total", {"generation": str(i)}, s["uncollectable"])
+        for i, s in enumerate(stats)
+    ])
+    yield ("python_gc_tracked_objects", "gauge", "Allocations since the last collection by generation", [
+        ("python_gc_tracked_objects", {"generation": str(i)}, count) for i, count in enumerate(gc.get_count())
+    ])
+
+
+class MetricsRegistry:
+    """Collects metric families from registered collectors and renders them."""
+
+    def __init__(self):
+        self._collectors: List[Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]] = []
+
+    def register(self, collector: Callable[[], Iterable[Tuple[str, str, str, List[Sample]]]]) -> None:
+        """Add a callable yielding (name, type, help, samples) families."""
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render all metrics in the Prometheus text format."""
+        lines = []
+        for collector in self._collectors:
+            for name, kind, help_text, samples in collector():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for sample_name, labels, value in samples:
+                    lines.append(f"{sample_name}{_format_labels(labels)} {_format_value(value)}")
+        lines.append("")
+        return "\n".join(lines)
+
+
+# Global instances, fed by MetricsMiddleware and exposed at /metrics
+request_metrics = RequestMetrics()
+registry = MetricsRegistry()
+registry.register(request_metrics.collect)
+registry.register(collect_process)
@@ -1,14 +1,31 @@
 """
 Error handling middleware and exception handlers.
-Provides centralized error handling for the API.
+Provides centralized error handling, admission control, SQL query
+accounting, request metrics, tracing and on-demand profiling for the API.
 """
 
+import asyncio
+import logging
+import math
+import time
+from collections import deque
+from contextlib import nullcontext
+from typing import Dict, Optional
+
 from fastapi import Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
 
+from src.api.auth import is_admin
+from src.api.config import get_settings
+from src.api.metrics import RequestMetrics, request_metrics
+from src.api.profiler import ProfileStore, RequestProfile, StackSampler, profile_store
 from src.api.schemas.common import APIError, ErrorResponse
+from src.query_stats import current_queries, track_queries
+from src.tracing import configure_tracing, finish_request_span, request_span
+
+logger = logging.getLogger(__name__)
 
 
 async def api_error_handler(request: Request, exc: APIError) -> JSONResponse:
@@ -115,3 +132,467 @@ def register_exception_handlers(app):
                 detail=None
             ).model_dump()
         )
+
+
+# Route classes for admission control
+ROUTE_READ = "read"
+ROUTE_HEAVY = "heavy"
+ROUTE_WRITE = "write"
+
+# Paths (below the API prefix) that compute a lot per request
+HEAVY_PATHS = ("/menu", "/dishes/batch")
+
+# Paths that bypass admission control: long-lived streams and diagnostics
+EXEMPT_PATHS = ("/events", "/admin")
+
+# Weight of the newest sample in the service time moving average
+SERVICE_TIME_ALPHA = 0.2
+
+
+class Overloaded(Exception):
+    """Raised when a request cannot be admitted within the queue budget."""
+
+    def __init__(self, retry_after: float):
+        self.retry_after = retry_after
+
+
+class AdmissionLimiter:
+    """
+    Concurrency limit with a FIFO queue and a queueing deadline.
+
+    A request that would have to wait longer than the budget (estimated
+    from the queue length and the average service time) is rejected at
+    once; a queued request whose deadline passes is rejected as well.
+    """
+
+    def __init__(self, name: str, limit: int, max_queue_seconds: float):
+        self.name = name
+        self.limit = limit
+        self.max_queue_seconds = max_queue_seconds
+        self.in_flight = 0
+        self._waiters: deque = deque()
+        self.service_time = 0.0
+        self.admitted = 0
+        self.queued_total = 0
+        self.max_queued = 0
+        self.shed = 0
+
+    @property
+    def queued(self) -> int:
+        """Requests currently waiting for a slot."""
+        return len(self._waiters)
+
+    def estimated_wait(self) -> float:
+        """Expected queueing time for a request arriving now, in seconds."""
+        return (self.queued + 1) * self.service_time / self.limit
+
+    async def acquire(self) -> None:
+        """
+        Wait for a slot.
+
+        Raises:
+            Overloaded: If the request cannot be admitted within the budget
+        """
+        if self.in_flight < self.limit and not self._waiters:
+            self.in_flight += 1
+            self.admitted += 1
+            return
+
+        wait = self.estimated_wait()
+        if wait > self.max_queue_seconds:
+            self.shed += 1
+            raise Overloaded(wait)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.queued_total += 1
+        self.max_queued = max(self.max_queued, len(self._waiters))
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), self.max_queue_seconds)
+        except asyncio.TimeoutError:
+            pass
+        except BaseException:
+            # The client went away while queued; pass on a slot it was handed
+            if waiter.done():
+                self._hand_off()
+            else:
+                self._abandon(waiter)
+            raise
+
+        if not waiter.done():
+            self._abandon(waiter)
+            self.shed += 1
+            raise Overloaded(self.estimated_wait())
+        self.admitted += 1
+
+    def release(self, elapsed: float) -> None:
+        """Free a slot after a request taking `elapsed` seconds finished."""
+        self.service_time += SERVICE_TIME_ALPHA * (elapsed - self.service_time)
+        self._hand_off()
+
+    def _hand_off(self) -> None:
+        """Give a freed slot to the oldest waiter, or return it."""
+        if self._waiters:
+            # The slot passes to the waiter, so in_flight is unchanged
+            self._waiters.popleft().set_result(None)
+        else:
+            self.in_flight -= 1
+
+    def _abandon(self, waiter: asyncio.Future) -> None:
+        """Remove a waiter that gave up before getting a slot."""
+        waiter.cancel()
+        self._waiters.remove(waiter)
+
+    def stats(self) -> Dict:
+        """Limiter counters."""
+        return {
+            "limit": self.limit,
+            "in_flight": self.in_flight,
+            "queued": self.queued,
+            "max_queued": self.max_queued,
+            "admitted": self.admitted,
+            "queued_total": self.queued_total,
+            "shed": self.shed,
+            "avg_service_ms": round(self.service_time * 1000, 2),
+        }
+
+
+class AdmissionController:
+    """Classifies requests into route classes and owns their limiters."""
+
+    def __init__(self, api_prefix: str, limits: Dict[str, int], max_queue_seconds: float):
+        """
+        Initialize the controller.
+
+        Args:
+            api_prefix: Prefix of API routes; other paths are not limited
+            limits: Concurrent request limit per route class; 0 disables a class
+            max_queue_seconds: Longest time a request may wait for a slot
+        """
+        self.api_prefix = api_prefix
+        self.limiters = {
+            name: AdmissionLimiter(name, limit, max_queue_seconds)
+            for name, limit in limits.items()
+            if limit > 0
+        }
+
+    def classify(self, method: str, path: str) -> Optional[str]:
+        """Route class of a request, or None if it is not limited."""
+        if not path.startswith(self.api_prefix):
+            return None
+        path = path[len(self.api_prefix):]
+        if path.startswith(EXEMPT_PATHS):
+            return None
+        if path.startswith(HEAVY_PATHS):
+            return ROUTE_HEAVY
+        if method in ("GET", "HEAD", "OPTIONS"):
+            return ROUTE_READ
+        return ROUTE_WRITE
+
+    def stats(self) -> Dict[str, Dict]:
+        """Counters of every route class."""
+        return {name: limiter.stats() for name, limiter in self.limiters.items()}
+
+
+def _create_admission_controller() -> AdmissionController:
+    """Build the admission controller from settings."""
+    settings = get_settings()
+    return AdmissionController(
+        api_prefix=settings.api_prefix,
+        limits={
+            ROUTE_READ: settings.admission_read_limit,
+            ROUTE_HEAVY: settings.admission_heavy_limit,
+            ROUTE_WRITE: settings.admission_write_limit,
+        },
+        max_queue_seconds=settings.admission_max_queue_ms / 1000,
+    )
+
+
+# Global controller, shared by the middleware and the admin endpoints
+admission_controller = _create_admission_controller()
+
+
+class AdmissionControlMiddleware:
+    """
+    ASGI middleware that caps in-flight requests per route class.
+
+    Requests over the limit queue until a slot frees up or their queueing
+    deadline passes; requests that cannot be served in time get
+    503 Service Unavailable with a Retry-After header.
+    """
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        route_class = self.controller.classify(scope["method"], scope["path"])
+        limiter = self.controller.limiters.get(route_class)
+        if limiter is None:
+            await self.app(scope, receive, send)
+            return
+
+        try:
+            await limiter.acquire()
+        except Overloaded as exc:
+            await _overloaded_response(route_class, exc.retry_after)(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            limiter.release(time.perf_counter() - started)
+
+
+def _overloaded_response(route_class: str, retry_after: float) -> JSONResponse:
+    """Build the 503 response for a shed request."""
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content=ErrorResponse(
+            status="error",
+            error="Service overloaded",
+            detail=f"Too many concurrent {route_class} requests, retry later"
+        ).model_dump(),
+        headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+    )
+
+
+def register_admission_control(app) -> None:
+    """Add admission control middleware to the FastAPI app if enabled."""
+    if get_settings().admission_control:
+        app.add_middleware(AdmissionControlMiddleware, controller=admission_controller)
+
+
+class QueryStatsMiddleware:
+    """
+    ASGI middleware that reports the SQL work of each request.
+
+    Adds `X-DB-Queries` and `Server-Timing` (database and total time)
+    headers covering queries issued before the response starts, and logs
+    requests whose query count exceeds the budget.
+    """
+
+    def __init__(self, app, budget: int = 0):
+        self.app = app
+        self.budget = budget
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        with track_queries() as stats:
+            async def send_with_stats(message):
+                if message["type"] == "http.response.start":
+                    total_ms = (time.perf_counter() - started) * 1000
+                    headers = list(message.get("headers", []))
+                    headers.append((b"x-db-queries", str(stats.count).encode()))
+                    headers.append((
+                        b"server-timing",
+                        f'db;dur={stats.duration_ms:.2f};desc="{stats.count} queries", '
+                        f"app;dur={total_ms:.2f}".encode(),
+                    ))
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_with_stats)
+
+        if self.budget and stats.count > self.budget:
+            logger.warning(
+                "%s %s issued %d SQL queries (budget %d, %.1f ms)",
+                scope["method"], scope["path"], stats.count, self.budget, stats.duration_ms,
+            )
+
+
+def register_query_stats(app) -> None:
+    """Add SQL query accounting middleware to the FastAPI app if enabled."""
+    settings = get_settings()
+    if settings.query_stats:
+        app.add_middleware(QueryStatsMiddleware, budget=settings.query_budget)
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware that records request metrics by route template.
+
+    Uses the query stats of QueryStatsMiddleware when it runs outside this
+    middleware and tracks queries itself otherwise.
+    """
+
+    def __init__(self, app, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        stats = current_queries()
+        started = time.perf_counter()
+        self.metrics.in_flight += 1
+        tracking = nullcontext(stats) if stats is not None else track_queries()
+        try:
+            with tracking as stats:
+                await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_flight -= 1
+            self.metrics.observe(
+                scope["method"],
+                _route_template(scope),
+                status_code,
+                time.perf_counter() - started,
+                stats.count,
+                stats.duration,
+            )
+
+
+def _route_template(scope) -> str:
+    """Path template of the matched route, e.g. /api/dishes/{dish_id}."""
+    # Routes of included routers keep their own path; the full one is
+    # recorded in the effective route context where FastAPI provides it
+    context = scope.get("fastapi", {}).get("effective_route_context")
+    if context is not None:
+        return context.path
+    route = scope.get("route")
+    return route.path if route is not None else "unmatched"
+
+
+def register_metrics(app) -> None:
+    """Add request metrics middleware to the FastAPI app if enabled."""
+    if get_settings().metrics:
+        app.add_middleware(MetricsMiddleware, metrics=request_metrics)
+
+
+class ProfilerMiddleware:
+    """
+    ASGI middleware that profiles requests carrying `X-Profile: 1`.
+
+    Only admins may trigger profiling (see `is_admin`); the header is
+    ignored otherwise. The profile is stored and its ID returned in the
+    `X-Profile-Id` response header. Untriggered requests only pay for a
+    scan of the request headers.
+    """
+
+    def __init__(self, app, store: ProfileStore, interval: float):
+        self.app = app
+        self.store = store
+        self.interval = interval
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        triggered = False
+        token = None
+        for name, value in scope["headers"]:
+            if name == b"x-profile":
+                triggered = value not in (b"", b"0")
+            elif name == b"x-admin-token":
+                token = value.decode("latin-1")
+        if not triggered or not is_admin(token):
+            await self.app(scope, receive, send)
+            return
+
+        profile = RequestProfile(
+            self.store.new_id(), scope["method"], scope["path"],
+            scope.get("query_string", b"").decode("latin-1"), self.interval,
+        )
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                profile.status = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"x-profile-id", profile.id.encode()))
+                message = {**message, "headers": headers}
+            await send(message)
+
+        sampler = StackSampler(self.interval)
+        started = time.perf_counter()
+        sampler.start()
+        try:
+            with track_queries(keep_statements=True) as stats:
+                await self.app(scope, receive, send_with_id)
+        finally:
+            sampler.stop()
+            profile.duration = time.perf_counter() - started
+            profile.samples = sampler.samples
+            profile.stacks = sampler.stacks
+            profile.queries = stats.count
+            profile.db_duration = stats.duration
+            profile.statements = stats.statements
+            self.store.add(profile)
+
+
+def register_profiler(app) -> None:
+    """Add the on-demand profiler middleware to the FastAPI app if enabled."""
+    settings = get_settings()
+    if settings.profiling:
+        app.add_middleware(
+            ProfilerMiddleware,
+            store=profile_store,
+            interval=settings.profile_interval_ms / 1000,
+        )
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware that runs each request in a server span.
+
+    The span is named after the route template once routing is done;
+    service, repository and SQL spans of the request nest under it.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with request_span(scope) as current:
+            if current is None:
+                await self.app(scope, receive, send)
+                return
+
+            status_code = 500
+
+            async def send_with_status(message):
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_status)
+            finally:
+                finish_request_span(current, _route_template(scope), status_code)
+
+
+def register_tracing(app) -> None:
+    """Configure span export and add tracing middleware if enabled."""
+    settings = get_settings()
+    if configure_tracing(
+        settings.tracing_exporter,
+        sample_rate=settings.tracing_sample_rate,
+        file_path=settings.tracing_file,
+        otlp_endpoint=settings.tracing_otlp_endpoint,
+        service_name=settings.app_name,
+    ):
+        app.add_middleware(TracingMiddleware)
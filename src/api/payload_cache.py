@@ -0,0 +1,150 @@
+"""
+In-memory cache of serialized, precompressed response payloads.
+
+Entries hold the identity body together with its gzip and (when the
+brotli package is installed) brotli encodings. The cache is bounded by
+total payload bytes and evicts least recently used entries first.
+"""
+
+import gzip
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Dict, Hashable, Optional
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+# Bodies smaller than this are not worth compressing
+MIN_COMPRESS_SIZE = 1024
+
+# Approximate bookkeeping overhead per entry, in bytes
+ENTRY_OVERHEAD = 256
+
+
+@dataclass
+class CachedPayload:
+    """Serialized response body in every supported encoding."""
+    identity: bytes
+    gzip: Optional[bytes] = None
+    br: Optional[bytes] = None
+
+    @classmethod
+    def build(cls, body: bytes) -> "CachedPayload":
+        """Precompress a serialized body."""
+        if len(body) < MIN_COMPRESS_SIZE:
+            return cls(identity=body)
+        return cls(
+            identity=body,
+            gzip=gzip.compress(body, compresslevel=6),
+            br=brotli.compress(body, quality=5) if brotli is not None else None,
+        )
+
+    @property
+    def size(self) -> int:
+        """Total bytes held by this entry."""
+        return (
+            ENTRY_OVERHEAD
+            + len(self.identity)
+            + len(self.gzip or b"")
+            + len(self.br or b"")
+        )
+
+    def encoded(self, accept_encoding: Optional[str]) -> tuple:
+        """
+        Pick the best available encoding for an Accept-Encoding header.
+
+        Returns:
+            Tuple of (body, content encoding or None)
+        """
+        accepted = parse_accept_encoding(accept_encoding)
+        if self.br is not None and accepted.get("br", 0) > 0:
+            return self.br, "br"
+        if self.gzip is not None and accepted.get("gzip", 0) > 0:
+            return self.gzip, "gzip"
+        return self.identity, None
+
+
+def parse_accept_encoding(header: Optional[str]) -> Dict[str, float]:
+    """Parse an Accept-Encoding header into {coding: q-value}."""
+    accepted = {}
+    if not header:
+        return accepted
+    for item in header.split(","):
+        coding, _, params = item.strip().partition(";")
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        accepted[coding.strip().lower()] = q
+    return accepted
+
+
+class PayloadCache:
+    """Byte-bounded LRU cache of precompressed payloads."""
+
+    def __init__(self, max_bytes: int):
+        """
+        Initialize the cache.
+
+        Args:
+            max_bytes: Upper bound for the total size of cached entries
+        """
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Hashable, CachedPayload]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[CachedPayload]:
+        """Get a payload and mark it as recently used."""
+        with self._lock:
+            payload = self._entries.get(key)
+            if payload is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return payload
+
+    def put(self, key: Hashable, payload: CachedPayload) -> None:
+        """Store a payload, evicting least recently used entries as needed."""
+        if payload.size > self.max_bytes:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.size -= previous.size
+            self._entries[key] = payload
+            self.size += payload.size
+            while self.size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self.size -= evicted.size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, int]:
+        """Cache counters."""
+        return {
+            "entries": len(self._entries),
+            "bytes": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+        }
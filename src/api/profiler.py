@@ -0,0 +1,197 @@
+"""
+On-demand sampling profiler for single requests.
+
+A request carrying `X-Profile: 1` (from an admin, see `ProfilerMiddleware`)
+is profiled by a background thread that samples the stacks of all threads
+running application code every few milliseconds. Sampling rather than
+cProfile covers the threadpool work a request starts (catalog and menu
+builds run there) and keeps the overhead independent of call counts.
+
+Profiles are kept in a small in-memory ring together with the SQL the
+request issued, and can be fetched from the admin API as a summary,
+collapsed stacks (flamegraph.pl, speedscope) or speedscope JSON. Other
+requests running concurrently may contribute samples, so profile on a
+quiet instance where possible.
+"""
+
+import itertools
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+# Only stacks passing through these files are kept
+APP_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Profiles kept for the admin API
+MAX_PROFILES = 20
+# Functions listed in the summary
+SUMMARY_TOP = 30
+
+# (file, first line, function name)
+Frame = Tuple[str, int, str]
+
+
+class StackSampler:
+    """Samples the stacks of other threads at a fixed interval."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name="request-profiler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            self.samples += 1
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append((code.co_filename, code.co_firstlineno, code.co_name))
+                    in_app = in_app or code.co_filename.startswith(APP_ROOT)
+                    frame = frame.f_back
+                if in_app:
+                    stack.reverse()
+                    self.stacks[tuple(stack)] += 1
+
+
+def _frame_name(frame: Frame) -> str:
+    filename, line, name = frame
+    if filename.startswith(APP_ROOT):
+        filename = os.path.relpath(filename, os.path.dirname(APP_ROOT))
+    else:
+        filename = os.path.basename(filename)
+    return f"{name} ({filename}:{line})"
+
+
+class RequestProfile:
+    """Samples and SQL of one profiled request."""
+
+    def __init__(self, profile_id: str, method: str, path: str, query: str, interval: float):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.query = query
+        self.interval = interval
+        self.started_at = time.time()
+        self.duration = 0.0
+        self.status: Optional[int] = None
+        self.samples = 0
+        self.stacks: Counter = Counter()
+        self.queries = 0
+        self.db_duration = 0.0
+        self.statements: List[str] = []
+
+    def info(self) -> Dict:
+        """Short description used in listings."""
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path + (f"?{self.query}" if self.query else ""),
+            "status": self.status,
+            "started_at": self.started_at,
+            "duration_ms": round(self.duration * 1000, 3),
+            "samples": self.samples,
+            "interval_ms": self.interval * 1000,
+            "queries": self.queries,
+            "db_ms": round(self.db_duration * 1000, 3),
+        }
+
+    def summary(self) -> Dict:
+        """Hottest functions by own and inclusive samples, and the SQL issued."""
+        own: Counter = Counter()
+        inclusive: Counter = Counter()
+        for stack, count in self.stacks.items():
+            own[stack[-1]] += count
+            for frame in set(stack):
+                inclusive[frame] += count
+        total = sum(self.stacks.values()) or 1
+
+        def top(counter: Counter) -> List[Dict]:
+            return [
+                {"function": _frame_name(frame), "samples": count, "percent": round(count * 100 / total, 1)}
+                for frame, count in counter.most_common(SUMMARY_TOP)
+            ]
+
+        return {**self.info(), "self": top(own), "total": top(inclusive), "sql": self.statements}
+
+    def collapsed(self) -> str:
+        """Stacks in the collapsed format: `frame;frame;frame count` per line."""
+        return "\n".join(
+            ";".join(_frame_name(frame) for frame in stack) + f" {count}"
+            for stack, count in sorted(self.stacks.items())
+        ) + "\n"
+
+    def speedscope(self) -> Dict:
+        """Samples in the speedscope file format."""
+        frames: Dict[Frame, int] = {}
+        samples, weights = [], []
+        for stack, count in self.stacks.items():
+            samples.append([frames.setdefault(frame, len(frames)) for frame in stack])
+            weights.append(count * self.interval * 1000)
+        return {
+            "$schema": "https://www.speedscope.app/file-format-schema.json",
+            "name": f"{self.method} {self.path}",
+            "exporter": "menu-api request profiler",
+            "activeProfileIndex": 0,
+            "shared": {
+                "frames": [
+                    {"name": name, "file": filename, "line": line}
+                    for (filename, line, name) in frames
+                ],
+            },
+            "profiles": [{
+                "type": "sampled",
+                "name": f"{self.method} {self.path}",
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": round(self.duration * 1000, 3),
+                "samples": samples,
+                "weights": weights,
+            }],
+        }
+
+
+class ProfileStore:
+    """Ring of the most recent request profiles."""
+
+    def __init__(self, max_profiles: int = MAX_PROFILES):
+        self.max_profiles = max_profiles
+        self._profiles: "OrderedDict[str, RequestProfile]" = OrderedDict()
+        self._ids = itertools.count(1)
+
+    def new_id(self) -> str:
+        return f"{int(time.time())}-{next(self._ids)}"
+
+    def add(self, profile: RequestProfile) -> None:
+        self._profiles[profile.id] = profile
+        while len(self._profiles) > self.max_profiles:
+            self._profiles.popitem(last=False)
+
+    def get(self, profile_id: str) -> Optional[RequestProfile]:
+        return self._profiles.get(profile_id)
+
+    def list(self) -> List[Dict]:
+        """Stored profiles, newest first."""
+        return [profile.info() for profile in reversed(self._profiles.values())]
+
+
+# Global store, filled by ProfilerMiddleware and read by the admin API
+profile_store = ProfileStore()
@@ -0,0 +1,53 @@
+"""
+Sparse fieldsets for catalog listings (`?fields=id,name`).
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from src.api.schemas import BadRequestError
+
+# Fields of listing rows, in response order
+DISH_FIELDS = ("id", "name", "weight_g", "energy_kcal", "protein_g", "fat_g", "carbohydrates_g")
+INGREDIENT_FIELDS = ("id", "name", "nutrition")
+
+# Fields stored as plain columns; anything else has to be computed
+STORED_FIELDS = frozenset({"id", "name"})
+
+
+def parse_fields(fields: Optional[str], allowed: Tuple[str, ...]) -> Optional[Tuple[str, ...]]:
+    """
+    Parse a comma-separated `fields` query parameter.
+
+    Args:
+        fields: Raw parameter value
+        allowed: Fields the listing can return
+
+    Returns:
+        Requested fields in canonical order, or None for the full rows
+
+    Raises:
+        BadRequestError: If an unknown field is requested
+    """
+    if not fields:
+        return None
+    requested = {name.strip() for name in fields.split(",") if name.strip()}
+    unknown = requested.difference(allowed)
+    if unknown:
+        raise BadRequestError(
+            f"Unknown fields: {', '.join(sorted(unknown))}. Allowed: {', '.join(allowed)}"
+        )
+    if not requested or requested == set(allowed):
+        return None
+    return tuple(name for name in allowed if name in requested)
+
+
+def needs_computed(fieldset: Optional[Tuple[str, ...]]) -> bool:
+    """Check whether a fieldset asks for anything beyond stored columns."""
+    return fieldset is None or not STORED_FIELDS.issuperset(fieldset)
+
+
+def project(rows: Iterable[Dict], fieldset: Optional[Tuple[str, ...]]) -> List[Dict]:
+    """Keep only the requested fields of each row."""
+    if fieldset is None:
+        return list(rows)
+    return [{name: row[name] for name in fieldset} for row in rows]
@@ -3,6 +3,9 @@ from .dishes import router as dishes_router
 from .ingredients import router as ingredients_router
 from .goals import router as goals_router
 from .menu import router as menu_router
+from .admin import router as admin_router
+from .events import router as events_router
+from .search import router as search_router
 
 # Main API router that includes all sub-routers
 api_router = APIRouter()
@@ -11,5 +14,8 @@ api_router.include_router(dishes_router)
 api_router.include_router(ingredients_router)
 api_router.include_router(goals_router)
 api_router.include_router(menu_router)
+api_router.include_router(admin_router)
+api_router.include_router(events_router)
+api_router.include_router(search_router)
 
 __all__ = ["api_router"]
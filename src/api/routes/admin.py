@@ -0,0 +1,230 @@
+"""
+Admin API routes.
+Exposes runtime diagnostics; requires the admin token.
+"""
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Query, Response
+
+from src.api.auth import is_admin
+from src.api.broadcaster import broadcaster
+from src.api.memory import memory_tracer
+from src.api.middleware import admission_controller
+from src.api.profiler import profile_store
+from src.api.schemas import BadRequestError, ForbiddenError, NotFoundError, SuccessResponse
+from src.api.serialization import dumps
+from src.api.single_flight import single_flight
+from src.api.slow_queries import slow_query_log
+from src.services.catalog_snapshot import catalog_snapshot
+from src.services.composition_index import composition_index
+from src.services.ingredient_autocomplete import ingredient_autocomplete
+from src.services.name_search import name_search
+
+
+def require_admin(x_admin_token: str = Header(None)) -> None:
+    """
+    Dependency that guards admin endpoints.
+    
+    Raises:
+        ForbiddenError: If no admin token is configured or it does not match
+    """
+    if not is_admin(x_admin_token):
+        raise ForbiddenError("Admin access required")
+
+
+router = APIRouter(prefix="/admin", tags=["admin"], dependencies=[Depends(require_admin)])
+
+
+@router.get("/single-flight")
+async def get_single_flight_stats():
+    """
+    Get single-flight counters and per-key waiter counts.
+    
+    Returns executed and coalesced computation counts and the keys
+    currently in flight with the number of requests waiting on each.
+    """
+    return single_flight.stats()
+
+
+@router.get("/events")
+async def get_event_stats():
+    """
+    Get change feed counters.
+    
+    Returns connected subscribers, published change events and the number
+    of slow subscribers that were dropped.
+    """
+    return broadcaster.stats()
+
+
+@router.get("/admission")
+async def get_admission_stats():
+    """
+    Get admission control counters per route class.
+    
+    Returns the limit, in-flight and queued requests, queue high-water
+    mark, admitted and shed counts and the average service time.
+    """
+    return admission_controller.stats()
+
+
+@router.get("/snapshot")
+async def get_snapshot_stats():
+    """
+    Get details of the shared catalog snapshot.
+    
+    Returns the mapped file's version, size and record counts.
+    """
+    return catalog_snapshot.stats()
+
+
+@router.get("/indexes")
+async def get_index_stats():
+    """
+    Get the state of the in-memory catalog indexes.
+    
+    Returns per index whether it is built, the catalog version it
+    reflects, rebuild and applied event counts and its size.
+    """
+    return {
+        "name_search": name_search.stats(),
+        "ingredient_autocomplete": ingredient_autocomplete.stats(),
+        "composition_index": composition_index.stats(),
+    }
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    List stored request profiles, newest first.
+    
+    Profile a request by sending it with the `X-Profile: 1` header; the
+    response carries the profile ID in `X-Profile-Id`.
+    """
+    return profile_store.list()
+
+
+@router.get("/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: str = Query("summary", pattern="^(summary|collapsed|speedscope)$"),
+):
+    """
+    Get a stored request profile.
+    
+    Formats: `summary` (hottest functions and the SQL issued), `collapsed`
+    (stacks for flamegraph.pl or speedscope) and `speedscope` (JSON for
+    https://www.speedscope.app).
+    """
+    profile = profile_store.get(profile_id)
+    if profile is None:
+        raise NotFoundError("Profile", profile_id)
+    if format == "collapsed":
+        return Response(profile.collapsed(), media_type="text/plain")
+    if format == "speedscope":
+        return Response(
+            dumps(profile.speedscope()),
+            media_type="application/json",
+            headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.speedscope.json"'},
+        )
+    return profile.summary()
+
+
+@router.get("/slow-queries")
+async def list_slow_queries(limit: int = Query(50, ge=1, le=1000)):
+    """
+    List recent slow SQL statements, newest first.
+    
+    Each entry carries the statement, its parameters and duration, the
+    repository method that issued it and, for sampled SELECTs, the plan.
+    """
+    return {**slow_query_log.stats(), "queries": slow_query_log.recent(limit)}
+
+
+@router.delete("/slow-queries", response_model=SuccessResponse)
+async def clear_slow_queries():
+    """Clear the slow query log."""
+    slow_query_log.clear()
+    return SuccessResponse(message="Slow query log cleared")
+
+
+@router.get("/memory")
+async def get_memory_stats():
+    """
+    Get memory tracing state, traced and peak sizes and stored snapshots.
+    """
+    return {**memory_tracer.stats(), "snapshot_list": memory_tracer.list()}
+
+
+@router.post("/memory/start")
+async def start_memory_tracing(frames: int = Query(1, ge=1, le=50)):
+    """
+    Start tracing allocations with tracemalloc.
+    
+    More traceback frames attribute allocations better but cost more;
+    tracing slows the service down until stopped.
+    """
+    memory_tracer.start(frames)
+    return memory_tracer.stats()
+
+
+# Snapshots, reports, diffs and dropping the traces take seconds on a large
+# heap; these routes are plain functions so they run in the threadpool
+# instead of stalling the event loop
+@router.post("/memory/stop")
+def stop_memory_tracing():
+    """Stop tracing allocations; stored snapshots are kept."""
+    memory_tracer.stop()
+    return memory_tracer.stats()
+
+
+@router.post("/memory/snapshots")
+def take_memory_snapshot(label: Optional[str] = None, limit: int = Query(25, ge=1, le=500)):
+    """
+    Take a snapshot and return its top allocation sites and module groups.
+    
+    Raises:
+        BadRequestError: If tracing is not running
+    """
+    try:
+        snapshot = memory_tracer.take(label)
+    except RuntimeError as exc:
+        raise BadRequestError(str(exc))
+    return snapshot.report(limit)
+
+
+@router.get("/memory/snapshots/{snapshot_id}")
+def get_memory_snapshot(snapshot_id: str, limit: int = Query(25, ge=1, le=500)):
+    """Get the top allocation sites and module groups of a stored snapshot."""
+    snapshot = memory_tracer.get(snapshot_id)
+    if snapshot is None:
+        raise NotFoundError("Snapshot", snapshot_id)
+    return snapshot.report(limit)
+
+
+@router.get("/memory/diff")
+def diff_memory_snapshots(
+    base: Optional[str] = None,
+    target: Optional[str] = None,
+    limit: int = Query(25, ge=1, le=500),
+):
+    """
+    Compare two snapshots: allocation growth by site and module group.
+    
+    Defaults to the two most recent snapshots.
+    """
+    if base is None and target is None:
+        pair = memory_tracer.latest_pair()
+        if pair is None:
+            raise BadRequestError("At least two snapshots are needed for a diff")
+        base_snapshot, target_snapshot = pair
+    else:
+        if base is None or target is None:
+            raise BadRequestError("Give both base and target snapshot IDs, or neither")
+        base_snapshot, target_snapshot = memory_tracer.get(base), memory_tracer.get(target)
+        if base_snapshot is None:
+            raise NotFoundError("Snapshot", base)
+        if target_snapshot is None:
+            raise NotFoundError("Snapshot", target)
+    return target_snapshot.compare(base_snapshot, limit)
@@ -3,14 +3,15 @@ Dish API routes.
 Uses repository pattern for data access.
 """
 
-from fastapi import APIRouter, Depends, Query
-from typing import List
+from fastapi import APIRouter, Depends, Query, Request, Response
+from typing import Dict, List, Optional, Tuple
 
 from sqlalchemy.orm import Session
 
 from src.api.schemas import (
     DishResponse,
     DishDetailResponse,
+    DishBatchRequest,
     DishCreate,
     DishUpdate,
     SuccessResponse,
@@ -18,11 +19,22 @@ from src.api.schemas import (
     BadRequestError,
     ConflictError,
 )
-from src.database import get_db
+from src.api.caching import (
+    catalog_etag,
+    catalog_response,
+    cache_headers,
+    etag_matches,
+    not_modified,
+)
+from src.api.projection import DISH_FIELDS, needs_computed, parse_fields, project
+from src.api.serialization import FastJSONRoute, trusted_response
+from src.api.single_flight import single_flight
+from src.database import get_db, with_own_session
 from src.repositories import DishRepository, IngredientRepository
+from src.services.composition_index import composition_index
 from src.services.nutrition_service import NutritionService
 
-router = APIRouter(prefix="/dishes", tags=["dishes"])
+router = APIRouter(prefix="/dishes", tags=["dishes"], route_class=FastJSONRoute)
 
 
 def get_dish_repository(db: Session = Depends(get_db)) -> DishRepository:
@@ -35,41 +47,170 @@ def get_ingredient_repository(db: Session = Depends(get_db)) -> IngredientReposi
     return IngredientRepository(db)
 
 
+def _nutrition_ranges(
+    kcal_min: Optional[float],
+    kcal_max: Optional[float],
+    protein_min: Optional[float],
+    protein_max: Optional[float],
+    fat_min: Optional[float],
+    fat_max: Optional[float],
+    carbs_min: Optional[float],
+    carbs_max: Optional[float],
+) -> Dict[str, Tuple[Optional[float], Optional[float]]]:
+    """Nutrition range filters by key, leaving out unbounded ones."""
+    return {
+        key: bounds
+        for key, bounds in (
+            ("kcal", (kcal_min, kcal_max)),
+            ("protein", (protein_min, protein_max)),
+            ("fat", (fat_min, fat_max)),
+            ("carbs", (carbs_min, carbs_max)),
+        )
+        if bounds != (None, None)
+    }
+
+
 @router.get("", response_model=List[DishResponse])
 async def get_dishes(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Maximum number of records"),
-    repo: DishRepository = Depends(get_dish_repository),
-    ing_repo: IngredientRepository = Depends(get_ingredient_repository),
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. id,name"),
+    sort: str = Query("name", description="Sort key: name, weight, kcal, protein, fat, carbs or *_density, with _asc/_desc"),
+    kcal_min: float = Query(None, ge=0, description="Minimum energy, kcal"),
+    kcal_max: float = Query(None, ge=0, description="Maximum energy, kcal"),
+    protein_min: float = Query(None, ge=0, description="Minimum protein, g"),
+    protein_max: float = Query(None, ge=0, description="Maximum protein, g"),
+    fat_min: float = Query(None, ge=0, description="Minimum fat, g"),
+    fat_max: float = Query(None, ge=0, description="Maximum fat, g"),
+    carbs_min: float = Query(None, ge=0, description="Minimum carbohydrates, g"),
+    carbs_max: float = Query(None, ge=0, description="Maximum carbohydrates, g"),
+    db: Session = Depends(get_db),
 ):
     """
     Get all dishes with calculated nutrition.
     
-    Supports pagination with skip and limit parameters.
+    Supports pagination with skip and limit, nutrition range filters,
+    sorting by name, totals or per-100g densities (e.g. `protein_desc`,
+    `protein_density_desc`) and sparse fieldsets via `fields`. Filtering,
+    sorting and paging run in the database against precomputed columns.
+    Served from the precompressed payload cache; answers 304 when
+    If-None-Match matches the current catalog ETag.
+    
+    Raises:
+        BadRequestError: If an unknown field or sort key is requested
     """
-    nutrition_service = NutritionService(repo, ing_repo)
-    return nutrition_service.get_dishes_with_nutrition(skip=skip, limit=limit)
+    fieldset = parse_fields(fields, DISH_FIELDS)
+    try:
+        DishRepository.parse_sort(sort)
+    except ValueError as e:
+        raise BadRequestError(str(e))
+    ranges = _nutrition_ranges(
+        kcal_min, kcal_max, protein_min, protein_max, fat_min, fat_max, carbs_min, carbs_max
+    )
+    def build(session: Session):
+        repo = DishRepository(session)
+        if needs_computed(fieldset):
+            nutrition_service = NutritionService(repo, IngredientRepository(session))
+            dishes = nutrition_service.get_dishes_with_nutrition(
+                skip=skip, limit=limit, ranges=ranges, sort=sort
+            )
+        else:
+            dishes = [
+                {"id": id, "name": name}
+                for id, name in repo.get_names(skip=skip, limit=limit, ranges=ranges, sort=sort)
+            ]
+        return project(dishes, fieldset)
+    
+    return await catalog_response(
+        request, response, "dishes", (skip, limit, fieldset, sort, tuple(sorted(ranges.items()))), db, build,
+        model=List[DishResponse], partial=fieldset is not None,
+    )
+
+
+@router.get("/search", response_model=List[DishResponse])
+async def search_dishes_by_composition(
+    include: Optional[List[str]] = Query(None, description="Ingredients that must all be present"),
+    any_of: Optional[List[str]] = Query(None, alias="any", description="Ingredients of which at least one must be present"),
+    exclude: Optional[List[str]] = Query(None, description="Ingredients that must be absent"),
+    skip: int = Query(0, ge=0, description="Number of records to skip"),
+    limit: int = Query(100, ge=1, le=100, description="Maximum number of records"),
+    kcal_min: float = Query(None, ge=0, description="Minimum energy, kcal"),
+    kcal_max: float = Query(None, ge=0, description="Maximum energy, kcal"),
+    protein_min: float = Query(None, ge=0, description="Minimum protein, g"),
+    protein_max: float = Query(None, ge=0, description="Maximum protein, g"),
+    fat_min: float = Query(None, ge=0, description="Minimum fat, g"),
+    fat_max: float = Query(None, ge=0, description="Maximum fat, g"),
+    carbs_min: float = Query(None, ge=0, description="Minimum carbohydrates, g"),
+    carbs_max: float = Query(None, ge=0, description="Maximum carbohydrates, g"),
+    db: Session = Depends(get_db),
+):
+    """
+    Find dishes by the ingredients they contain.
+    
+    Ingredients are given by name (case-insensitive, ё and е alike), each
+    parameter repeatable, e.g. `?include=Куриное филе&include=Гречка&exclude=Молоко`.
+    The query runs as bitset operations on an in-memory inverted index
+    refreshed from catalog writes; the nutrition ranges filter the result
+    by stored dish totals.
+    
+    Returns:
+        Matching dishes with nutrition, in ID order; an unknown required
+        ingredient matches nothing, unknown alternatives and exclusions
+        are ignored
+        
+    Raises:
+        BadRequestError: If no ingredient condition is given
+    """
+    if not (include or any_of or exclude):
+        raise BadRequestError("Give at least one of include, any or exclude")
+    ranges = _nutrition_ranges(
+        kcal_min, kcal_max, protein_min, protein_max, fat_min, fat_max, carbs_min, carbs_max
+    )
+    
+    composition_index.sync(db)
+    required, missing = composition_index.resolve(include or ())
+    if missing:
+        return []
+    alternatives, _ = composition_index.resolve(any_of or ())
+    if any_of and not alternatives:
+        return []
+    excluded, _ = composition_index.resolve(exclude or ())
+    
+    bits = composition_index.match(required, alternatives, excluded)
+    return composition_index.rows(bits, ranges, skip=skip, limit=limit)
 
 
 @router.get("/{dish_id}", response_model=DishDetailResponse)
 async def get_dish(
     dish_id: int,
-    repo: DishRepository = Depends(get_dish_repository),
-    ing_repo: IngredientRepository = Depends(get_ingredient_repository),
+    request: Request,
+    response: Response,
+    db: Session = Depends(get_db),
 ):
     """
     Get dish details with ingredients.
     
+    Answers 304 when If-None-Match matches the current catalog ETag.
+    
     Raises:
         NotFoundError: If dish not found
     """
-    nutrition_service = NutritionService(repo, ing_repo)
-    result = nutrition_service.get_dish_with_ingredients(dish_id)
+    etag = catalog_etag("dish", dish_id)
+    if etag_matches(request, etag):
+        return not_modified("dish", etag)
+    
+    def build(session: Session):
+        nutrition_service = NutritionService(DishRepository(session), IngredientRepository(session))
+        return nutrition_service.get_dish_with_ingredients(dish_id)
+    
+    result = await single_flight.do(etag, with_own_session(db, build))
     
     if not result:
         raise NotFoundError("Dish", str(dish_id))
     
-    return result
+    return trusted_response(result, response, cache_headers("dish", etag))
 
 
 @router.post("/new", response_model=SuccessResponse)
@@ -108,6 +249,21 @@ async def create_dish(
         raise BadRequestError(str(e))
 
 
+@router.post("/batch", response_model=List[DishDetailResponse])
+async def get_dishes_batch(
+    batch: DishBatchRequest,
+    repo: DishRepository = Depends(get_dish_repository),
+    ing_repo: IngredientRepository = Depends(get_ingredient_repository),
+):
+    """
+    Get details of several dishes in one request.
+    
+    Returns dishes in the requested order; unknown IDs are skipped.
+    """
+    nutrition_service = NutritionService(repo, ing_repo)
+    return trusted_response(nutrition_service.get_dishes_with_ingredients(batch.ids))
+
+
 @router.post("/{dish_id}", response_model=SuccessResponse)
 async def update_dish(
     dish_id: int,
@@ -0,0 +1,71 @@
+"""
+Catalog change feed.
+Streams committed ingredient and dish changes as Server-Sent Events.
+"""
+
+import asyncio
+from typing import AsyncIterator
+
+from fastapi import APIRouter
+from fastapi.responses import StreamingResponse
+
+from src.api.broadcaster import (
+    CLOSE,
+    HEARTBEAT,
+    RETRY_MS,
+    Subscriber,
+    broadcaster,
+    encode_event,
+)
+from src.services.catalog_version import catalog_version
+
+# Idle time after which a keep-alive comment is sent, in seconds
+HEARTBEAT_INTERVAL = 15.0
+
+router = APIRouter(prefix="/events", tags=["events"])
+
+
+async def event_stream(
+    subscriber: Subscriber,
+    heartbeat_interval: float = HEARTBEAT_INTERVAL
+) -> AsyncIterator[bytes]:
+    """
+    Yield SSE frames for one subscriber until it is dropped or disconnects.
+
+    Args:
+        subscriber: Registered broadcaster subscriber
+        heartbeat_interval: Idle seconds between keep-alive comments
+    """
+    try:
+        yield b"retry: %d\n" % RETRY_MS + encode_event(
+            "hello", {"version": catalog_version.value}, catalog_version.value
+        )
+        while True:
+            try:
+                frame = await asyncio.wait_for(subscriber.queue.get(), heartbeat_interval)
+            except asyncio.TimeoutError:
+                yield HEARTBEAT
+                continue
+            if frame is CLOSE:
+                break
+            yield frame
+    finally:
+        broadcaster.unsubscribe(subscriber)
+
+
+@router.get("")
+async def stream_events():
+    """
+    Subscribe to catalog changes.
+
+    Sends a `hello` event with the current catalog version, then one
+    `change` event per committed write: `{entity, id, op, version, name,
+    nutrition}`, where dish nutrition holds the new totals. A `reset`
+    event means the client fell behind and must refetch its data.
+    """
+    subscriber = broadcaster.subscribe()
+    return StreamingResponse(
+        event_stream(subscriber),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -3,18 +3,31 @@ Goals API routes.
 Handles nutrition goals storage.
 """
 
-from fastapi import APIRouter
+import json
+import os
+import tempfile
+
+from fastapi import APIRouter, Response
 from pydantic import BaseModel
 
+from src.api.caching import CACHE_CONTROL
+from src.api.config import get_settings
 from src.api.schemas import GoalsCreate, GoalsResponse, SuccessResponse
 
 router = APIRouter(prefix="/goals", tags=["goals"])
 
 
 class GoalsStorage:
-    """Simple file-based goals storage (can be replaced with database)."""
+    """
+    Goals storage, persisted to a JSON file when a path is configured.
+    
+    The file is shared by all workers: writes replace it atomically and
+    reads reload it whenever another worker has replaced it.
+    """
     
-    def __init__(self):
+    def __init__(self, path: str = ""):
+        self.path = path
+        self._file_key = None
         self._goals = {
             "protein": 0.0,
             "fat": 0.0,
@@ -24,6 +37,8 @@ class GoalsStorage:
     
     def get(self) -> dict:
         """Get current goals."""
+        if self.path:
+            self._reload()
         return self._goals.copy()
     
     def set(self, goals: GoalsCreate) -> dict:
@@ -34,11 +49,39 @@ class GoalsStorage:
             "carbohydrates": goals.carbohydrates,
             "calories": goals.calories,
         }
+        if self.path:
+            self._write()
         return self._goals.copy()
+    
+    def _reload(self) -> None:
+        """Load goals from the file if it changed since the last read."""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return
+        key = (stat.st_ino, stat.st_mtime_ns)
+        if key != self._file_key:
+            with open(self.path, encoding="utf-8") as f:
+                self._goals = json.load(f)
+            self._file_key = key
+    
+    def _write(self) -> None:
+        """Atomically replace the goals file."""
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".goals-", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self._goals, f)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        stat = os.stat(self.path)
+        self._file_key = (stat.st_ino, stat.st_mtime_ns)
 
 
 # Global storage instance
-_goals_storage = GoalsStorage()
+_goals_storage = GoalsStorage(get_settings().goals_path)
 
 
 class GoalsResponseWithStatus(BaseModel):
@@ -48,12 +91,13 @@ class GoalsResponseWithStatus(BaseModel):
 
 
 @router.get("", response_model=GoalsResponse)
-async def get_goals():
+async def get_goals(response: Response):
     """
     Get current nutrition goals.
     
     Returns the currently stored nutrition goals.
     """
+    response.headers["Cache-Control"] = CACHE_CONTROL["goals"]
     return GoalsResponse(**_goals_storage.get())
 
 
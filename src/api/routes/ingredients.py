@@ -3,13 +3,15 @@ Ingredient API routes.
 Uses repository pattern for data access.
 """
 
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Query, Request, Response
 from typing import List
 
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 
 from src.api.schemas import (
     IngredientResponse,
+    IngredientSuggestion,
     IngredientCreate,
     NutritionCreate,
     SuccessResponse,
@@ -17,8 +19,11 @@ from src.api.schemas import (
     ConflictError,
     BadRequestError,
 )
+from src.api.caching import catalog_response
+from src.api.projection import INGREDIENT_FIELDS, needs_computed, parse_fields, project
 from src.database import get_db
 from src.repositories import IngredientRepository
+from src.services.ingredient_autocomplete import MAX_LIMIT, ingredient_autocomplete
 
 router = APIRouter(prefix="/ingredients", tags=["ingredients"])
 
@@ -30,10 +35,13 @@ def get_ingredient_repository(db: Session = Depends(get_db)) -> IngredientReposi
 
 @router.get("", response_model=List[IngredientResponse])
 async def get_ingredients(
+    request: Request,
+    response: Response,
     skip: int = Query(0, ge=0, description="Number of records to skip"),
     limit: int = Query(100, ge=1, le=100, description="Maximum number of records"),
     search: str = Query(None, description="Search query for ingredient name"),
-    repo: IngredientRepository = Depends(get_ingredient_repository),
+    fields: str = Query(None, description="Comma-separated fields to return, e.g. id,name"),
+    db: Session = Depends(get_db),
 ):
     """
     Get all ingredients with optional search and pagination.
@@ -42,29 +50,77 @@ async def get_ingredients(
         skip: Number of records to skip for pagination
         limit: Maximum number of records to return
         search: Optional search query to filter by name
-        repo: Ingredient repository
+        fields: Optional comma-separated sparse fieldset (id, name, nutrition)
+        db: Database session
         
     Returns:
-        List of ingredients sorted by name
+        List of ingredients sorted by name, served from the precompressed
+        payload cache, or 304 when If-None-Match matches the catalog ETag
+        
+    Raises:
+        BadRequestError: If an unknown field is requested
     """
-    if search:
-        ingredients = repo.search(search, limit=limit)
-    else:
-        ingredients = repo.get_all_sorted(skip=skip, limit=limit)
+    fieldset = parse_fields(fields, INGREDIENT_FIELDS)
     
-    return [
-        IngredientResponse(
-            id=ing.id,
-            name=ing.name,
-            nutrition=NutritionCreate(
-                calories=_calculate_calories(ing.protein_g, ing.fat_g, ing.carbohydrates_g),
-                proteins=ing.protein_g,
-                fats=ing.fat_g,
-                carbohydrates=ing.carbohydrates_g,
+    def build(session: Session):
+        repo = IngredientRepository(session)
+        if not needs_computed(fieldset):
+            return project(
+                ({"id": id, "name": name} for id, name in repo.get_names(skip, limit, search)),
+                fieldset,
             )
-        )
-        for ing in ingredients
-    ]
+        
+        if search:
+            ingredients = repo.search(search, limit=limit)
+        else:
+            ingredients = repo.get_all_sorted(skip=skip, limit=limit)
+        
+        rows = [
+            {
+                "id": ing.id,
+                "name": ing.name,
+                "nutrition": {
+                    "calories": _calculate_calories(ing.protein_g, ing.fat_g, ing.carbohydrates_g),
+                    "proteins": ing.protein_g,
+                    "fats": ing.fat_g,
+                    "carbohydrates": ing.carbohydrates_g,
+                },
+            }
+            for ing in ingredients
+        ]
+        return project(rows, fieldset)
+    
+    return await catalog_response(
+        request, response, "ingredients", (skip, limit, search, fieldset), db, build,
+        model=List[IngredientResponse], partial=fieldset is not None,
+    )
+
+
+@router.get("/autocomplete", response_model=List[IngredientSuggestion])
+async def autocomplete_ingredients(
+    prefix: str = Query("", max_length=100, description="Beginning of any word of the name"),
+    limit: int = Query(10, ge=1, le=MAX_LIMIT, description="Maximum number of suggestions"),
+    db: Session = Depends(get_db),
+):
+    """
+    Suggest ingredients as the user types.
+    
+    Matches the prefix against the start of every word of the name,
+    casefolded with ё and е treated alike, from an in-memory index that
+    is refreshed when the catalog changes.
+    
+    Args:
+        prefix: Typed text; empty returns the most used ingredients
+        limit: Maximum number of suggestions
+        db: Database session, used to refresh the index
+        
+    Returns:
+        An exact name match first, then ingredients used by the most
+        dishes, then by name
+    """
+    # Catching up with dish writes re-ranks every ingredient; keep it off the event loop
+    await run_in_threadpool(ingredient_autocomplete.sync, db)
+    return ingredient_autocomplete.suggest(prefix, limit)
 
 
 @router.post("", response_model=SuccessResponse)
@@ -3,40 +3,32 @@ Menu API routes.
 Handles menu planning and ingredient aggregation.
 """
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Response
 from sqlalchemy.orm import Session
-from typing import Dict
+from typing import Dict, Tuple
 
 from src.api.schemas import (
     MenuProcessRequest,
     MenuProcessResponse,
-    IngredientSummary,
-    SelectedDishSummary,
-    NutritionSummary,
     BadRequestError,
 )
-from src.database import get_db
+from src.api.caching import CACHE_CONTROL, catalog_etag
+from src.api.serialization import FastJSONRoute, trusted_response
+from src.api.single_flight import single_flight
+from src.database import get_db, with_own_session
 from src.repositories import DishRepository, IngredientRepository
+from src.services.catalog_snapshot import CatalogSnapshot, catalog_snapshot
 from src.services.nutrition_service import NutritionService
+from src.tracing import set_attributes, traced
 
-router = APIRouter(tags=["menu"])
-
-
-def get_dish_repository(db: Session = Depends(get_db)) -> DishRepository:
-    """Dependency to get DishRepository instance."""
-    return DishRepository(db)
-
-
-def get_ingredient_repository(db: Session = Depends(get_db)) -> IngredientRepository:
-    """Dependency to get IngredientRepository instance."""
-    return IngredientRepository(db)
+router = APIRouter(tags=["menu"], route_class=FastJSONRoute)
 
 
 @router.post("/menu", response_model=MenuProcessResponse)
 async def process_menu(
     request: MenuProcessRequest,
-    dish_repo: DishRepository = Depends(get_dish_repository),
-    ing_repo: IngredientRepository = Depends(get_ingredient_repository),
+    response: Response,
+    db: Session = Depends(get_db),
 ):
     """
     Process menu and calculate ingredient amounts.
@@ -46,41 +38,76 @@ async def process_menu(
     - Aggregated shopping list with ingredient amounts
     - Total nutrition summary
     """
+    headers = {"Cache-Control": CACHE_CONTROL["menu"]}
+    
     if not request.dishes:
-        return MenuProcessResponse(
-            dishes=[],
-            ingredients={},
-            total_nutrition=NutritionSummary(
-                protein=0,
-                fat=0,
-                carbohydrates=0,
-                calories=0
-            )
-        )
+        return trusted_response({
+            "dishes": [],
+            "ingredients": {},
+            "total_nutrition": {
+                "protein": 0,
+                "fat": 0,
+                "carbohydrates": 0,
+                "calories": 0,
+            },
+        }, response, headers)
+    
+    selection = tuple((d.id, d.portions) for d in request.dishes)
     
-    nutrition_service = NutritionService(dish_repo, ing_repo)
+    # Prefer the shared catalog snapshot; it needs no database round trips,
+    # but lags behind this process's writes until they are published
+    snapshot = None if catalog_snapshot.pending else catalog_snapshot.current()
+    set_attributes({
+        "app.menu.size": len(selection),
+        "app.menu.source": "snapshot" if snapshot is not None else "database",
+    })
+    if snapshot is not None:
+        build = lambda: _build_menu_from_snapshot(selection, snapshot)
+    else:
+        def build_from_database(session: Session) -> Dict:
+            dish_repo = DishRepository(session)
+            nutrition_service = NutritionService(dish_repo, IngredientRepository(session))
+            return _build_menu(selection, dish_repo, nutrition_service)
+        
+        build = with_own_session(db, build_from_database)
     
+    result = await single_flight.do(catalog_etag("menu", selection), build)
+    return trusted_response(result, response, headers)
+
+
+@traced("menu.build")
+def _build_menu(
+    selection: Tuple[Tuple[int, int], ...],
+    dish_repo: DishRepository,
+    nutrition_service: NutritionService,
+) -> Dict:
+    """
+    Build the menu response for (dish_id, portions) pairs.
+    
+    Returns:
+        Dictionary matching MenuProcessResponse
+    """
     # Get dish details and aggregate ingredients
     dishes_summary = []
     ingredients_aggregated: Dict[str, float] = {}
     
-    for selected in request.dishes:
-        dish = dish_repo.get_by_id_with_ingredients(selected.id)
+    for dish_id, portions in selection:
+        dish = dish_repo.get_by_id_with_ingredients(dish_id)
         if not dish:
             continue
         
         # Add to dishes summary
-        dishes_summary.append(SelectedDishSummary(
-            id=selected.id,
-            name=dish.name,
-            portions=selected.portions
-        ))
+        dishes_summary.append({
+            "id": dish_id,
+            "name": dish.name,
+            "portions": portions,
+        })
         
         # Aggregate ingredients
         for di in dish.ingredients:
             if di.ingredient:
                 ingredient_name = di.ingredient.name
-                total_amount = di.amount * selected.portions
+                total_amount = di.amount * portions
                 
                 if ingredient_name in ingredients_aggregated:
                     ingredients_aggregated[ingredient_name] += total_amount
@@ -89,22 +116,78 @@ async def process_menu(
     
     # Calculate total nutrition
     total_nutrition = nutrition_service.calculate_menu_nutrition(
-        [{"id": d.id, "portions": d.portions} for d in request.dishes]
+        [{"id": dish_id, "portions": portions} for dish_id, portions in selection]
     )
     
     # Convert ingredients to response format
     ingredients = {
-        name: IngredientSummary(amount=round(amount, 2), unit="г")
+        name: {"amount": round(amount, 2), "unit": "г"}
         for name, amount in sorted(ingredients_aggregated.items())
     }
     
-    return MenuProcessResponse(
-        dishes=dishes_summary,
-        ingredients=ingredients,
-        total_nutrition=NutritionSummary(
-            protein=total_nutrition["protein"],
-            fat=total_nutrition["fat"],
-            carbohydrates=total_nutrition["carbohydrates"],
-            calories=total_nutrition["calories"]
-        )
-    )
+    return {
+        "dishes": dishes_summary,
+        "ingredients": ingredients,
+        "total_nutrition": {
+            "protein": total_nutrition["protein"],
+            "fat": total_nutrition["fat"],
+            "carbohydrates": total_nutrition["carbohydrates"],
+            "calories": total_nutrition["calories"],
+        },
+    }
+
+
+@traced("menu.build_from_snapshot")
+def _build_menu_from_snapshot(
+    selection: Tuple[Tuple[int, int], ...],
+    snapshot: CatalogSnapshot,
+) -> Dict:
+    """
+    Build the menu response from the memory-mapped catalog snapshot.
+    
+    Dishes and the shopping list match _build_menu's. Nutrition is summed
+    from the stored dish totals, which the database aggregated and rounded
+    to 0.01 per dish; _build_menu recomputes each dish from its ingredients
+    in Python before rounding, so totals can differ in the last digit.
+    
+    Returns:
+        Dictionary matching MenuProcessResponse
+    """
+    dishes_summary = []
+    ingredients_aggregated: Dict[str, float] = {}
+    protein = fat = carbohydrates = calories = 0.0
+    
+    for dish_id, portions in selection:
+        position = snapshot.dish_position(dish_id)
+        if position is None:
+            continue
+        
+        dishes_summary.append({
+            "id": dish_id,
+            "name": snapshot.dish_name(position),
+            "portions": portions,
+        })
+        
+        for ingredient_position, amount in snapshot.dish_components(position):
+            name = snapshot.ingredient_name(ingredient_position)
+            ingredients_aggregated[name] = ingredients_aggregated.get(name, 0.0) + amount * portions
+        
+        nutrition = snapshot.dish_nutrition(position)
+        protein += nutrition["protein_g"] * portions
+        fat += nutrition["fat_g"] * portions
+        carbohydrates += nutrition["carbohydrates_g"] * portions
+        calories += nutrition["energy_kcal"] * portions
+    
+    return {
+        "dishes": dishes_summary,
+        "ingredients": {
+            name: {"amount": round(amount, 2), "unit": "г"}
+            for name, amount in sorted(ingredients_aggregated.items())
+        },
+        "total_nutrition": {
+            "protein": round(protein, 2),
+            "fat": round(fat, 2),
+            "carbohydrates": round(carbohydrates, 2),
+            "calories": round(calories, 2),
+        },
+    }
@@ -0,0 +1,88 @@
+"""
+Prometheus metrics endpoint.
+Registers collectors for the database pool, caches and admission control.
+"""
+
+from fastapi import APIRouter, Response
+
+from src.api.broadcaster import broadcaster
+from src.api.caching import payload_cache
+from src.api.metrics import CONTENT_TYPE, registry
+from src.api.middleware import admission_controller
+from src.api.single_flight import single_flight
+from src.database import engine
+from src.services.catalog_snapshot import catalog_snapshot
+
+router = APIRouter(tags=["metrics"])
+
+
+def collect_db_pool():
+    """Connection pool gauges of the application engine."""
+    pool = engine.pool
+    gauges = (
+        ("db_pool_size", "Configured pool size", "size"),
+        ("db_pool_checked_out", "Connections in use", "checkedout"),
+        ("db_pool_checked_in", "Idle connections in the pool", "checkedin"),
+        ("db_pool_overflow", "Connections above the pool size", "overflow"),
+    )
+    for name, help_text, method in gauges:
+        # Not every pool class keeps these counters (SQLite's SingletonThreadPool
+        # has an int attribute called size, so hasattr alone is not enough)
+        if callable(getattr(pool, method, None)):
+            yield (name, "gauge", help_text, [(name, {}, getattr(pool, method)())])
+
+
+def collect_caches():
+    """Hit and miss counters of the caching layers."""
+    cache = payload_cache.stats()
+    yield ("payload_cache_requests_total", "counter", "Payload cache lookups by result", [
+        ("payload_cache_requests_total", {"result": "hit"}, cache["hits"]),
+        ("payload_cache_requests_total", {"result": "miss"}, cache["misses"]),
+    ])
+    yield ("payload_cache_evictions_total", "counter", "Payloads evicted for space", [
+        ("payload_cache_evictions_total", {}, cache["evictions"]),
+    ])
+    yield ("payload_cache_bytes", "gauge", "Memory held by cached payloads", [
+        ("payload_cache_bytes", {}, cache["bytes"]),
+    ])
+    yield ("single_flight_calls_total", "counter", "Read computations by outcome", [
+        ("single_flight_calls_total", {"result": "executed"}, single_flight.executed),
+        ("single_flight_calls_total", {"result": "coalesced"}, single_flight.coalesced),
+    ])
+    snapshot = catalog_snapshot.current()
+    yield ("catalog_snapshot_generation", "gauge", "Generation of the mapped catalog snapshot (0 if none)", [
+        ("catalog_snapshot_generation", {}, snapshot.generation if snapshot is not None else 0),
+    ])
+
+
+def collect_admission():
+    """Admission control and change feed gauges and counters."""
+    stats = admission_controller.stats()
+    families = (
+        ("admission_in_flight", "gauge", "Admitted requests being processed", "in_flight"),
+        ("admission_queued", "gauge", "Requests waiting for a slot", "queued"),
+        ("admission_admitted_total", "counter", "Admitted requests", "admitted"),
+        ("admission_shed_total", "counter", "Requests rejected with 503", "shed"),
+    )
+    for name, kind, help_text, key in families:
+        yield (name, kind, help_text, [
+            (name, {"class": route_class}, counters[key]) for route_class, counters in stats.items()
+        ])
+    events = broadcaster.stats()
+    yield ("events_subscribers", "gauge", "Connected change feed subscribers", [
+        ("events_subscribers", {}, events["subscribers"]),
+    ])
+    yield ("events_dropped_total", "counter", "Slow change feed subscribers dropped", [
+        ("events_dropped_total", {}, events["dropped"]),
+    ])
+
+
+registry.register(collect_db_pool)
+registry.register(collect_caches)
+registry.register(collect_admission)
+
+
+@router.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """Expose metrics in the Prometheus text format."""
+    return Response(registry.render(), media_type=CONTENT_TYPE)
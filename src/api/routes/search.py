@@ -0,0 +1,51 @@
+"""
+Search API routes.
+Typo-tolerant lookup of ingredients and dishes by name.
+"""
+
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy.orm import Session
+
+from src.api.schemas import BadRequestError, SearchResult
+from src.database import get_db
+from src.services.name_search import KINDS, name_search
+
+router = APIRouter(prefix="/search", tags=["search"])
+
+
+@router.get("", response_model=List[SearchResult])
+async def search(
+    q: str = Query(..., min_length=1, max_length=100, description="Name as typed, typos allowed"),
+    kind: Optional[str] = Query(None, description="Restrict to ingredient or dish"),
+    limit: int = Query(10, ge=1, le=50, description="Maximum number of results"),
+    max_distance: Optional[int] = Query(None, ge=0, le=2, description="Edits tolerated per word"),
+    db: Session = Depends(get_db),
+):
+    """
+    Find ingredients and dishes whose names match every word of a query.
+
+    Names are compared casefolded with ё and е treated alike. Each word
+    may differ by a few edits (none up to 2 letters, one up to 5, two
+    beyond), and the last word also matches as a prefix while it is still
+    being typed.
+
+    Args:
+        q: Search text
+        kind: Optional entity filter
+        limit: Maximum number of results
+        max_distance: Lower the per-word edit allowance
+        db: Database session, used to refresh the in-memory index
+
+    Returns:
+        Matches with their edit distance, closest first
+
+    Raises:
+        BadRequestError: If kind is neither ingredient nor dish
+    """
+    if kind is not None and kind not in KINDS:
+        raise BadRequestError(f"kind must be one of: {', '.join(KINDS)}")
+
+    name_search.sync(db)
+    return name_search.search(q, limit=limit, kind=kind, max_distance=max_distance)
@@ -9,6 +9,7 @@ from .dish import (
     IngredientBase,
     IngredientCreate,
     IngredientResponse,
+    IngredientSuggestion,
     IngredientInDish,
     DishBase,
     DishCreate,
@@ -16,6 +17,7 @@ from .dish import (
     DishUpdate,
     DishResponse,
     DishDetailResponse,
+    DishBatchRequest,
     GoalsBase,
     GoalsCreate,
     GoalsResponse,
@@ -25,6 +27,7 @@ from .dish import (
     SelectedDishSummary,
     NutritionSummary,
     MenuProcessResponse,
+    SearchResult,
 )
 
 from .common import (
@@ -36,6 +39,7 @@ from .common import (
     APIError,
     NotFoundError,
     ValidationError,
+    ForbiddenError,
     ConflictError,
     BadRequestError,
 )
@@ -47,6 +51,7 @@ __all__ = [
     "IngredientBase",
     "IngredientCreate",
     "IngredientResponse",
+    "IngredientSuggestion",
     "IngredientInDish",
     "DishBase",
     "DishCreate",
@@ -54,6 +59,7 @@ __all__ = [
     "DishUpdate",
     "DishResponse",
     "DishDetailResponse",
+    "DishBatchRequest",
     "GoalsBase",
     "GoalsCreate",
     "GoalsResponse",
@@ -63,6 +69,7 @@ __all__ = [
     "SelectedDishSummary",
     "NutritionSummary",
     "MenuProcessResponse",
+    "SearchResult",
     # Common schemas
     "SuccessResponse",
     "ErrorResponse",
@@ -73,6 +80,7 @@ __all__ = [
     "APIError",
     "NotFoundError",
     "ValidationError",
+    "ForbiddenError",
     "ConflictError",
     "BadRequestError",
 ]
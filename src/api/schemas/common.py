@@ -71,6 +71,13 @@ class ValidationError(APIError):
         super().__init__(message, status_code=422, detail=detail)
 
 
+class ForbiddenError(APIError):
+    """Access denied error."""
+    
+    def __init__(self, message: str = "Forbidden", detail: Optional[str] = None):
+        super().__init__(message, status_code=403, detail=detail)
+
+
 class ConflictError(APIError):
     """Conflict error (e.g., duplicate resource)."""
     
@@ -36,6 +36,13 @@ class IngredientResponse(IngredientBase):
         from_attributes = True
 
 
+class IngredientSuggestion(BaseModel):
+    """Autocomplete suggestion for an ingredient name."""
+    id: int
+    name: str
+    uses: int
+
+
 class IngredientInDish(BaseModel):
     """Ingredient as part of a dish."""
     name: str
@@ -93,6 +100,11 @@ class DishDetailResponse(BaseModel):
         from_attributes = True
 
 
+class DishBatchRequest(BaseModel):
+    """Request for details of several dishes at once."""
+    ids: List[int] = Field(..., min_length=1, max_length=500)
+
+
 # Goal schemas
 class GoalsBase(BaseModel):
     """Base goals information."""
@@ -150,3 +162,12 @@ class MenuProcessResponse(BaseModel):
     dishes: list[SelectedDishSummary]
     ingredients: dict[str, IngredientSummary]
     total_nutrition: NutritionSummary
+
+
+# Search schemas
+class SearchResult(BaseModel):
+    """Ingredient or dish matched by a fuzzy name search."""
+    kind: str
+    id: int
+    name: str
+    distance: int
@@ -0,0 +1,97 @@
+"""
+Fast JSON serialization path for hot endpoints.
+
+When `Settings.fast_json` is enabled and orjson is installed, request bodies
+are decoded with orjson and server-built payloads are encoded with orjson
+directly, skipping FastAPI's response_model re-validation. Otherwise the
+standard FastAPI path is used.
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional
+
+from fastapi import Request, Response
+from fastapi.routing import APIRoute
+
+from src.api.config import get_settings
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+
+def fast_json_enabled() -> bool:
+    """Check whether the fast serialization path is active."""
+    return orjson is not None and get_settings().fast_json
+
+
+def dumps(content: Any) -> bytes:
+    """Encode content as UTF-8 JSON bytes."""
+    if orjson is not None:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def loads(data: bytes) -> Any:
+    """Decode JSON bytes."""
+    if orjson is not None:
+        return orjson.loads(data)
+    return json.loads(data)
+
+
+class FastJSONResponse(Response):
+    """JSON response rendered with orjson."""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def trusted_response(
+    content: Any,
+    response: Optional[Response] = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Any:
+    """
+    Return server-built data for an endpoint.
+
+    On the fast path the content is encoded directly, bypassing
+    response_model validation. Otherwise it is returned unchanged
+    so FastAPI validates and encodes it as usual.
+
+    Args:
+        content: Payload built by the server
+        response: Injected response used to carry headers on the standard path
+        headers: Extra response headers
+    """
+    if fast_json_enabled():
+        return FastJSONResponse(content, headers=headers)
+    if response is not None and headers:
+        response.headers.update(headers)
+    return content
+
+
+class FastJSONRequest(Request):
+    """Request that decodes its JSON body with orjson."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = loads(await self.body())
+        return self._json
+
+
+class FastJSONRoute(APIRoute):
+    """Route class that decodes request bodies with orjson on the fast path."""
+
+    def get_route_handler(self) -> Callable:
+        original_handler = super().get_route_handler()
+
+        async def route_handler(request: Request) -> Response:
+            if fast_json_enabled():
+                request = FastJSONRequest(request.scope, request.receive)
+            return await original_handler(request)
+
+        return route_handler
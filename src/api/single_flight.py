@@ -0,0 +1,88 @@
+"""
+Single-flight coalescing of expensive read computations.
+
+Concurrent requests for the same key await one in-flight computation
+instead of each running it. The computation runs in the threadpool so
+the event loop keeps accepting (and coalescing) requests meanwhile.
+"""
+
+import asyncio
+from typing import Any, Callable, Dict, Hashable
+
+from starlette.concurrency import run_in_threadpool
+
+
+class _Call:
+    """An in-flight computation and the number of requests waiting on it."""
+
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Future):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Deduplicates concurrent computations by key."""
+
+    def __init__(self):
+        self._calls: Dict[Hashable, _Call] = {}
+        self.executed = 0
+        self.coalesced = 0
+
+    async def do(self, key: Hashable, func: Callable[[], Any]) -> Any:
+        """
+        Run `func` once for all concurrent callers with the same key.
+
+        Args:
+            key: Identifies identical computations (include the catalog version)
+            func: Blocking computation, executed in the threadpool; it may
+                outlive the request that started it, so it must not use that
+                request's database session (see `with_own_session`)
+
+        Returns:
+            The shared result; callers must treat it as read-only
+        """
+        call = self._calls.get(key)
+        if call is None:
+            task = asyncio.ensure_future(run_in_threadpool(func))
+            call = _Call(task)
+            self._calls[key] = call
+            self.executed += 1
+            task.add_done_callback(lambda done: self._forget(key, call, done))
+        else:
+            self.coalesced += 1
+
+        call.waiters += 1
+        try:
+            # Shield so one cancelled request does not cancel the shared work
+            return await asyncio.shield(call.task)
+        finally:
+            call.waiters -= 1
+
+    def _forget(self, key: Hashable, call: _Call, done: asyncio.Future) -> None:
+        """Drop a finished computation so later requests start a new one."""
+        if self._calls.get(key) is call:
+            del self._calls[key]
+        if not done.cancelled():
+            # Mark the exception retrieved even if every waiter went away
+            done.exception()
+
+    def waiters(self) -> Dict[Hashable, int]:
+        """Number of requests currently waiting per in-flight key."""
+        return {key: call.waiters for key, call in self._calls.items()}
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters and current in-flight keys."""
+        return {
+            "executed": self.executed,
+            "coalesced": self.coalesced,
+            "inflight": [
+                {"key": str(key), "waiters": waiters}
+                for key, waiters in self.waiters().items()
+            ],
+        }
+
+
+# Global instance shared by all read endpoints
+single_flight = SingleFlight()
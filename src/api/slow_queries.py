@@ -0,0 +1,220 @@
+"""
+Slow query log.
+
+Statements slower than the configured threshold are logged with their
+SQL, parameters, duration and the repository (or service) method that
+issued them, and kept in a ring for the admin API. For a sample of slow
+SELECT statements, rate limited, the query plan is captured as well:
+`EXPLAIN (ANALYZE, BUFFERS)` on PostgreSQL, inside a savepoint of the
+request's transaction, and `EXPLAIN QUERY PLAN` on SQLite.
+"""
+
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+from src.api.config import get_settings
+from src.query_stats import add_observer
+
+logger = logging.getLogger(__name__)
+
+SRC_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Callers are attributed to the innermost frame in these packages, in order
+CALLER_PACKAGES = tuple(
+    os.path.join(SRC_ROOT, package) + os.sep
+    for package in ("repositories", "services", "models", "api")
+)
+
+# Longest parameter list and value representation stored per entry
+MAX_PARAMETERS = 20
+MAX_PARAMETER_LENGTH = 200
+
+EXPLAIN_PREFIXES = {
+    "postgresql": "EXPLAIN (ANALYZE, BUFFERS) ",
+    "sqlite": "EXPLAIN QUERY PLAN ",
+}
+
+# Dialects where a failed EXPLAIN aborts the open transaction; the plan is
+# captured inside this savepoint so the request's own statements survive it
+EXPLAIN_SAVEPOINT = "slow_query_explain"
+SAVEPOINT_DIALECTS = {"postgresql"}
+
+# A WITH query may wrap a write, which EXPLAIN ANALYZE would run again
+_WRITE_KEYWORDS = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b", re.IGNORECASE)
+
+
+def _caller() -> Optional[str]:
+    """Describe the application method that issued the current statement."""
+    frames = []
+    frame = sys._getframe(2)
+    while frame is not None:
+        frames.append(frame)
+        frame = frame.f_back
+    for package in CALLER_PACKAGES:
+        for frame in frames:
+            filename = frame.f_code.co_filename
+            if filename.startswith(package):
+                owner = frame.f_locals.get("self")
+                name = frame.f_code.co_name
+                if owner is not None:
+                    name = f"{type(owner).__name__}.{name}"
+                return f"{name} ({os.path.relpath(filename, os.path.dirname(SRC_ROOT))}:{frame.f_lineno})"
+    return None
+
+
+def _format_parameters(parameters) -> object:
+    """Truncated, JSON-friendly representation of statement parameters."""
+    def short(value):
+        text = repr(value)
+        return text if len(text) <= MAX_PARAMETER_LENGTH else text[:MAX_PARAMETER_LENGTH] + "..."
+
+    if isinstance(parameters, dict):
+        return {str(key): short(value) for key, value in list(parameters.items())[:MAX_PARAMETERS]}
+    if isinstance(parameters, (list, tuple)):
+        return [short(value) for value in list(parameters)[:MAX_PARAMETERS]]
+    return short(parameters)
+
+
+def _is_select(statement: str) -> bool:
+    """Check whether a statement only reads, so running it again is harmless."""
+    head = statement.lstrip()[:6].upper()
+    if head == "SELECT":
+        return True
+    return head.startswith("WITH") and not _WRITE_KEYWORDS.search(statement)
+
+
+class SlowQueryLog:
+    """Ring of recent slow statements with sampled, rate-limited plans."""
+
+    def __init__(
+        self,
+        threshold_ms: float,
+        explain_sample: float = 1.0,
+        explain_per_minute: int = 10,
+        size: int = 100,
+    ):
+        """
+        Initialize the log.
+
+        Args:
+            threshold_ms: Statements at least this slow are logged; 0 disables
+            explain_sample: Fraction of slow SELECTs whose plan is captured
+            explain_per_minute: Most plans captured per minute
+            size: Entries kept for the admin API
+        """
+        self.threshold = threshold_ms / 1000
+        self.explain_sample = explain_sample
+        self.explain_per_minute = explain_per_minute
+        self.entries: deque = deque(maxlen=size)
+        self.logged = 0
+        self.explained = 0
+        self._explain_times: deque = deque()
+        self._lock = threading.Lock()
+
+    def observe(self, conn, statement, parameters, context, executemany, duration) -> None:
+        """Query observer: record the statement if it was slow."""
+        if not self.threshold or duration < self.threshold:
+            return
+        entry = {
+            "at": time.time(),
+            "duration_ms": round(duration * 1000, 3),
+            "statement": statement,
+            "parameters": _format_parameters(parameters),
+            "executemany": executemany,
+            "caller": _caller(),
+            "plan": None,
+        }
+        if not executemany and _is_select(statement) and self._may_explain():
+            entry["plan"] = self._explain(conn, statement, parameters)
+        with self._lock:
+            self.logged += 1
+            self.entries.append(entry)
+        logger.warning(
+            "Slow query (%.1f ms) from %s: %s", entry["duration_ms"], entry["caller"], " ".join(statement.split())
+        )
+
+    def _may_explain(self) -> bool:
+        """Apply sampling and the per-minute plan budget."""
+        if self.explain_per_minute <= 0 or random.random() >= self.explain_sample:
+            return False
+        now = time.monotonic()
+        with self._lock:
+            while self._explain_times and now - self._explain_times[0] > 60:
+                self._explain_times.popleft()
+            if len(self._explain_times) >= self.explain_per_minute:
+                return False
+            self._explain_times.append(now)
+            self.explained += 1
+        return True
+
+    def _explain(self, conn, statement: str, parameters) -> Optional[List[str]]:
+        """Capture the plan on the same connection, bypassing engine events."""
+        prefix = EXPLAIN_PREFIXES.get(conn.dialect.name)
+        if prefix is None:
+            return None
+        savepoint = conn.dialect.name in SAVEPOINT_DIALECTS
+        try:
+            cursor = conn.connection.dbapi_connection.cursor()
+            try:
+                if savepoint:
+                    cursor.execute(f"SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                try:
+                    cursor.execute(prefix + statement, parameters)
+                    rows = cursor.fetchall()
+                except Exception:
+                    if savepoint:
+                        cursor.execute(f"ROLLBACK TO SAVEPOINT {EXPLAIN_SAVEPOINT}")
+                    raise
+                finally:
+                    if savepoint:
+                        cursor.execute(f"RELEASE SAVEPOINT {EXPLAIN_SAVEPOINT}")
+            finally:
+                cursor.close()
+        except Exception as exc:
+            return [f"EXPLAIN failed: {exc}"]
+        if conn.dialect.name == "sqlite":
+            # (id, parent, notused, detail)
+            return [row[-1] for row in rows]
+        return [row[0] for row in rows]
+
+    def recent(self, limit: int = 50) -> List[Dict]:
+        """Most recent entries, newest first."""
+        with self._lock:
+            entries = list(self.entries)
+        return entries[::-1][:limit]
+
+    def clear(self) -> None:
+        with self._lock:
+            self.entries.clear()
+
+    def stats(self) -> Dict:
+        """Log counters and settings."""
+        return {
+            "threshold_ms": self.threshold * 1000,
+            "logged": self.logged,
+            "explained": self.explained,
+            "kept": len(self.entries),
+        }
+
+
+def _create_slow_query_log() -> SlowQueryLog:
+    """Build the slow query log from settings."""
+    settings = get_settings()
+    return SlowQueryLog(
+        threshold_ms=settings.slow_query_ms,
+        explain_sample=settings.slow_query_explain_sample,
+        explain_per_minute=settings.slow_query_explain_per_minute,
+        size=settings.slow_query_log_size,
+    )
+
+
+# Global log, fed by every engine and read by the admin API
+slow_query_log = _create_slow_query_log()
+add_observer(slow_query_log.observe)
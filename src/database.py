@@ -4,7 +4,7 @@ Uses SQLAlchemy 2.0 with support for both sync and async operations.
 """
 
 from contextlib import contextmanager
-from typing import Generator
+from typing import Callable, Generator, TypeVar
 
 from sqlalchemy import create_engine, Column, Integer, String, Float, ForeignKey
 from sqlalchemy.ext.declarative import declarative_base
@@ -15,6 +15,8 @@ from src.api.config import get_settings
 # Get settings
 settings = get_settings()
 
+T = TypeVar("T")
+
 # Create base for models
 Base = declarative_base()
 
@@ -37,6 +39,18 @@ class Dish(Base):
     id = Column(Integer, primary_key=True)
     name = Column(String, unique=True, nullable=False)
     ingredients = relationship('DishIngredient', back_populates='dish')
+    
+    # Nutrition totals and per-100g densities, derived from the composition
+    # and refreshed on commit (see src/services/catalog_version.py)
+    weight_g = Column(Float, nullable=False, default=0.0, server_default='0')
+    energy_kcal = Column(Float, nullable=False, default=0.0, server_default='0', index=True)
+    protein_g = Column(Float, nullable=False, default=0.0, server_default='0', index=True)
+    fat_g = Column(Float, nullable=False, default=0.0, server_default='0', index=True)
+    carbohydrates_g = Column(Float, nullable=False, default=0.0, server_default='0', index=True)
+    energy_kcal_per_100g = Column(Float, nullable=False, default=0.0, server_default='0', index=True)
+    protein_per_100g = Column(Float, nullable=False, default=0.0, server_default='0', index=True)
+    fat_per_100g = Column(Float, nullable=False, default=0.0, server_default='0', index=True)
+    carbohydrates_per_100g = Column(Float, nullable=False, default=0.0, server_default='0', index=True)
 
 
 class DishIngredient(Base):
@@ -51,6 +65,15 @@ class DishIngredient(Base):
     ingredient = relationship('Ingredient')
 
 
+class SeedRecord(Base):
+    """SQLAlchemy model for seed_records table (content hashes of seed data)."""
+    __tablename__ = 'seed_records'
+    
+    kind = Column(String, primary_key=True)
+    name = Column(String, primary_key=True)
+    content_hash = Column(String(64), nullable=False)
+
+
 # Create engine with configuration from settings
 engine = create_engine(
     settings.database_url,
@@ -101,5 +124,28 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+def with_own_session(db: Session, func: Callable[[Session], T]) -> Callable[[], T]:
+    """
+    Wrap work so it runs in a session of its own on the engine of `db`.
+    
+    For work that may outlive the request owning `db`, such as a read shared
+    by coalesced requests: that request's session is closed when it ends,
+    even while the work is still running in the threadpool.
+    
+    Usage:
+        await single_flight.do(key, with_own_session(db, lambda s: ...))
+    """
+    bind = db.get_bind()
+    
+    def run() -> T:
+        session = SessionLocal(bind=bind)
+        try:
+            return func(session)
+        finally:
+            session.close()
+    
+    return run
+
+
 # Initialize database on module import
 init_db()
@@ -3,14 +3,16 @@ Database initialization module.
 Loads initial data from JSON files into the database.
 """
 
+import hashlib
 import json
 import os
-from typing import Dict, List
+from typing import Dict, List, Optional
 
-from sqlalchemy import text
+from sqlalchemy import text, select, insert, update, delete
 from sqlalchemy.orm import Session
 
-from src.database import Base, engine, SessionLocal, Ingredient, Dish, DishIngredient
+from src.database import Base, engine, SessionLocal, Ingredient, Dish, DishIngredient, SeedRecord
+from src.repositories.dish_repository import DishRepository
 
 
 # Path to data files
@@ -18,6 +20,13 @@ DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), "data")
 INGREDIENTS_FILE = os.path.join(DATA_DIR, "ingredients.json")
 DISHES_FILE = os.path.join(DATA_DIR, "dishes.json")
 
+# Seed sync bookkeeping
+SEED_KIND_MANIFEST = "manifest"
+SEED_KIND_INGREDIENT = "ingredient"
+SEED_KIND_DISH = "dish"
+SEED_MANIFEST_NAME = "data"
+SEED_BATCH_SIZE = 500
+
 
 def load_ingredients_from_file() -> List[Dict]:
     """Load ingredients data from JSON file."""
@@ -106,16 +115,219 @@ def populate_dishes(session: Session, dishes: List[Dict]) -> int:
         
         added += 1
     
+    session.flush()
+    DishRepository(session).refresh_nutrition()
     session.commit()
     return added
 
 
-def init_database(force: bool = False) -> Dict[str, int]:
+def compute_manifest_hash(paths: Optional[List[str]] = None) -> str:
+    """
+    Compute a hash over the raw contents of the seed data files.
+    
+    Args:
+        paths: Files to hash (defaults to ingredients and dishes files)
+        
+    Returns:
+        Hex digest identifying the current seed data
+    """
+    digest = hashlib.sha256()
+    for path in paths or [INGREDIENTS_FILE, DISHES_FILE]:
+        digest.update(os.path.basename(path).encode("utf-8"))
+        digest.update(b"\0")
+        if os.path.exists(path):
+            with open(path, "rb") as f:
+                digest.update(f.read())
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+def record_hash(record: Dict) -> str:
+    """Compute a stable content hash for a single seed record."""
+    payload = json.dumps(record, sort_keys=True, ensure_ascii=False, separators=(",", ":"))
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _batches(items: List, size: int = SEED_BATCH_SIZE):
+    """Yield consecutive slices of at most `size` items."""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+def _load_seed_hashes(session: Session, kind: str) -> Dict[str, str]:
+    """Load stored content hashes for one kind of seed record."""
+    rows = session.execute(
+        select(SeedRecord.name, SeedRecord.content_hash).where(SeedRecord.kind == kind)
+    )
+    return {name: content_hash for name, content_hash in rows}
+
+
+def _store_seed_hashes(
+    session: Session,
+    kind: str,
+    hashes: Dict[str, str],
+    known: Dict[str, str]
+) -> None:
+    """Insert or update stored content hashes for the given records."""
+    updates = [{"kind": kind, "name": n, "content_hash": h} for n, h in hashes.items() if n in known]
+    inserts = [{"kind": kind, "name": n, "content_hash": h} for n, h in hashes.items() if n not in known]
+    for batch in _batches(updates):
+        session.execute(update(SeedRecord), batch)
+    for batch in _batches(inserts):
+        session.execute(insert(SeedRecord), batch)
+
+
+def _names_to_ids(session: Session, model, names: List[str]) -> Dict[str, int]:
+    """Resolve names to primary keys with one IN query per batch."""
+    ids = {}
+    for batch in _batches(names):
+        rows = session.execute(select(model.name, model.id).where(model.name.in_(batch)))
+        ids.update({name: id_ for name, id_ in rows})
+    return ids
+
+
+def sync_ingredients(session: Session, ingredients: List[Dict]) -> int:
+    """
+    Upsert ingredients whose seed record changed since the last sync.
+    
+    Returns:
+        Number of ingredients inserted or updated
+    """
+    known = _load_seed_hashes(session, SEED_KIND_INGREDIENT)
+    changed = {}
+    for ing_data in ingredients:
+        content_hash = record_hash(ing_data)
+        if known.get(ing_data["name"]) != content_hash:
+            changed[ing_data["name"]] = (ing_data, content_hash)
+    
+    if not changed:
+        return 0
+    
+    existing = _names_to_ids(session, Ingredient, list(changed))
+    updates, inserts = [], []
+    for name, (ing_data, _) in changed.items():
+        values = {
+            "name": name,
+            "protein_g": ing_data["protein_g"],
+            "fat_g": ing_data["fat_g"],
+            "carbohydrates_g": ing_data["carbohydrates_g"],
+        }
+        if name in existing:
+            updates.append({"id": existing[name], **values})
+        else:
+            inserts.append(values)
+    
+    for batch in _batches(updates):
+        session.execute(update(Ingredient), batch)
+    for batch in _batches(inserts):
+        session.execute(insert(Ingredient), batch)
+    
+    _store_seed_hashes(
+        session, SEED_KIND_INGREDIENT, {n: h for n, (_, h) in changed.items()}, known
+    )
+    return len(changed)
+
+
+def sync_dishes(session: Session, dishes: List[Dict]) -> int:
+    """
+    Upsert dishes whose seed record changed since the last sync.
+    The composition of each changed dish is replaced as a whole.
+    
+    Returns:
+        Number of dishes inserted or updated
+    """
+    known = _load_seed_hashes(session, SEED_KIND_DISH)
+    changed = {}
+    for dish_data in dishes:
+        content_hash = record_hash(dish_data)
+        if known.get(dish_data["name"]) != content_hash:
+            changed[dish_data["name"]] = (dish_data, content_hash)
+    
+    if not changed:
+        return 0
+    
+    existing = _names_to_ids(session, Dish, list(changed))
+    new_names = [name for name in changed if name not in existing]
+    for batch in _batches(new_names):
+        session.execute(insert(Dish), [{"name": name} for name in batch])
+    dish_ids = {**existing, **_names_to_ids(session, Dish, new_names)}
+    
+    # Replace compositions of changed dishes
+    for batch in _batches([dish_ids[name] for name in existing]):
+        session.execute(delete(DishIngredient).where(DishIngredient.dish_id.in_(batch)))
+    
+    ingredient_names = sorted({
+        ing_name
+        for dish_data, _ in changed.values()
+        for ing_name in dish_data.get("ingredients", {})
+    })
+    ingredient_ids = _names_to_ids(session, Ingredient, ingredient_names)
+    
+    rows = [
+        {"dish_id": dish_ids[name], "ingredient_id": ingredient_ids[ing_name], "amount": amount}
+        for name, (dish_data, _) in changed.items()
+        for ing_name, amount in dish_data.get("ingredients", {}).items()
+        if ing_name in ingredient_ids
+    ]
+    for batch in _batches(rows):
+        session.execute(insert(DishIngredient), batch)
+    
+    _store_seed_hashes(
+        session, SEED_KIND_DISH, {n: h for n, (_, h) in changed.items()}, known
+    )
+    return len(changed)
+
+
+def sync_database(session: Session, manifest_hash: Optional[str] = None) -> Dict[str, int]:
+    """
+    Incrementally synchronize the database with the seed data files.
+    
+    Compares a hash of the data files with the one stored on the previous
+    sync and returns immediately when they match. Otherwise only records
+    whose content hash changed are upserted. Records removed from the
+    files are left in the database untouched.
+    
+    Args:
+        session: Database session
+        manifest_hash: Precomputed hash of the data files
+        
+    Returns:
+        Dictionary with counts of inserted or updated items
+    """
+    manifest_hash = manifest_hash or compute_manifest_hash()
+    stored = session.get(SeedRecord, (SEED_KIND_MANIFEST, SEED_MANIFEST_NAME))
+    if stored is not None and stored.content_hash == manifest_hash:
+        return {"ingredients": 0, "dishes": 0}
+    
+    ingredients_synced = sync_ingredients(session, load_ingredients_from_file())
+    dishes_synced = sync_dishes(session, load_dishes_from_file())
+    if ingredients_synced or dishes_synced:
+        # Bulk writes bypass the commit hook that maintains dish totals
+        DishRepository(session).refresh_nutrition()
+    
+    if stored is None:
+        session.add(SeedRecord(
+            kind=SEED_KIND_MANIFEST,
+            name=SEED_MANIFEST_NAME,
+            content_hash=manifest_hash
+        ))
+    else:
+        stored.content_hash = manifest_hash
+    session.commit()
+    
+    return {
+        "ingredients": ingredients_synced,
+        "dishes": dishes_synced
+    }
+
+
+def init_database(force: bool = False, sync: bool = False) -> Dict[str, int]:
     """
     Initialize database with initial data from JSON files.
     
     Args:
         force: If True, repopulate even if database is not empty
+        sync: If True, incrementally sync changed seed records instead
         
     Returns:
         Dictionary with counts of added items
@@ -125,6 +337,11 @@ def init_database(force: bool = False) -> Dict[str, int]:
     
     session = SessionLocal()
     try:
+        if sync:
+            result = sync_database(session)
+            print(f"Database synced: {result['ingredients']} ingredients, {result['dishes']} dishes updated")
+            return result
+        
         # Check if database is empty or force is True
         if not force and not is_database_empty(session):
             print("Database already contains data. Use force=True to repopulate.")
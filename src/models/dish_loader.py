@@ -2,12 +2,48 @@
 Module for loading dishes from database.
 """
 
-from typing import Dict, List
+from array import array
+from typing import Dict, Iterator, List, NamedTuple, Optional, Tuple
+
+from sqlalchemy import select
+
 from src.models.dish import Dish
 from src.models.ingredient import Ingredient
 from src.models.interfaces import DishLoaderInterface
+from src.models.nutrition import NutritionInfo
+from src.models.nutrition_calculator import NutritionCalculator
 from src.database import get_session, Dish as DbDish, DishIngredient, Ingredient as DbIngredient
 
+
+class DishColumns(NamedTuple):
+    """
+    All dishes in columnar form.
+    
+    Dish `i` has ID `ids[i]` and name `names[i]`; its composition is
+    `ingredient_names[offsets[i]:offsets[i + 1]]` with the amounts at the
+    same positions. Ingredient names are shared between dishes, so the
+    whole catalog costs a few arrays instead of a dict per dish.
+    """
+    ids: array
+    names: Tuple[str, ...]
+    offsets: array
+    ingredient_names: Tuple[str, ...]
+    amounts: array
+    
+    def __len__(self) -> int:
+        return len(self.ids)
+    
+    def ingredients(self, position: int) -> Dict[str, float]:
+        """Composition of the dish at a position, name to grams."""
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return dict(zip(self.ingredient_names[start:end], self.amounts[start:end]))
+    
+    def dishes(self) -> Iterator[Tuple[int, str, Dict[str, float]]]:
+        """(id, name, composition) of every dish, in ID order."""
+        for position in range(len(self.ids)):
+            yield self.ids[position], self.names[position], self.ingredients(position)
+
+
 class DishLoader(DishLoaderInterface):
     """
     Class for loading dishes from database.
@@ -18,45 +54,72 @@ class DishLoader(DishLoaderInterface):
         Initialize the DishLoader.
         """
         pass
+    
+    def load_columns(self) -> DishColumns:
+        """
+        Load all dishes and their compositions with a single query.
         
+        Dishes without ingredients are included with an empty composition.
+        
+        Returns:
+            DishColumns: Dishes in ID order
+        """
+        ids, names = array("q"), []
+        offsets = array("q", [0])
+        ingredient_names, amounts = [], array("d")
+        shared: Dict[str, str] = {}
+        
+        with get_session() as session:
+            rows = session.execute(
+                select(DbDish.id, DbDish.name, DbIngredient.name, DishIngredient.amount)
+                .outerjoin(DishIngredient, DishIngredient.dish_id == DbDish.id)
+                .outerjoin(DbIngredient, DbIngredient.id == DishIngredient.ingredient_id)
+                .order_by(DbDish.id)
+            )
+            for dish_id, dish_name, ingredient_name, amount in rows:
+                if not ids or ids[-1] != dish_id:
+                    if ids:
+                        offsets.append(len(amounts))
+                    ids.append(dish_id)
+                    names.append(dish_name)
+                # Rows of dishes without ingredients, or with a dangling
+                # ingredient reference, carry no ingredient name
+                if ingredient_name is not None:
+                    ingredient_names.append(shared.setdefault(ingredient_name, ingredient_name))
+                    amounts.append(amount)
+        if ids:
+            offsets.append(len(amounts))
+        
+        return DishColumns(ids, tuple(names), offsets, tuple(ingredient_names), amounts)
+    
     def load_dishes(self, ingredient_dict: Dict[str, Ingredient]) -> List[Dish]:
         """
         Load all dishes from database.
         
         Args:
             ingredient_dict (Dict[str, Ingredient]): Dictionary of existing ingredients
-            
+        
         Returns:
             List[Dish]: List of Dish objects
         """
-        session = get_session()
-        dishes = []
-        try:
-            for db_dish in session.query(DbDish).all():
-                ingredients = {}
-                for di in db_dish.ingredients:
-                    # Проверяем, что ингредиент существует перед доступом к его атрибутам
-                    if di.ingredient is not None:
-                        ingredients[di.ingredient.name] = di.amount
-                dish = Dish(
-                    id=db_dish.id,
-                    name=db_dish.name,
-                    ingredients=ingredients
-                )
-                dishes.append(dish)
-        finally:
-            session.close()
-        return dishes
-
+        return [
+            Dish(id=dish_id, name=name, ingredients=ingredients)
+            for dish_id, name, ingredients in self.load_columns().dishes()
+        ]
+    
     def save(self, dish_data: dict):
         """
         Save a dish to the database.
         
+        Ingredients missing from the database are skipped.
+        
         Args:
             dish_data (dict): Dictionary containing 'name' and 'ingredients'
+        
+        Returns:
+            int: ID of the created or updated dish
         """
-        session = get_session()
-        try:
+        with get_session() as session:
             # Check if dish exists by name
             db_dish = session.query(DbDish).filter_by(name=dish_data['name']).first()
             if not db_dish:
@@ -67,21 +130,20 @@ class DishLoader(DishLoaderInterface):
             # Clear existing ingredients
             session.query(DishIngredient).filter_by(dish_id=db_dish.id).delete()
             
-            # Add new ingredients
+            # Add new ingredients, resolving all names in one query
+            ingredient_ids = dict(session.execute(
+                select(DbIngredient.name, DbIngredient.id)
+                .where(DbIngredient.name.in_(list(dish_data['ingredients'])))
+            ).all())
             for name, amount in dish_data['ingredients'].items():
-                db_ingredient = session.query(DbIngredient).filter_by(name=name).first()
-                if db_ingredient:
-                    dish_ing = DishIngredient(
+                if name in ingredient_ids:
+                    session.add(DishIngredient(
                         dish_id=db_dish.id,
-                        ingredient_id=db_ingredient.id,
+                        ingredient_id=ingredient_ids[name],
                         amount=amount
-                    )
-                    session.add(dish_ing)
-            
-            session.commit()
-        finally:
-            session.close()
-
+                    ))
+            return db_dish.id
+    
     def delete_dish(self, dish_id: int):
         """
         Удаляет блюдо из базы данных по ID.
@@ -89,65 +151,65 @@ class DishLoader(DishLoaderInterface):
         Args:
             dish_id: ID блюда
         """
-        session = get_session()
-        try:
+        with get_session() as session:
             # Удаляем связанные ингредиенты
             session.query(DishIngredient).filter_by(dish_id=dish_id).delete()
             # Удаляем само блюдо
             session.query(DbDish).filter_by(id=dish_id).delete()
-            session.commit()
-        finally:
-            session.close()
-
-    def get_dish_by_id(self, dish_id: int):
+    
+    def get_dish_by_id(self, dish_id: int) -> Optional[Dish]:
         """
         Получает блюдо из базы данных по ID.
         
+        Only the dish's own rows and the macros of its ingredients are
+        read, in a single query.
+        
         Args:
             dish_id: ID блюда
-            
+        
         Returns:
             Dish object with nutrition info or None if not found
         """
-        from src.models.ingredient_data_loader import IngredientDataLoader
-        from src.models.nutrition_calculator import NutritionCalculator
+        with get_session() as session:
+            rows = session.execute(
+                select(
+                    DbDish.name,
+                    DbIngredient.name,
+                    DishIngredient.amount,
+                    DbIngredient.protein_g,
+                    DbIngredient.fat_g,
+                    DbIngredient.carbohydrates_g,
+                )
+                .outerjoin(DishIngredient, DishIngredient.dish_id == DbDish.id)
+                .outerjoin(DbIngredient, DbIngredient.id == DishIngredient.ingredient_id)
+                .where(DbDish.id == dish_id)
+            ).all()
+        if not rows:
+            return None
         
-        session = get_session()
-        try:
-            db_dish = session.query(DbDish).filter_by(id=dish_id).first()
-            if not db_dish:
-                return None
-            
-            # Load ingredients and calculate nutrition
-            ingredient_loader = IngredientDataLoader()
-            nutrition_calculator = NutritionCalculator()
-            
-            ingredients_dict = {}
-            for di in db_dish.ingredients:
-                if di.ingredient is not None:
-                    ingredients_dict[di.ingredient.name] = di.amount
-            
-            # Create dish with nutrition info
-            dish = Dish(
-                id=db_dish.id,
-                name=db_dish.name,
-                ingredients=ingredients_dict
-            )
-            
-            # Calculate nutrition for the dish
-            # load_ingredients returns Dict[str, Ingredient], but calculate_total_nutrition_info
-            # expects Dict[str, NutritionInfo], so we need to convert
-            ingredients = ingredient_loader.load_ingredients()
-            ingredients_nutrition = {name: ing.nutrition for name, ing in ingredients.items()}
-            nutrition_info = nutrition_calculator.calculate_total_nutrition_info(ingredients_nutrition, ingredients_dict)
-            
-            # Add nutrition attributes to dish
-            dish.energy_kcal = nutrition_info.calories
-            dish.protein_g = nutrition_info.proteins
-            dish.fat_g = nutrition_info.fats
-            dish.carbohydrates_g = nutrition_info.carbohydrates
-            dish.weight_g = sum(ingredients_dict.values())
-            
-            return dish
-        finally:
-            session.close()
+        ingredients_dict: Dict[str, float] = {}
+        ingredients_nutrition: Dict[str, NutritionInfo] = {}
+        for _, name, amount, protein, fat, carbohydrates in rows:
+            if name is not None:
+                ingredients_dict[name] = amount
+                ingredients_nutrition[name] = NutritionInfo.from_protein_fat_carb(protein, fat, carbohydrates)
+        
+        # Create dish with nutrition info
+        dish = Dish(
+            id=dish_id,
+            name=rows[0][0],
+            ingredients=ingredients_dict
+        )
+        
+        nutrition_info = NutritionCalculator().calculate_total_nutrition_info(
+            ingredients_nutrition, ingredients_dict
+        )
+        
+        # Add nutrition attributes to dish
+        dish.energy_kcal = nutrition_info.calories
+        dish.protein_g = nutrition_info.proteins
+        dish.fat_g = nutrition_info.fats
+        dish.carbohydrates_g = nutrition_info.carbohydrates
+        dish.weight_g = sum(ingredients_dict.values())
+        
+        return dish
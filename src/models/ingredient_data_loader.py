@@ -3,10 +3,13 @@
 Ingredient data loader service for loading ingredients from database.
 """
 
-from typing import Dict
+from typing import Dict, Iterable, List
 from src.models import Ingredient, NutritionInfo
 from src.models.interfaces import IngredientLoaderInterface
-from src.database import get_session, Ingredient as DbIngredient
+from src.database import get_session, DishIngredient, Ingredient as DbIngredient
+
+# Names looked up per IN query when saving changes
+SAVE_BATCH_SIZE = 500
 
 
 class IngredientDataLoader(IngredientLoaderInterface):
@@ -22,9 +25,8 @@ class IngredientDataLoader(IngredientLoaderInterface):
             Dict[str, Ingredient]: Dictionary of Ingredient objects loaded from database,
                                    keyed by ingredient name
         """
-        session = get_session()
         ingredients = {}
-        try:
+        with get_session() as session:
             for db_ingredient in session.query(DbIngredient).all():
                 # Calculate calories (4 kcal/g protein, 9 kcal/g fat, 4 kcal/g carbs)
                 calories = (
@@ -45,19 +47,78 @@ class IngredientDataLoader(IngredientLoaderInterface):
                     nutrition=nutrition
                 )
                 ingredients[db_ingredient.name] = ingredient
-        finally:
-            session.close()
         return ingredients
 
+    def save_changes(self, upserts: Dict[str, Ingredient], deletes: Iterable[str] = ()) -> None:
+        """
+        Write only changed ingredients, in one transaction.
+        
+        Existing rows are updated in place, so their IDs and the dish
+        compositions referencing them are kept; new names are inserted.
+        Deleted ingredients are also removed from dish compositions. The
+        writes go through the ORM unit of work, which batches them and
+        refreshes the nutrition of affected dishes on commit.
+        
+        Args:
+            upserts: Ingredients to insert or update, keyed by name
+            deletes: Names of ingredients to delete
+        """
+        deletes = [name for name in deletes if name not in upserts]
+        if not upserts and not deletes:
+            return
+        
+        with get_session() as session:
+            existing = {
+                row.name: row
+                for row in self._query_by_names(session, list(upserts) + deletes)
+            }
+            
+            for name, ingredient in upserts.items():
+                nutrition = ingredient.nutrition
+                row = existing.get(name)
+                if row is None:
+                    session.add(DbIngredient(
+                        name=name,
+                        protein_g=nutrition.proteins,
+                        fat_g=nutrition.fats,
+                        carbohydrates_g=nutrition.carbohydrates
+                    ))
+                else:
+                    row.protein_g = nutrition.proteins
+                    row.fat_g = nutrition.fats
+                    row.carbohydrates_g = nutrition.carbohydrates
+            
+            deleted_ids = [existing[name].id for name in deletes if name in existing]
+            for start in range(0, len(deleted_ids), SAVE_BATCH_SIZE):
+                batch = deleted_ids[start:start + SAVE_BATCH_SIZE]
+                for link in session.query(DishIngredient).filter(DishIngredient.ingredient_id.in_(batch)):
+                    session.delete(link)
+            for name in deletes:
+                if name in existing:
+                    session.delete(existing[name])
+    
+    @staticmethod
+    def _query_by_names(session, names: List[str]) -> List[DbIngredient]:
+        """Ingredient rows with the given names, in batches of IN queries."""
+        rows = []
+        for start in range(0, len(names), SAVE_BATCH_SIZE):
+            rows.extend(
+                session.query(DbIngredient)
+                .filter(DbIngredient.name.in_(names[start:start + SAVE_BATCH_SIZE]))
+            )
+        return rows
+    
     def save(self, ingredients: Dict[str, Ingredient]) -> None:
         """
-        Save ingredients to database.
+        Save ingredients to database, replacing all existing rows.
+        
+        Prefer save_changes: replacing every row also changes the IDs that
+        dish compositions refer to.
         
         Args:
             ingredients: Dictionary of Ingredient objects to save, keyed by name
         """
-        session = get_session()
-        try:
+        with get_session() as session:
             # Удаляем все существующие ингредиенты
             session.query(DbIngredient).delete()
             
@@ -71,10 +132,3 @@ class IngredientDataLoader(IngredientLoaderInterface):
                     carbohydrates_g=nutrition.carbohydrates
                 )
                 session.add(db_ingredient)
-            
-            session.commit()
-        except Exception as e:
-            session.rollback()
-            raise e
-        finally:
-            session.close()
@@ -0,0 +1,118 @@
+"""
+SQL query accounting.
+
+Engine events count the statements executed and the time spent in the
+database. Counts go to the stats of the current request (a context
+variable, so threadpool work started by the request is included) and to
+any process-wide captures, which tests use to enforce query budgets.
+Observers (such as the slow query log) see every statement with its
+duration.
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Callable, Iterator, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_START_KEY = "query_stats_start"
+
+
+class QueryStats:
+    """Number of statements and database time of a unit of work."""
+
+    def __init__(self, keep_statements: bool = False, parent: Optional["QueryStats"] = None):
+        self.count = 0
+        self.duration = 0.0
+        self.statements: Optional[List[str]] = [] if keep_statements else None
+        self.parent = parent
+        self._lock = threading.Lock()
+
+    def add(self, statement: str, duration: float) -> None:
+        """Record one executed statement, here and in enclosing stats."""
+        with self._lock:
+            self.count += 1
+            self.duration += duration
+            if self.statements is not None:
+                self.statements.append(statement)
+        if self.parent is not None:
+            self.parent.add(statement, duration)
+
+    @property
+    def duration_ms(self) -> float:
+        """Database time in milliseconds."""
+        return self.duration * 1000
+
+
+_current: ContextVar[Optional[QueryStats]] = ContextVar("query_stats", default=None)
+_captures: List[QueryStats] = []
+_observers: List[Callable] = []
+
+
+def add_observer(observer: Callable) -> None:
+    """
+    Register a callable run after every statement.
+
+    It is called as `observer(conn, statement, parameters, context,
+    executemany, duration)` and must be cheap for fast statements.
+    """
+    _observers.append(observer)
+
+
+def current_queries() -> Optional[QueryStats]:
+    """Stats of the current request, if it is being tracked."""
+    return _current.get()
+
+
+@contextmanager
+def track_queries(keep_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Count statements executed in the current context (one request).
+
+    Nested tracking also counts into the enclosing stats.
+    """
+    stats = QueryStats(keep_statements, parent=_current.get())
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def capture_queries() -> Iterator[QueryStats]:
+    """Count every statement executed by the process, with its SQL."""
+    stats = QueryStats(keep_statements=True)
+    _captures.append(stats)
+    try:
+        yield stats
+    finally:
+        _captures.remove(stats)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _start_timer(conn, cursor, statement, parameters, context, executemany) -> None:
+    conn.info.setdefault(_START_KEY, []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _record_query(conn, cursor, statement, parameters, context, executemany) -> None:
+    duration = time.perf_counter() - conn.info[_START_KEY].pop()
+    stats = _current.get()
+    if stats is not None:
+        stats.add(statement, duration)
+    for capture in _captures:
+        capture.add(statement, duration)
+    for observer in _observers:
+        observer(conn, statement, parameters, context, executemany, duration)
+
+
+@event.listens_for(Engine, "handle_error")
+def _discard_timer(context) -> None:
+    # A failed statement never reaches after_cursor_execute
+    conn = context.connection
+    if conn is not None and conn.info.get(_START_KEY):
+        conn.info[_START_KEY].pop()
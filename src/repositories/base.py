@@ -6,12 +6,14 @@ from abc import ABC, abstractmethod
 from typing import Generic, TypeVar, List, Optional, Type
 from sqlalchemy.orm import Session
 
+from src.tracing import trace_methods
 from src.database import Base
 
 # Generic type variables
 ModelType = TypeVar("ModelType", bound=Base)
 
 
+@trace_methods
 class BaseRepository(ABC, Generic[ModelType]):
     """
     Abstract base repository providing common database operations.
@@ -2,14 +2,41 @@
 Repository for Dish data access.
 """
 
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from sqlalchemy.orm import Session, joinedload, selectinload
-from sqlalchemy import func
+from sqlalchemy import func, update
 
+from src.tracing import trace_methods
 from src.repositories.base import BaseRepository
 from src.database import Dish, DishIngredient, Ingredient
 
+# Listing sort keys mapped to dish columns; append _asc or _desc to a key
+SORT_COLUMNS = {
+    "name": func.lower(Dish.name),
+    "weight": Dish.weight_g,
+    "kcal": Dish.energy_kcal,
+    "protein": Dish.protein_g,
+    "fat": Dish.fat_g,
+    "carbs": Dish.carbohydrates_g,
+    "kcal_density": Dish.energy_kcal_per_100g,
+    "protein_density": Dish.protein_per_100g,
+    "fat_density": Dish.fat_per_100g,
+    "carbs_density": Dish.carbohydrates_per_100g,
+}
 
+# Nutrition ranges that listings can be filtered by
+FILTER_COLUMNS = {
+    "kcal": Dish.energy_kcal,
+    "protein": Dish.protein_g,
+    "fat": Dish.fat_g,
+    "carbs": Dish.carbohydrates_g,
+}
+
+# Dishes refreshed per UPDATE batch
+REFRESH_BATCH_SIZE = 500
+
+
+@trace_methods
 class DishRepository(BaseRepository[Dish]):
     """
     Repository for Dish CRUD operations.
@@ -35,6 +62,23 @@ class DishRepository(BaseRepository[Dish]):
             selectinload(Dish.ingredients).selectinload(DishIngredient.ingredient)
         ).filter(Dish.id == dish_id).first()
     
+    def get_many_with_ingredients(self, dish_ids: List[int]) -> List[Dish]:
+        """
+        Get several dishes with their ingredients in a single query.
+        Compositions and ingredient rows are joined eagerly.
+        
+        Args:
+            dish_ids: IDs of dishes to retrieve
+            
+        Returns:
+            List of dishes with loaded ingredients (missing IDs are skipped)
+        """
+        if not dish_ids:
+            return []
+        return self.db.query(Dish).options(
+            joinedload(Dish.ingredients).joinedload(DishIngredient.ingredient)
+        ).filter(Dish.id.in_(set(dish_ids))).all()
+    
     def get_all_with_ingredients(self, skip: int = 0, limit: int = 100) -> List[Dish]:
         """
         Get all dishes with loaded ingredients.
@@ -51,6 +95,96 @@ class DishRepository(BaseRepository[Dish]):
             selectinload(Dish.ingredients).selectinload(DishIngredient.ingredient)
         ).order_by(Dish.name).offset(skip).limit(limit).all()
     
+    @staticmethod
+    def parse_sort(sort: str) -> Tuple[str, bool]:
+        """
+        Validate a listing sort key such as "protein_desc".
+        
+        Args:
+            sort: Sort key, optionally suffixed with _asc or _desc
+            
+        Returns:
+            Tuple of (column key, descending)
+            
+        Raises:
+            ValueError: If the sort key is unknown
+        """
+        key, descending = sort, False
+        if sort.endswith("_desc"):
+            key, descending = sort[:-5], True
+        elif sort.endswith("_asc"):
+            key = sort[:-4]
+        if key not in SORT_COLUMNS:
+            raise ValueError(
+                f"Unknown sort '{sort}'. Allowed: {', '.join(SORT_COLUMNS)} with optional _asc/_desc"
+            )
+        return key, descending
+    
+    def _nutrition_query(
+        self,
+        query,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]],
+        sort: str
+    ):
+        """Apply nutrition range filters and ordering to a dish query."""
+        for key, (low, high) in (ranges or {}).items():
+            column = FILTER_COLUMNS[key]
+            if low is not None:
+                query = query.filter(column >= low)
+            if high is not None:
+                query = query.filter(column <= high)
+        key, descending = self.parse_sort(sort)
+        column = SORT_COLUMNS[key]
+        return query.order_by(column.desc() if descending else column.asc(), Dish.id)
+    
+    def get_all_by_nutrition(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        sort: str = "name"
+    ) -> List[Dish]:
+        """
+        Get a page of dishes filtered and sorted by precomputed nutrition.
+        Filtering, sorting and paging all run in the database.
+        
+        Args:
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            ranges: Mapping of FILTER_COLUMNS keys to (min, max); None bounds are open
+            sort: Sort key (see parse_sort)
+            
+        Returns:
+            List of dishes without loaded compositions
+            
+        Raises:
+            ValueError: If the sort key is unknown
+        """
+        query = self._nutrition_query(self.db.query(Dish), ranges, sort)
+        return query.offset(skip).limit(limit).all()
+    
+    def get_names(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        sort: str = "name"
+    ) -> List[Tuple[int, str]]:
+        """
+        Get dish ids and names only, without loading compositions.
+        
+        Args:
+            skip: Number of records to skip
+            limit: Maximum number of records to return
+            ranges: Mapping of FILTER_COLUMNS keys to (min, max)
+            sort: Sort key (see parse_sort)
+            
+        Returns:
+            List of (id, name) tuples in listing order
+        """
+        query = self._nutrition_query(self.db.query(Dish.id, Dish.name), ranges, sort)
+        return query.offset(skip).limit(limit).all()
+    
     def get_by_name(self, name: str) -> Optional[Dish]:
         """
         Get dish by name (case-insensitive).
@@ -210,6 +344,92 @@ class DishRepository(BaseRepository[Dish]):
             if di.ingredient is not None
         }
     
+    def get_nutrition_totals(self, dish_ids: List[int]) -> Dict[int, Dict[str, float]]:
+        """
+        Aggregate weight and nutrition of dishes in the database.
+        
+        Args:
+            dish_ids: IDs of dishes to aggregate
+            
+        Returns:
+            Dictionary mapping dish ID to its rounded totals; dishes without
+            ingredients get zero totals, unknown IDs are skipped
+        """
+        if not dish_ids:
+            return {}
+        
+        protein = func.sum(DishIngredient.amount * Ingredient.protein_g) / 100
+        fat = func.sum(DishIngredient.amount * Ingredient.fat_g) / 100
+        carbohydrates = func.sum(DishIngredient.amount * Ingredient.carbohydrates_g) / 100
+        rows = self.db.query(
+            DishIngredient.dish_id,
+            func.sum(DishIngredient.amount),
+            protein,
+            fat,
+            carbohydrates,
+        ).join(Ingredient, Ingredient.id == DishIngredient.ingredient_id).filter(
+            DishIngredient.dish_id.in_(dish_ids)
+        ).group_by(DishIngredient.dish_id).all()
+        
+        zero = (0.0, 0.0, 0.0, 0.0)
+        totals = {row[0]: row[1:] for row in rows}
+        existing = self.db.query(Dish.id).filter(Dish.id.in_(dish_ids)).all()
+        
+        result = {}
+        for (dish_id,) in existing:
+            weight, p, f, c = (float(v or 0.0) for v in totals.get(dish_id, zero))
+            result[dish_id] = {
+                "weight_g": round(weight, 2),
+                "energy_kcal": round(p * 4 + f * 9 + c * 4, 2),
+                "protein_g": round(p, 2),
+                "fat_g": round(f, 2),
+                "carbohydrates_g": round(c, 2),
+            }
+        return result
+    
+    def refresh_nutrition(self, dish_ids: Optional[List[int]] = None) -> Dict[int, Dict[str, float]]:
+        """
+        Recompute the stored nutrition columns of dishes.
+        
+        Args:
+            dish_ids: IDs of dishes to refresh; None refreshes every dish
+            
+        Returns:
+            Dictionary mapping dish ID to its new totals (see get_nutrition_totals)
+        """
+        if dish_ids is None:
+            dish_ids = [dish_id for (dish_id,) in self.db.query(Dish.id).all()]
+        
+        result = {}
+        ids = sorted(set(dish_ids))
+        for start in range(0, len(ids), REFRESH_BATCH_SIZE):
+            totals = self.get_nutrition_totals(ids[start:start + REFRESH_BATCH_SIZE])
+            if not totals:
+                continue
+            self.db.execute(update(Dish), [
+                {"id": dish_id, **values, **_densities(values)}
+                for dish_id, values in totals.items()
+            ])
+            result.update(totals)
+        return result
+    
+    def get_ids_containing(self, ingredient_ids: List[int]) -> List[int]:
+        """
+        Get IDs of dishes that contain any of the given ingredients.
+        
+        Args:
+            ingredient_ids: Ingredient IDs to look for
+            
+        Returns:
+            Sorted list of dish IDs
+        """
+        if not ingredient_ids:
+            return []
+        rows = self.db.query(DishIngredient.dish_id).filter(
+            DishIngredient.ingredient_id.in_(ingredient_ids)
+        ).distinct().all()
+        return sorted(dish_id for (dish_id,) in rows)
+    
     def name_exists(self, name: str, exclude_id: Optional[int] = None) -> bool:
         """
         Check if dish name already exists.
@@ -231,3 +451,21 @@ class DishRepository(BaseRepository[Dish]):
     def count(self) -> int:
         """Get total count of dishes."""
         return self.db.query(Dish).count()
+
+
+def _densities(totals: Dict[str, float]) -> Dict[str, float]:
+    """Per-100g nutrition densities of a dish from its totals."""
+    weight = totals["weight_g"]
+    if weight <= 0:
+        return {
+            "energy_kcal_per_100g": 0.0,
+            "protein_per_100g": 0.0,
+            "fat_per_100g": 0.0,
+            "carbohydrates_per_100g": 0.0,
+        }
+    return {
+        "energy_kcal_per_100g": round(totals["energy_kcal"] * 100 / weight, 2),
+        "protein_per_100g": round(totals["protein_g"] * 100 / weight, 2),
+        "fat_per_100g": round(totals["fat_g"] * 100 / weight, 2),
+        "carbohydrates_per_100g": round(totals["carbohydrates_g"] * 100 / weight, 2),
+    }
@@ -2,14 +2,16 @@
 Repository for Ingredient data access.
 """
 
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 from sqlalchemy.orm import Session
 from sqlalchemy import func
 
+from src.tracing import trace_methods
 from src.repositories.base import BaseRepository
 from src.database import Ingredient
 
 
+@trace_methods
 class IngredientRepository(BaseRepository[Ingredient]):
     """
     Repository for Ingredient CRUD operations.
@@ -64,6 +66,28 @@ class IngredientRepository(BaseRepository[Ingredient]):
             Ingredient.name
         ).offset(skip).limit(limit).all()
     
+    def get_names(
+        self,
+        skip: int = 0,
+        limit: int = 100,
+        search: Optional[str] = None
+    ) -> List[Tuple[int, str]]:
+        """
+        Get ingredient ids and names only.
+        
+        Args:
+            skip: Number of records to skip (ignored when searching)
+            limit: Maximum number of records to return
+            search: Optional search query to filter by name
+            
+        Returns:
+            List of (id, name) tuples; sorted by name unless searching
+        """
+        query = self.db.query(Ingredient.id, Ingredient.name)
+        if search:
+            return query.filter(Ingredient.name.ilike(f"%{search}%")).limit(limit).all()
+        return query.order_by(Ingredient.name).offset(skip).limit(limit).all()
+    
     def create_ingredient(
         self, 
         name: str, 
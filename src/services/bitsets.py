@@ -0,0 +1,37 @@
+"""
+Sets of small non-negative integers stored as Python integers.
+
+Bit `i` is set when position `i` is a member. Union, intersection and
+difference are `|`, `&` and `& ~`, which CPython runs over machine words,
+so combining sets of 100k positions costs microseconds. Sparse sets
+starting at low positions stay small; the size of a set is bounded by its
+highest member, not by its count.
+"""
+
+import re
+from typing import Iterable, Iterator
+
+_NONZERO_BYTE = re.compile(rb"[^\x00]")
+
+
+def from_positions(positions: Iterable[int]) -> int:
+    """Bitset with the given positions set."""
+    positions = list(positions)
+    if not positions:
+        return 0
+    bits = bytearray((max(positions) >> 3) + 1)
+    for position in positions:
+        bits[position >> 3] |= 1 << (position & 7)
+    return int.from_bytes(bits, "little")
+
+
+def iter_positions(bits: int) -> Iterator[int]:
+    """Set positions in ascending order; runs of zero bytes are skipped in C."""
+    raw = bits.to_bytes((bits.bit_length() + 7) >> 3, "little")
+    for match in _NONZERO_BYTE.finditer(raw):
+        index = match.start()
+        byte, base = raw[index], index << 3
+        while byte:
+            lowest = byte & -byte
+            yield base + lowest.bit_length() - 1
+            byte ^= lowest
@@ -0,0 +1,110 @@
+"""
+Base class for in-memory catalog indexes kept in step with catalog writes.
+
+An index is built from the database on first use and remembers the
+catalog version it reflects. Change events of later commits are queued
+and applied on the next read, so a write costs the index only the rows it
+touched. Whenever the index cannot account for a version (a bulk write
+without events, a missed or reordered commit, a write by another worker
+seen through the shared snapshot generation), the next read rebuilds it.
+"""
+
+import threading
+from abc import ABC, abstractmethod
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.services.catalog_snapshot import catalog_snapshot
+from src.services.catalog_version import catalog_version
+
+
+class CatalogIndex(ABC):
+    """
+    Lazily built index refreshed from catalog change events.
+
+    Subclasses implement `_rebuild(session)` and `_apply(events, session)`;
+    readers call `sync(session)` before querying. Register instances with
+    `catalog_version.add_sink()` to receive events.
+    """
+
+    def __init__(self):
+        self._build_lock = threading.Lock()
+        self._events_lock = threading.Lock()
+        # Catalog version covered by the index and queued events, and the
+        # latest snapshot generation published by another worker it reflects
+        self._version: Optional[int] = None
+        self._generation: Optional[int] = None
+        self._pending: List[Dict] = []
+        self.rebuilds = 0
+        self.applied = 0
+
+    @property
+    def active(self) -> bool:
+        """Events are only wanted once the index has been built."""
+        return self._version is not None
+
+    def publish(self, version: int, events: List[Dict]) -> None:
+        """Queue the change events of a commit, or mark the index stale on a gap."""
+        with self._events_lock:
+            if self._version is None or version <= self._version:
+                return
+            if version != self._version + 1:
+                self._version = None
+                self._pending = []
+                return
+            self._pending.extend(events)
+            self._version = version
+
+    def invalidate(self) -> None:
+        """Force a rebuild on the next read."""
+        with self._events_lock:
+            self._version = None
+            self._pending = []
+
+    def sync(self, session: Session) -> None:
+        """
+        Bring the index up to date before a read.
+
+        Args:
+            session: Database session used to rebuild or to load changed rows
+        """
+        with self._build_lock:
+            with self._events_lock:
+                version, generation = catalog_version.value, catalog_snapshot.foreign_generation()
+                fresh = self._version == version and self._generation == generation
+                pending, self._pending = self._pending, []
+                if not fresh:
+                    # Commits landing during the rebuild queue up behind it;
+                    # applying them again to rows that already have them is harmless
+                    self._version, self._generation = version, generation
+            try:
+                if not fresh:
+                    self._rebuild(session)
+                    self.rebuilds += 1
+                elif pending:
+                    self._apply(pending, session)
+                    self.applied += len(pending)
+            except BaseException:
+                self.invalidate()
+                raise
+
+    def stats(self) -> Dict:
+        """Index freshness counters."""
+        return {
+            "built": self.active,
+            "version": self._version,
+            "rebuilds": self.rebuilds,
+            "events_applied": self.applied,
+            "events_pending": len(self._pending),
+        }
+
+    @abstractmethod
+    def _rebuild(self, session: Session) -> None:
+        """Build the index from scratch."""
+        pass
+
+    @abstractmethod
+    def _apply(self, events: List[Dict], session: Session) -> None:
+        """Apply the queued change events of contiguous commits."""
+        pass
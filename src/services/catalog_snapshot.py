@@ -0,0 +1,478 @@
+"""
+Memory-mapped catalog snapshot shared by all workers on a host.
+
+The computed catalog (ingredient macro matrix, dish compositions, dish
+nutrition and case-insensitive name indexes) is written into one binary
+file. Every worker maps the file read-only, so the pages live once in the
+OS page cache no matter how many workers there are, and section arrays are
+read through zero-copy memoryviews.
+
+A writer builds the next version into a temporary file and publishes it
+with an atomic rename; readers notice the new inode on their next access
+and map it. Each published file carries a generation number that all
+workers agree on, which makes it usable as a shared catalog version.
+
+Catalog commits do not publish on the request path: they wake a background
+thread, which waits for a short quiet period and then publishes once for
+every commit made so far, so bursts of writes cost one rebuild.
+
+File layout (little endian, sections 8-byte aligned):
+
+    header     magic, format, lineage, generation, counts
+    sections   (offset, length) table followed by the section data
+"""
+
+import array
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+from sqlalchemy.orm import Session
+
+from src.api.config import get_settings
+from src.database import SessionLocal, Ingredient, Dish, DishIngredient
+from src.services.catalog_version import catalog_version
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b"MCAT"
+FORMAT_VERSION = 1
+
+# Quiet period after a commit before the snapshot is republished; commits
+# landing meanwhile are published together
+PUBLISH_DELAY_S = 0.05
+
+# Wait before retrying a failed publish, doubled per failure up to the maximum;
+# commits stay pending meanwhile, so ETags keep the local version
+PUBLISH_RETRY_S = 0.5
+PUBLISH_RETRY_MAX_S = 30.0
+
+# magic, format, lineage, generation, ingredients, dishes, components
+HEADER = struct.Struct("<4sI8sQIII")
+
+# Sections in file order: (name, array typecode)
+SECTIONS = (
+    ("ingredient_ids", "q"),
+    ("ingredient_macros", "d"),        # protein, fat, carbohydrates per 100 g
+    ("dish_ids", "q"),                 # ascending
+    ("dish_nutrition", "d"),           # weight, kcal, protein, fat, carbohydrates
+    ("component_offsets", "I"),        # per dish, into the component arrays
+    ("component_ingredients", "I"),    # ingredient positions
+    ("component_amounts", "d"),
+    ("ingredient_name_offsets", "I"),
+    ("ingredient_names", "B"),
+    ("dish_name_offsets", "I"),
+    ("dish_names", "B"),
+    ("ingredient_name_index", "I"),    # positions ordered by casefolded name
+    ("dish_name_index", "I"),
+)
+SECTION_TABLE = struct.Struct("<" + "QQ" * len(SECTIONS))
+
+NUTRITION_FIELDS = ("weight_g", "energy_kcal", "protein_g", "fat_g", "carbohydrates_g")
+
+
+def _align(size: int) -> int:
+    return (size + 7) & ~7
+
+
+def _name_table(names: List[str]) -> Tuple[array.array, bytes]:
+    """Encode names as an offsets array and one UTF-8 blob."""
+    offsets = array.array("I", [0])
+    blob = bytearray()
+    for name in names:
+        blob += name.encode("utf-8")
+        offsets.append(len(blob))
+    return offsets, bytes(blob)
+
+
+def build_snapshot(session: Session, generation: int, lineage: bytes) -> bytes:
+    """
+    Serialize the current catalog.
+
+    Args:
+        session: Database session
+        generation: Generation number to store
+        lineage: 8-byte identifier shared by all generations of a file
+
+    Returns:
+        Snapshot file contents
+    """
+    ingredients = session.query(
+        Ingredient.id, Ingredient.name, Ingredient.protein_g, Ingredient.fat_g, Ingredient.carbohydrates_g
+    ).order_by(Ingredient.id).all()
+    dishes = session.query(
+        Dish.id, Dish.name, *(getattr(Dish, field) for field in NUTRITION_FIELDS)
+    ).order_by(Dish.id).all()
+    components = session.query(
+        DishIngredient.dish_id, DishIngredient.ingredient_id, DishIngredient.amount
+    ).order_by(DishIngredient.dish_id, DishIngredient.ingredient_id).all()
+
+    ingredient_position = {row.id: pos for pos, row in enumerate(ingredients)}
+    dish_position = {row.id: pos for pos, row in enumerate(dishes)}
+
+    per_dish: List[List[Tuple[int, float]]] = [[] for _ in dishes]
+    for dish_id, ingredient_id, amount in components:
+        if dish_id in dish_position and ingredient_id in ingredient_position:
+            per_dish[dish_position[dish_id]].append((ingredient_position[ingredient_id], amount))
+
+    component_offsets = array.array("I", [0])
+    component_ingredients = array.array("I")
+    component_amounts = array.array("d")
+    for items in per_dish:
+        for position, amount in items:
+            component_ingredients.append(position)
+            component_amounts.append(amount)
+        component_offsets.append(len(component_ingredients))
+
+    ingredient_names = [row.name for row in ingredients]
+    dish_names = [row.name for row in dishes]
+    ingredient_name_offsets, ingredient_blob = _name_table(ingredient_names)
+    dish_name_offsets, dish_blob = _name_table(dish_names)
+
+    data = {
+        "ingredient_ids": array.array("q", (row.id for row in ingredients)),
+        "ingredient_macros": array.array("d", (
+            value for row in ingredients for value in (row.protein_g, row.fat_g, row.carbohydrates_g)
+        )),
+        "dish_ids": array.array("q", (row.id for row in dishes)),
+        "dish_nutrition": array.array("d", (
+            float(value) for row in dishes for value in row[2:]
+        )),
+        "component_offsets": component_offsets,
+        "component_ingredients": component_ingredients,
+        "component_amounts": component_amounts,
+        "ingredient_name_offsets": ingredient_name_offsets,
+        "ingredient_names": ingredient_blob,
+        "dish_name_offsets": dish_name_offsets,
+        "dish_names": dish_blob,
+        "ingredient_name_index": array.array("I", sorted(
+            range(len(ingredient_names)), key=lambda pos: ingredient_names[pos].casefold()
+        )),
+        "dish_name_index": array.array("I", sorted(
+            range(len(dish_names)), key=lambda pos: dish_names[pos].casefold()
+        )),
+    }
+
+    header = HEADER.pack(
+        MAGIC, FORMAT_VERSION, lineage, generation,
+        len(ingredients), len(dishes), len(component_ingredients),
+    )
+    offset = _align(HEADER.size + SECTION_TABLE.size)
+    table = []
+    chunks = []
+    for name, _ in SECTIONS:
+        payload = data[name]
+        raw = payload.tobytes() if isinstance(payload, array.array) else payload
+        table.extend((offset, len(raw)))
+        chunks.append(raw + b"\0" * (_align(len(raw)) - len(raw)))
+        offset += _align(len(raw))
+
+    prefix = header + SECTION_TABLE.pack(*table)
+    return prefix + b"\0" * (_align(len(prefix)) - len(prefix)) + b"".join(chunks)
+
+
+class CatalogSnapshot:
+    """Read-only view of a mapped snapshot file."""
+
+    def __init__(self, path: str):
+        """
+        Map a snapshot file.
+
+        Args:
+            path: Snapshot file path
+
+        Raises:
+            ValueError: If the file is not a snapshot of a supported format
+        """
+        with open(path, "rb") as f:
+            self.inode = os.fstat(f.fileno()).st_ino
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        buffer = memoryview(self._mmap)
+        magic, fmt, lineage, generation, n_ingredients, n_dishes, n_components = HEADER.unpack_from(buffer)
+        if magic != MAGIC or fmt != FORMAT_VERSION:
+            raise ValueError(f"{path} is not a catalog snapshot (format {FORMAT_VERSION})")
+
+        self.lineage = lineage.hex()
+        self.generation = generation
+        self.ingredient_count = n_ingredients
+        self.dish_count = n_dishes
+        self.component_count = n_components
+
+        table = SECTION_TABLE.unpack_from(buffer, HEADER.size)
+        for index, (name, typecode) in enumerate(SECTIONS):
+            offset, length = table[2 * index], table[2 * index + 1]
+            view = buffer[offset:offset + length]
+            setattr(self, "_" + name, view if typecode == "B" else view.cast(typecode))
+
+    @property
+    def version(self) -> str:
+        """Version token shared by every worker mapping this file."""
+        return f"{self.lineage}-{self.generation}"
+
+    def dish_position(self, dish_id: int) -> Optional[int]:
+        """Position of a dish by ID, or None."""
+        position = bisect_left(self._dish_ids, dish_id)
+        if position < self.dish_count and self._dish_ids[position] == dish_id:
+            return position
+        return None
+
+    def dish_id(self, position: int) -> int:
+        """Database ID of the dish at a position."""
+        return self._dish_ids[position]
+
+    def dish_name(self, position: int) -> str:
+        """Name of the dish at a position."""
+        offsets = self._dish_name_offsets
+        return str(self._dish_names[offsets[position]:offsets[position + 1]], "utf-8")
+
+    def dish_nutrition(self, position: int) -> Dict[str, float]:
+        """Stored nutrition totals of the dish at a position."""
+        start = position * len(NUTRITION_FIELDS)
+        values = self._dish_nutrition[start:start + len(NUTRITION_FIELDS)]
+        return dict(zip(NUTRITION_FIELDS, values.tolist()))
+
+    def dish_components(self, position: int) -> Iterator[Tuple[int, float]]:
+        """(ingredient position, amount in grams) pairs of a dish."""
+        start, end = self._component_offsets[position], self._component_offsets[position + 1]
+        return zip(
+            self._component_ingredients[start:end].tolist(),
+            self._component_amounts[start:end].tolist(),
+        )
+
+    def ingredient_id(self, position: int) -> int:
+        """Database ID of the ingredient at a position."""
+        return self._ingredient_ids[position]
+
+    def ingredient_name(self, position: int) -> str:
+        """Name of the ingredient at a position."""
+        offsets = self._ingredient_name_offsets
+        return str(self._ingredient_names[offsets[position]:offsets[position + 1]], "utf-8")
+
+    def ingredient_macros(self, position: int) -> Tuple[float, float, float]:
+        """(protein, fat, carbohydrates) per 100 g of the ingredient at a position."""
+        start = position * 3
+        return tuple(self._ingredient_macros[start:start + 3].tolist())
+
+    def find_dish(self, name: str) -> Optional[int]:
+        """Position of a dish by case-insensitive name, or None."""
+        return self._find(name, self._dish_name_index, self.dish_name)
+
+    def find_ingredient(self, name: str) -> Optional[int]:
+        """Position of an ingredient by case-insensitive name, or None."""
+        return self._find(name, self._ingredient_name_index, self.ingredient_name)
+
+    @staticmethod
+    def _find(name: str, index, name_at: Callable[[int], str]) -> Optional[int]:
+        key = name.casefold()
+        i = bisect_left(index, key, key=lambda position: name_at(position).casefold())
+        if i < len(index) and name_at(index[i]).casefold() == key:
+            return index[i]
+        return None
+
+
+class SnapshotStore:
+    """
+    Publishes and maps the catalog snapshot file.
+
+    Readers call `current()`, which re-maps the file when a writer has
+    replaced it. Writers call `publish()`; concurrent publishers on a host
+    are serialized with a lock file so generations stay monotonic.
+    """
+
+    def __init__(self, path: str, session_factory: Callable[[], Session] = SessionLocal):
+        """
+        Initialize the store.
+
+        Args:
+            path: Snapshot file path; empty disables the snapshot
+            session_factory: Creates sessions used to read the catalog
+        """
+        self.path = path
+        self.session_factory = session_factory
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._lock = threading.Lock()
+        self.publishes = 0
+        self.publish_failures = 0
+        # Last generation published by this process, and the last one seen
+        # published by another process before it
+        self._own_generation: Optional[int] = None
+        self._foreign_generation: Optional[int] = None
+        # Commits requesting a publish, and how many of them are published
+        self._requested = 0
+        self._completed = 0
+        self._publisher: Optional[threading.Thread] = None
+        self._publish_state = threading.Condition()
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def current(self) -> Optional[CatalogSnapshot]:
+        """The latest published snapshot, or None if there is none."""
+        if not self.path:
+            return None
+        try:
+            inode = os.stat(self.path).st_ino
+        except FileNotFoundError:
+            return None
+
+        snapshot = self._snapshot
+        if snapshot is None or snapshot.inode != inode:
+            with self._lock:
+                snapshot = self._snapshot
+                if snapshot is None or snapshot.inode != inode:
+                    # The replaced mapping stays valid until its readers drop it
+                    snapshot = self._snapshot = CatalogSnapshot(self.path)
+        return snapshot
+
+    def version(self) -> Optional[str]:
+        """Shared catalog version from the latest snapshot, or None."""
+        snapshot = self.current()
+        return snapshot.version if snapshot is not None else None
+
+    @property
+    def pending(self) -> bool:
+        """A catalog commit of this process is not published yet."""
+        return self._completed < self._requested
+
+    def foreign_generation(self) -> Optional[int]:
+        """
+        Latest generation known to be published by another process.
+
+        A process follows its own writes through change events; a new
+        foreign generation means another worker changed the catalog.
+        """
+        snapshot = self.current()
+        if snapshot is None:
+            return None
+        if snapshot.generation == self._own_generation:
+            return self._foreign_generation
+        return snapshot.generation
+
+    def publish(self) -> int:
+        """
+        Build the snapshot from the database and atomically replace the file.
+
+        Returns:
+            The published generation
+        """
+        directory = os.path.dirname(os.path.abspath(self.path))
+        os.makedirs(directory, exist_ok=True)
+        with open(self.path + ".lock", "a") as lock_file:
+            if fcntl is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                previous = self.current()
+                if previous is not None and previous.generation != self._own_generation:
+                    self._foreign_generation = previous.generation
+                generation = previous.generation + 1 if previous else 1
+                lineage = bytes.fromhex(previous.lineage) if previous else uuid.uuid4().bytes[:8]
+
+                session = self.session_factory()
+                try:
+                    content = build_snapshot(session, generation, lineage)
+                finally:
+                    session.close()
+
+                fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".catalog-", suffix=".tmp")
+                try:
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(content)
+                        f.flush()
+                        os.fsync(f.fileno())
+                    os.chmod(tmp_path, 0o644)
+                    os.replace(tmp_path, self.path)
+                    self._own_generation = generation
+                except BaseException:
+                    os.unlink(tmp_path)
+                    raise
+            finally:
+                if fcntl is not None:
+                    fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+        self.publishes += 1
+        return generation
+
+    def publish_later(self, version: Optional[int] = None) -> None:
+        """Schedule a background publish after a catalog commit."""
+        if not self.enabled:
+            return
+        with self._publish_state:
+            self._requested += 1
+            if self._publisher is None or not self._publisher.is_alive():
+                self._publisher = threading.Thread(
+                    target=self._publish_loop, name="catalog-snapshot", daemon=True
+                )
+                self._publisher.start()
+            self._publish_state.notify_all()
+
+    def _publish_loop(self) -> None:
+        """Publish whenever commits are waiting, retrying failures with backoff."""
+        retry = PUBLISH_RETRY_S
+        while True:
+            with self._publish_state:
+                self._publish_state.wait_for(lambda: self.pending)
+            time.sleep(PUBLISH_DELAY_S)
+            with self._publish_state:
+                # Taken before reading the catalog, so later commits publish again
+                target = self._requested
+            try:
+                if self.enabled:
+                    self.publish()
+            except Exception:
+                self.publish_failures += 1
+                logger.exception("Failed to publish catalog snapshot, retrying in %.1f s", retry)
+                time.sleep(retry)
+                retry = min(retry * 2, PUBLISH_RETRY_MAX_S)
+                continue
+            retry = PUBLISH_RETRY_S
+            with self._publish_state:
+                self._completed = max(self._completed, target)
+                self._publish_state.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until every commit so far is published.
+
+        Returns:
+            False if the timeout expired first
+        """
+        with self._publish_state:
+            return self._publish_state.wait_for(lambda: not self.pending, timeout)
+
+    def stats(self) -> Dict:
+        """Snapshot file details."""
+        snapshot = self.current()
+        if snapshot is None:
+            return {"enabled": self.enabled, "published": False}
+        return {
+            "enabled": True,
+            "published": True,
+            "path": self.path,
+            "version": snapshot.version,
+            "bytes": os.path.getsize(self.path),
+            "ingredients": snapshot.ingredient_count,
+            "dishes": snapshot.dish_count,
+            "components": snapshot.component_count,
+            "publishes": self.publishes,
+            "publish_failures": self.publish_failures,
+            "pending": self.pending,
+        }
+
+
+# Global store; republished in the background after committed catalog writes
+catalog_snapshot = SnapshotStore(get_settings().catalog_snapshot_path)
+catalog_version.add_commit_hook(catalog_snapshot.publish_later)
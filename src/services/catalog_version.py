@@ -0,0 +1,221 @@
+"""
+Catalog version tracking, derived dish nutrition and change events.
+
+Every committed write to ingredients, dishes or dish compositions bumps a
+process-wide version counter. Read paths derive cache keys and ETags from
+it, so they can answer "has anything changed?" without querying the database.
+
+Writes made through the ORM unit of work also refresh the precomputed
+nutrition columns of affected dishes before commit, and are turned into
+compact change events (entity, id, operation, new nutrition) handed to
+registered sinks after commit. Events are only built while some sink is
+active.
+"""
+
+import threading
+import uuid
+from itertools import chain
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.database import Ingredient, Dish, DishIngredient
+
+# Models whose writes change the catalog
+CATALOG_MODELS = (Ingredient, Dish, DishIngredient)
+
+_DIRTY_KEY = "catalog_dirty"
+_CHANGES_KEY = "catalog_changes"
+_EVENTS_KEY = "catalog_events"
+
+OP_CREATED = "created"
+OP_UPDATED = "updated"
+OP_DELETED = "deleted"
+
+
+class CatalogVersion:
+    """Thread-safe monotonically increasing catalog version."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._value = 1
+        self._sinks: List = []
+        self._commit_hooks: List[Callable[[int], None]] = []
+        # Distinguishes versions issued by different processes or restarts
+        self.epoch = uuid.uuid4().hex[:8]
+
+    @property
+    def value(self) -> int:
+        """Current catalog version."""
+        return self._value
+
+    def bump(self) -> int:
+        """
+        Advance the catalog version.
+
+        Returns:
+            The new version
+        """
+        with self._lock:
+            self._value += 1
+            return self._value
+
+    def add_sink(self, sink) -> None:
+        """
+        Register a consumer of change events.
+
+        The sink must provide an `active` property (whether events are
+        wanted right now) and a `publish(version, events)` method.
+        """
+        self._sinks.append(sink)
+
+    def remove_sink(self, sink) -> None:
+        """Unregister a consumer of change events."""
+        self._sinks.remove(sink)
+
+    def add_commit_hook(self, hook: Callable[[int], None]) -> None:
+        """Register a callable run with the new version after every catalog commit."""
+        self._commit_hooks.append(hook)
+
+    def committed(self, version: int) -> None:
+        """Run commit hooks for a new version."""
+        for hook in self._commit_hooks:
+            hook(version)
+
+    def wants_events(self) -> bool:
+        """Check whether any sink currently consumes change events."""
+        return any(sink.active for sink in self._sinks)
+
+    def notify(self, version: int, events: List[Dict]) -> None:
+        """Hand committed change events to all sinks."""
+        for sink in self._sinks:
+            sink.publish(version, events)
+
+
+# Global version instance
+catalog_version = CatalogVersion()
+
+
+def _record(changes: Dict[str, Dict[int, str]], entity: str, entity_id: Optional[int], op: str) -> None:
+    """Record an operation, keeping creations and deletions over updates."""
+    if entity_id is None:
+        return
+    if op != OP_UPDATED or entity_id not in changes[entity]:
+        changes[entity][entity_id] = op
+
+
+def _ingredient_event(ingredient: Ingredient) -> Dict:
+    """Change payload for an ingredient row."""
+    p, f, c = ingredient.protein_g, ingredient.fat_g, ingredient.carbohydrates_g
+    return {
+        "name": ingredient.name,
+        "nutrition": {
+            "calories": p * 4 + f * 9 + c * 4,
+            "proteins": p,
+            "fats": f,
+            "carbohydrates": c,
+        },
+    }
+
+
+@event.listens_for(Session, "after_flush")
+def _track_flushed_writes(session: Session, flush_context) -> None:
+    """Mark the session dirty and collect changed ids when a flush touched catalog rows."""
+    changes = None
+    for obj, op in chain(
+        ((obj, OP_CREATED) for obj in session.new),
+        ((obj, OP_UPDATED) for obj in session.dirty),
+        ((obj, OP_DELETED) for obj in session.deleted),
+    ):
+        if not isinstance(obj, CATALOG_MODELS):
+            continue
+        session.info[_DIRTY_KEY] = True
+        if changes is None:
+            changes = session.info.setdefault(_CHANGES_KEY, {"ingredient": {}, "dish": {}})
+        if isinstance(obj, Ingredient):
+            _record(changes, "ingredient", obj.id, op)
+        elif isinstance(obj, Dish):
+            _record(changes, "dish", obj.id, op)
+        else:
+            _record(changes, "dish", obj.dish_id, OP_UPDATED)
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _track_bulk_writes(orm_execute_state) -> None:
+    """Mark the session dirty on bulk insert/update/delete of catalog rows."""
+    if orm_execute_state.is_select:
+        return
+    mapper = orm_execute_state.bind_mapper
+    if mapper is not None and issubclass(mapper.class_, CATALOG_MODELS):
+        orm_execute_state.session.info[_DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "before_commit")
+def _refresh_and_build_events(session: Session) -> None:
+    """
+    Refresh stored dish nutrition and build change events before commit.
+
+    Runs inside the open transaction, so the refreshed columns commit
+    atomically with the writes that changed them.
+    """
+    # Commit flushes after this hook; flush now so pending writes are collected
+    session.flush()
+    changes = session.info.pop(_CHANGES_KEY, None)
+    if not changes:
+        return
+
+    # Imported here to keep the repository layer free of event wiring
+    from src.repositories.dish_repository import DishRepository
+
+    dish_repo = DishRepository(session)
+    dish_ops = dict(changes["dish"])
+    for dish_id in dish_repo.get_ids_containing(list(changes["ingredient"])):
+        dish_ops.setdefault(dish_id, OP_UPDATED)
+    live = [dish_id for dish_id, op in dish_ops.items() if op != OP_DELETED]
+    totals = dish_repo.refresh_nutrition(live)
+
+    if not catalog_version.wants_events():
+        return
+
+    events = []
+    for ingredient_id, op in sorted(changes["ingredient"].items()):
+        item = {"entity": "ingredient", "id": ingredient_id, "op": op}
+        if op != OP_DELETED:
+            ingredient = session.get(Ingredient, ingredient_id)
+            if ingredient is None:
+                continue
+            item.update(_ingredient_event(ingredient))
+        events.append(item)
+
+    names = dict(session.query(Dish.id, Dish.name).filter(Dish.id.in_(live)).all()) if live else {}
+    for dish_id, op in sorted(dish_ops.items()):
+        item = {"entity": "dish", "id": dish_id, "op": op}
+        if op != OP_DELETED:
+            if dish_id not in totals:
+                continue
+            item["name"] = names.get(dish_id)
+            item["nutrition"] = totals[dish_id]
+        events.append(item)
+
+    session.info[_EVENTS_KEY] = events
+
+
+@event.listens_for(Session, "after_commit")
+def _bump_on_commit(session: Session) -> None:
+    """Bump the catalog version once the writes are durable and publish events."""
+    events = session.info.pop(_EVENTS_KEY, None)
+    session.info.pop(_CHANGES_KEY, None)
+    if session.info.pop(_DIRTY_KEY, False):
+        version = catalog_version.bump()
+        catalog_version.committed(version)
+        if events:
+            catalog_version.notify(version, events)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_on_rollback(session: Session) -> None:
+    """Forget pending catalog writes that were rolled back."""
+    session.info.pop(_DIRTY_KEY, None)
+    session.info.pop(_CHANGES_KEY, None)
+    session.info.pop(_EVENTS_KEY, None)
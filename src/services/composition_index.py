@@ -0,0 +1,279 @@
+"""
+Find dishes by the ingredients they contain.
+
+An inverted index maps every ingredient to the set of dishes using it,
+stored as an integer bitset over dish positions (see `bitsets`). A
+composition query is then plain set algebra: AND over the required
+ingredients, OR over the alternatives, AND NOT over the excluded ones.
+Dish names and stored nutrition sit in the index too, so macro filters
+and the response rows need no database round trip.
+
+Dish positions follow dish IDs, so results come out in ID order. Dish
+writes are applied from catalog change events: the compositions of the
+changed dishes are reloaded with one query per batch and only their bits
+are flipped.
+"""
+
+from array import array
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.database import Dish, DishIngredient, Ingredient
+from src.services.bitsets import from_positions, iter_positions
+from src.services.catalog_index import CatalogIndex
+from src.services.catalog_snapshot import NUTRITION_FIELDS
+from src.services.catalog_version import OP_DELETED, catalog_version
+from src.services.name_search import normalize
+
+# Macro filters mapped to offsets into a dish's NUTRITION_FIELDS
+FILTER_FIELDS = {
+    "kcal": NUTRITION_FIELDS.index("energy_kcal"),
+    "protein": NUTRITION_FIELDS.index("protein_g"),
+    "fat": NUTRITION_FIELDS.index("fat_g"),
+    "carbs": NUTRITION_FIELDS.index("carbohydrates_g"),
+}
+
+# Dishes whose compositions are reloaded per IN query
+RELOAD_BATCH_SIZE = 500
+# Share of dead positions that triggers compaction
+COMPACT_RATIO = 0.5
+
+Ranges = Dict[str, Tuple[Optional[float], Optional[float]]]
+
+
+class CompositionIndex(CatalogIndex):
+    """Ingredient to dish bitsets with dish names and nutrition."""
+
+    def __init__(self):
+        super().__init__()
+        self._reset((), (), ())
+
+    def _reset(
+        self,
+        ingredients: Iterable[Tuple[int, str]],
+        dishes: Iterable[Sequence],
+        components: Iterable[Tuple[int, int]],
+    ) -> None:
+        """
+        Index the catalog from scratch.
+
+        Args:
+            ingredients: (id, name) rows
+            dishes: (id, name, *NUTRITION_FIELDS) rows in ID order
+            components: (dish id, ingredient id) rows
+        """
+        self._ingredient_ids: Dict[str, int] = {}
+        self._ingredient_keys: Dict[int, str] = {}
+        for ingredient_id, name in ingredients:
+            self._set_ingredient(ingredient_id, name)
+
+        self._ids = array("q")
+        self._names: List[Optional[str]] = []
+        self._nutrition = array("d")
+        self._positions: Dict[int, int] = {}
+        for row in dishes:
+            self._append_dish(row[0], row[1], row[2:])
+
+        self._compositions: List[Tuple[int, ...]] = [() for _ in self._ids]
+        per_ingredient: Dict[int, List[int]] = {}
+        per_dish: Dict[int, List[int]] = {}
+        for dish_id, ingredient_id in components:
+            position = self._positions.get(dish_id)
+            if position is not None:
+                per_ingredient.setdefault(ingredient_id, []).append(position)
+                per_dish.setdefault(position, []).append(ingredient_id)
+        for position, ingredient_ids in per_dish.items():
+            self._compositions[position] = tuple(ingredient_ids)
+        self._postings: Dict[int, int] = {
+            ingredient_id: from_positions(positions) for ingredient_id, positions in per_ingredient.items()
+        }
+        self._live = from_positions(range(len(self._ids)))
+        self._dead = 0
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _set_ingredient(self, ingredient_id: int, name: Optional[str]) -> None:
+        """Map an ingredient's normalized name to its ID; None forgets it."""
+        previous = self._ingredient_keys.pop(ingredient_id, None)
+        if previous is not None and self._ingredient_ids.get(previous) == ingredient_id:
+            del self._ingredient_ids[previous]
+        if name is not None:
+            key = normalize(name)
+            self._ingredient_keys[ingredient_id] = key
+            self._ingredient_ids[key] = ingredient_id
+
+    def _append_dish(self, dish_id: int, name: str, nutrition: Iterable[float]) -> int:
+        position = len(self._ids)
+        self._ids.append(dish_id)
+        self._names.append(name)
+        self._nutrition.extend(float(value or 0.0) for value in nutrition)
+        self._positions[dish_id] = position
+        return position
+
+    def _set_composition(self, position: int, ingredient_ids: Tuple[int, ...]) -> None:
+        """Replace a dish's ingredients, flipping only the bits that change."""
+        old, new = set(self._compositions[position]), set(ingredient_ids)
+        bit = 1 << position
+        for ingredient_id in old - new:
+            remaining = self._postings[ingredient_id] & ~bit
+            if remaining:
+                self._postings[ingredient_id] = remaining
+            else:
+                del self._postings[ingredient_id]
+        for ingredient_id in new - old:
+            self._postings[ingredient_id] = self._postings.get(ingredient_id, 0) | bit
+        self._compositions[position] = ingredient_ids
+
+    def _remove_dish(self, dish_id: int) -> None:
+        position = self._positions.pop(dish_id, None)
+        if position is None:
+            return
+        self._set_composition(position, ())
+        self._live &= ~(1 << position)
+        self._names[position] = None
+        self._dead += 1
+
+    def _rebuild(self, session: Session) -> None:
+        self._reset(
+            session.query(Ingredient.id, Ingredient.name).all(),
+            session.query(Dish.id, Dish.name, *(getattr(Dish, field) for field in NUTRITION_FIELDS))
+            .order_by(Dish.id).all(),
+            session.query(DishIngredient.dish_id, DishIngredient.ingredient_id).all(),
+        )
+
+    def _apply(self, events: List[Dict], session: Session) -> None:
+        changed: Dict[int, None] = {}
+        for event in events:
+            entity_id, op = event["id"], event["op"]
+            if event["entity"] == "ingredient":
+                # Dish links of a deleted ingredient go with the dish events
+                self._set_ingredient(entity_id, None if op == OP_DELETED else event["name"])
+            elif op == OP_DELETED:
+                self._remove_dish(entity_id)
+                changed.pop(entity_id, None)
+            else:
+                nutrition = [event["nutrition"][field] for field in NUTRITION_FIELDS]
+                position = self._positions.get(entity_id)
+                if position is None:
+                    position = self._append_dish(entity_id, event["name"], nutrition)
+                    self._compositions.append(())
+                else:
+                    self._names[position] = event["name"]
+                    start = position * len(NUTRITION_FIELDS)
+                    self._nutrition[start:start + len(NUTRITION_FIELDS)] = array("d", nutrition)
+                self._live |= 1 << position
+                changed[entity_id] = None
+
+        dish_ids = list(changed)
+        for start in range(0, len(dish_ids), RELOAD_BATCH_SIZE):
+            batch = dish_ids[start:start + RELOAD_BATCH_SIZE]
+            compositions: Dict[int, List[int]] = {dish_id: [] for dish_id in batch}
+            for dish_id, ingredient_id in session.query(DishIngredient.dish_id, DishIngredient.ingredient_id).filter(
+                DishIngredient.dish_id.in_(batch)
+            ):
+                compositions[dish_id].append(ingredient_id)
+            for dish_id, ingredient_ids in compositions.items():
+                self._set_composition(self._positions[dish_id], tuple(ingredient_ids))
+
+        if self._dead > 1000 and self._dead > COMPACT_RATIO * len(self._ids):
+            self._rebuild(session)
+
+    def resolve(self, names: Iterable[str]) -> Tuple[List[int], List[str]]:
+        """
+        Look up ingredients by name, casefolded with ё folded to е.
+
+        Returns:
+            (ingredient IDs, names that matched no ingredient)
+        """
+        found, unknown = [], []
+        for name in names:
+            ingredient_id = self._ingredient_ids.get(normalize(name))
+            if ingredient_id is None:
+                unknown.append(name)
+            else:
+                found.append(ingredient_id)
+        return found, unknown
+
+    def match(
+        self,
+        include: Iterable[int] = (),
+        any_of: Iterable[int] = (),
+        exclude: Iterable[int] = (),
+    ) -> int:
+        """
+        Bitset of the dishes matching a composition query.
+
+        Args:
+            include: Ingredient IDs that must all be present
+            any_of: Ingredient IDs of which at least one must be present
+            exclude: Ingredient IDs that must all be absent
+        """
+        postings = self._postings
+        bits = self._live
+        for ingredient_id in include:
+            bits &= postings.get(ingredient_id, 0)
+        any_of = list(any_of)
+        if any_of:
+            union = 0
+            for ingredient_id in any_of:
+                union |= postings.get(ingredient_id, 0)
+            bits &= union
+        for ingredient_id in exclude:
+            bits &= ~postings.get(ingredient_id, 0)
+        return bits
+
+    def rows(self, bits: int, ranges: Optional[Ranges] = None, skip: int = 0, limit: int = 100) -> List[Dict]:
+        """
+        Dish rows for a match bitset, in dish ID order.
+
+        Args:
+            bits: Result of `match`
+            ranges: Optional macro ranges, e.g. {"protein": (20, None)}
+            skip: Number of matching dishes to skip
+            limit: Maximum number of rows
+
+        Returns:
+            Dishes with id, name and stored nutrition totals
+        """
+        checks = [
+            (FILTER_FIELDS[key], low, high)
+            for key, (low, high) in (ranges or {}).items()
+        ]
+        width = len(NUTRITION_FIELDS)
+        nutrition = self._nutrition
+        rows = []
+        for position in iter_positions(bits):
+            start = position * width
+            if checks and any(
+                (low is not None and nutrition[start + offset] < low)
+                or (high is not None and nutrition[start + offset] > high)
+                for offset, low, high in checks
+            ):
+                continue
+            if skip:
+                skip -= 1
+                continue
+            rows.append({
+                "id": self._ids[position],
+                "name": self._names[position],
+                **dict(zip(NUTRITION_FIELDS, nutrition[start:start + width].tolist())),
+            })
+            if len(rows) >= limit:
+                break
+        return rows
+
+    def stats(self) -> Dict:
+        """Index size and freshness counters."""
+        return {
+            **super().stats(),
+            "dishes": len(self),
+            "dead": self._dead,
+            "ingredients": len(self._postings),
+        }
+
+
+# Global index, fed by catalog change events
+composition_index = CompositionIndex()
+catalog_version.add_sink(composition_index)
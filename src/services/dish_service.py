@@ -1,4 +1,5 @@
-from typing import List, Dict
+from bisect import bisect_left, insort
+from typing import List, Dict, Optional, Tuple
 from src.models import Dish, NutritionInfo, NutritionCalculator
 from src.models.dish_loader import DishLoader
 from src.models.ingredient_data_loader import IngredientDataLoader
@@ -8,6 +9,11 @@ class DishService:
     """
     Сервисный слой для управления блюдами и их обработки.
     Реализует бизнес-логику, изолированную от контроллеров и DAO.
+    
+    Dishes are held in an ID index together with their precomputed
+    nutrition rows and a name-ordered listing. Reads are lookups, and
+    create, update and delete refresh only the affected dish instead of
+    reloading the catalog.
     """
     
     def __init__(
@@ -30,9 +36,88 @@ class DishService:
         self._refresh_data()
     
     def _refresh_data(self):
-        """Обновление внутренних данных после изменений"""
+        """Полная перезагрузка ингредиентов и блюд из источника данных"""
         self.ingredients = self.ingredient_loader.load_ingredients()
-        self.raw_dishes = self.dish_loader.load_dishes(self.ingredients)
+        self._ingredients_nutrition = {name: ing.nutrition for name, ing in self.ingredients.items()}
+        self.dishes: Dict[int, Dish] = {}
+        self._rows: Dict[int, Dict] = {}
+        # (lowercased name, id) pairs in listing order
+        self._order: List[Tuple[str, int]] = []
+        for dish in self.dish_loader.load_dishes(self.ingredients):
+            self._index_dish(dish)
+    
+    @property
+    def raw_dishes(self) -> List[Dish]:
+        """Все блюда в порядке загрузки и создания"""
+        return list(self.dishes.values())
+    
+    def _index_dish(self, dish: Dish) -> None:
+        """Add or replace a dish in the index, listing and nutrition rows."""
+        previous = self.dishes.get(dish.id)
+        if previous is not None:
+            self._order.pop(bisect_left(self._order, (previous.name.lower(), dish.id)))
+        total_nutrition = self.nutrition_calculator.calculate_total_nutrition_info(
+            ingredients_nutrition=self._ingredients_nutrition,
+            dish_ingredients=dish.ingredients
+        )
+        self.dishes[dish.id] = dish
+        self._rows[dish.id] = {
+            "id": dish.id,
+            "name": dish.name,
+            "weight_g": round(dish.total_weight, 2),
+            "energy_kcal": round(total_nutrition.calories, 2),
+            "protein_g": round(total_nutrition.proteins, 2),
+            "carbohydrates_g": round(total_nutrition.carbohydrates, 2),
+            "fat_g": round(total_nutrition.fats, 2),
+        }
+        insort(self._order, (dish.name.lower(), dish.id))
+    
+    def _unindex_dish(self, dish_id: int) -> None:
+        """Remove a dish from the index, listing and nutrition rows."""
+        dish = self.dishes.pop(dish_id, None)
+        if dish is None:
+            return
+        del self._rows[dish_id]
+        self._order.pop(bisect_left(self._order, (dish.name.lower(), dish_id)))
+    
+    def _get_dish(self, dish_id: int) -> Dish:
+        """
+        Поиск блюда по ID.
+        
+        Raises:
+            ValueError: При невалидном ID блюда
+        """
+        dish = self.dishes.get(dish_id)
+        if not dish:
+            raise ValueError("Invalid dish ID")
+        return dish
+    
+    def _save(self, name: str, ingredients: Dict[str, float], dish_id: Optional[int] = None) -> None:
+        """Persist a dish and refresh only its own index entries."""
+        saved_id = self.dish_loader.save({"name": name, "ingredients": ingredients})
+        if saved_id is None:
+            saved_id = dish_id
+        if saved_id is None:
+            # The loader does not report IDs of new dishes
+            self._refresh_data()
+            return
+        self._load_new_ingredients(ingredients)
+        # The loader skips ingredients it does not know
+        self._index_dish(Dish(
+            id=saved_id,
+            name=name,
+            ingredients={n: amount for n, amount in ingredients.items() if n in self.ingredients},
+        ))
+    
+    def _load_new_ingredients(self, names) -> None:
+        """Pick up ingredients added to the data source since the last load."""
+        if all(name in self.ingredients for name in names):
+            return
+        loaded = self.ingredient_loader.load_ingredients()
+        for name in names:
+            if name not in self.ingredients and name in loaded:
+                self.ingredients[name] = loaded[name]
+                self._ingredients_nutrition[name] = loaded[name].nutrition
     
     def get_dishes(self) -> List[Dict]:
         """
@@ -41,25 +126,7 @@ class DishService:
         Returns:
             List[Dict]: Список блюд с расчётными значениями КБЖУ
         """
-        dishes = []
-        for dish in self.raw_dishes:
-            ingredients_nutrition = {name: ing.nutrition for name, ing in self.ingredients.items()}
-            total_nutrition = self.nutrition_calculator.calculate_total_nutrition_info(
-                ingredients_nutrition=ingredients_nutrition,
-                dish_ingredients=dish.ingredients
-            )
-            
-            dishes.append({
-                "id": dish.id,
-                "name": dish.name,
-                "weight_g": round(dish.total_weight, 2),
-                "energy_kcal": round(total_nutrition.calories, 2),
-                "protein_g": round(total_nutrition.proteins, 2),
-                "carbohydrates_g": round(total_nutrition.carbohydrates, 2),
-                "fat_g": round(total_nutrition.fats, 2),
-            })
-        dishes.sort(key=lambda x: x['name'].lower())
-        return dishes
+        return [dict(self._rows[dish_id]) for _, dish_id in self._order]
     
     def get_dish_ingredients(self, dish_id: int) -> Dict:
         """
@@ -74,9 +141,7 @@ class DishService:
         Raises:
             ValueError: При невалидном ID блюда
         """
-        dish = next((d for d in self.raw_dishes if d.id == dish_id), None)
-        if not dish:
-            raise ValueError("Invalid dish ID")
+        dish = self._get_dish(dish_id)
         
         ingredients_list = []
         
@@ -127,7 +192,7 @@ class DishService:
         ingredients = {}
         
         for dish in selected_dishes:
-            dish_obj = next((d for d in self.raw_dishes if d.id == dish["id"]), None)
+            dish_obj = self.dishes.get(dish["id"])
             if not dish_obj:
                 continue
                 
@@ -150,17 +215,8 @@ class DishService:
             dish_id: ID блюда
             new_ingredients: Новый список ингредиентов
         """
-        dish = next((d for d in self.raw_dishes if d.id == dish_id), None)
-        if not dish:
-            raise ValueError("Invalid dish ID")
-        
-        dish_data = {
-            "name": dish.name,
-            "ingredients": {ing["name"]: ing["amount"] for ing in new_ingredients}
-        }
-        
-        self.dish_loader.save(dish_data)
-        self._refresh_data()
+        dish = self._get_dish(dish_id)
+        self._save(dish.name, {ing["name"]: ing["amount"] for ing in new_ingredients}, dish_id)
     
     def create_dish(self, name: str, ingredients: List[Dict]):
         """
@@ -170,13 +226,7 @@ class DishService:
             name: Название блюда
             ingredients: Список ингредиентов
         """
-        dish_data = {
-            "name": name,
-            "ingredients": {ing["name"]: ing["amount"] for ing in ingredients}
-        }
-        
-        self.dish_loader.save(dish_data)
-        self._refresh_data()
+        self._save(name, {ing["name"]: ing["amount"] for ing in ingredients})
 
     def delete_dish(self, dish_id: int) -> None:
         """
@@ -188,10 +238,8 @@ class DishService:
         Raises:
             ValueError: При невалидном ID блюда
         """
-        dish = next((d for d in self.raw_dishes if d.id == dish_id), None)
-        if not dish:
-            raise ValueError("Invalid dish ID")
+        self._get_dish(dish_id)
         
         # Удаляем блюдо через dish_loader
         self.dish_loader.delete_dish(dish_id)
-        self._refresh_data()
+        self._unindex_dish(dish_id)
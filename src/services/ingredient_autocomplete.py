@@ -0,0 +1,219 @@
+"""
+As-you-type ingredient suggestions.
+
+Every ingredient name is normalized the same way as for name search and
+stored once per word start ("куриное филе" and "филе"), so a prefix
+matches the beginning of any word. The keys are kept in one sorted list:
+the matches of a prefix are the contiguous range found with two bisects.
+
+Matches are ranked by how many dishes use the ingredient, then by name.
+A sparse table holds the best ranked entry of every power-of-two span of
+the sorted keys, so the best entry of any range is two lookups away and
+the top k of a range are taken with a small heap in O(k log k), however
+many names share the prefix. The index keeps the composition of every
+dish, so a dish write moves usage counts by its composition diff; the
+sparse table is rebuilt only when that changes the ranking, and the keys
+only when an ingredient is added, renamed or deleted.
+"""
+
+import heapq
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.database import DishIngredient, Ingredient
+from src.services.catalog_index import CatalogIndex
+from src.services.catalog_version import OP_DELETED, catalog_version
+from src.services.composition_index import RELOAD_BATCH_SIZE
+from src.services.name_search import normalize, word_starts
+
+# Largest number of suggestions served
+MAX_LIMIT = 50
+
+# Sorts after every character a prefix may continue with
+_KEY_END = chr(0x10FFFF)
+
+
+class IngredientAutocomplete(CatalogIndex):
+    """Sorted word-start index over ingredient names, ranked by usage."""
+
+    def __init__(self):
+        super().__init__()
+        self._compositions: Dict[int, Tuple[int, ...]] = {}
+        self._load(())
+
+    def _load(self, rows: Iterable[Tuple[int, str, int]]) -> None:
+        """Index (id, name, dish count) rows from scratch."""
+        rows = list(rows)
+        self._ids = array("q", (row[0] for row in rows))
+        self._names = [row[1] for row in rows]
+        self._uses = array("I", (row[2] for row in rows))
+        self._positions = {id: i for i, id in enumerate(self._ids)}
+        self._full_keys = [normalize(name) for name in self._names]
+        self._exact: Dict[str, List[int]] = {}
+        for i, key in enumerate(self._full_keys):
+            self._exact.setdefault(key, []).append(i)
+
+        entries = sorted(
+            (key[start:], i)
+            for i, key in enumerate(self._full_keys)
+            for start in word_starts(key)
+        )
+        self._keys = [key for key, _ in entries]
+        self._owners = array("I", (i for _, i in entries))
+        # Order of ingredients with equal usage: by name, then by id
+        self._name_ranks = array("I", [0]) * len(rows)
+        by_name = sorted(range(len(rows)), key=lambda i: (self._full_keys[i], self._ids[i]))
+        for rank, i in enumerate(by_name):
+            self._name_ranks[i] = rank
+        self._ranks = None
+        self._rank()
+
+    def _rank(self) -> None:
+        """Rank ingredients by usage; rebuild the sparse table only if ranks moved."""
+        # Popularity rank of every ingredient: most used first, then by name
+        count = len(self._ids)
+        order_keys = [by_name - uses * count for uses, by_name in zip(self._uses, self._name_ranks)]
+        ranks = array("I", [0]) * count
+        for rank, i in enumerate(sorted(range(count), key=order_keys.__getitem__)):
+            ranks[i] = rank
+        if ranks == self._ranks:
+            return
+        self._ranks = ranks
+
+        # Level j holds the best (rank, position) code of every span of 2**j
+        # entries; a code is rank * len(entries) + position, so min() picks both
+        size = len(self._keys)
+        level = array("q", [ranks[i] * size + position for position, i in enumerate(self._owners)])
+        self._table = [level]
+        span = 1
+        while 2 * span <= size:
+            level = array("q", [a if a < b else b for a, b in zip(level, level[span:])])
+            self._table.append(level)
+            span *= 2
+
+    def __len__(self) -> int:
+        return len(self._ids)
+
+    def _rebuild(self, session: Session) -> None:
+        compositions: Dict[int, List[int]] = {}
+        for dish_id, ingredient_id in session.query(DishIngredient.dish_id, DishIngredient.ingredient_id):
+            compositions.setdefault(dish_id, []).append(ingredient_id)
+        self._compositions = {dish_id: tuple(ids) for dish_id, ids in compositions.items()}
+        uses = Counter(chain.from_iterable(compositions.values()))
+        self._load(
+            (id, name, uses[id])
+            for id, name in session.query(Ingredient.id, Ingredient.name)
+        )
+
+    def _apply(self, events: List[Dict], session: Session) -> None:
+        # Names are rekeyed only when an ingredient is added, renamed or
+        # deleted; dish writes move usage counts by their composition diffs
+        names: Dict[int, Optional[str]] = {}
+        changed: Dict[int, None] = {}
+        for event in events:
+            entity_id, op = event["id"], event["op"]
+            if event["entity"] == "ingredient":
+                name = None if op == OP_DELETED else event["name"]
+                position = self._positions.get(entity_id)
+                if name != (None if position is None else self._names[position]):
+                    names[entity_id] = name
+            elif op == OP_DELETED:
+                self._count(self._compositions.pop(entity_id, ()), -1)
+                changed.pop(entity_id, None)
+            else:
+                changed[entity_id] = None
+
+        if names:
+            rows = [
+                (id, names.pop(id, self._names[i]), self._uses[i])
+                for i, id in enumerate(self._ids)
+            ]
+            rows.extend((id, name, 0) for id, name in names.items())
+            self._load(row for row in rows if row[1] is not None)
+
+        dish_ids = list(changed)
+        for start in range(0, len(dish_ids), RELOAD_BATCH_SIZE):
+            batch = dish_ids[start:start + RELOAD_BATCH_SIZE]
+            compositions: Dict[int, List[int]] = {dish_id: [] for dish_id in batch}
+            for dish_id, ingredient_id in session.query(DishIngredient.dish_id, DishIngredient.ingredient_id).filter(
+                DishIngredient.dish_id.in_(batch)
+            ):
+                compositions[dish_id].append(ingredient_id)
+            for dish_id, ingredient_ids in compositions.items():
+                self._count(self._compositions.get(dish_id, ()), -1)
+                self._count(ingredient_ids, 1)
+                self._compositions[dish_id] = tuple(ingredient_ids)
+        self._rank()
+
+    def _count(self, ingredient_ids: Iterable[int], delta: int) -> None:
+        """Add a dish's uses of its ingredients to their counts."""
+        for ingredient_id in ingredient_ids:
+            position = self._positions.get(ingredient_id)
+            if position is not None:
+                self._uses[position] += delta
+
+    def _best(self, lo: int, hi: int) -> int:
+        """Code of the best ranked entry in a non-empty range of positions."""
+        level = (hi - lo).bit_length() - 1
+        table = self._table[level]
+        return min(table[lo], table[hi - (1 << level)])
+
+    def _top(self, prefix: str, limit: int) -> List[int]:
+        """Ingredients with a word starting with a prefix, best ranked first."""
+        lo = bisect_left(self._keys, prefix)
+        hi = bisect_left(self._keys, prefix + _KEY_END, lo)
+        if lo == hi:
+            return []
+        size = len(self._keys)
+        heap = [(self._best(lo, hi), lo, hi)]
+        top: Dict[int, None] = {}
+        while heap and len(top) < limit:
+            code, lo, hi = heapq.heappop(heap)
+            position = code % size
+            # A name with several matching words shows up once per word
+            top.setdefault(self._owners[position], None)
+            if lo < position:
+                heapq.heappush(heap, (self._best(lo, position), lo, position))
+            if position + 1 < hi:
+                heapq.heappush(heap, (self._best(position + 1, hi), position + 1, hi))
+        return list(top)
+
+    def suggest(self, prefix: str, limit: int = 10) -> List[Dict]:
+        """
+        Suggest ingredients for a typed prefix.
+
+        Args:
+            prefix: Beginning of any word of the name; empty for the most used
+            limit: Maximum number of suggestions
+
+        Returns:
+            Ingredients with id, name and the number of dishes using them;
+            an exact name match first, then by usage and name
+        """
+        key = normalize(prefix)
+        top = self._top(key, limit)
+        exact = self._exact.get(key) if key else None
+        if exact:
+            top = exact + [i for i in top if i not in exact]
+        return [
+            {"id": self._ids[i], "name": self._names[i], "uses": self._uses[i]}
+            for i in top[:limit]
+        ]
+
+    def stats(self) -> Dict:
+        """Index size and freshness counters."""
+        return {
+            **super().stats(),
+            "ingredients": len(self),
+            "keys": len(self._keys),
+        }
+
+
+# Global index, refreshed on catalog change events
+ingredient_autocomplete = IngredientAutocomplete()
+catalog_version.add_sink(ingredient_autocomplete)
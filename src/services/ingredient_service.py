@@ -1,4 +1,5 @@
-from typing import Dict, List
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Set
 from src.models import Ingredient, NutritionInfo
 from src.models.ingredient_data_loader import IngredientDataLoader
 from src.models.interfaces import IngredientLoaderInterface
@@ -7,6 +8,10 @@ class IngredientService:
     """
     Сервисный слой для управления ингредиентами.
     Инкапсулирует бизнес-логику и валидацию данных.
+    
+    Edits are applied to the in-memory catalog and tracked as dirty or
+    deleted names; only those rows are written back. Edits made inside
+    `batch()` are written together in one transaction.
     """
     
     def __init__(self, ingredient_loader: IngredientLoaderInterface):
@@ -17,11 +22,69 @@ class IngredientService:
             ingredient_loader: DAO для работы с ингредиентами
         """
         self.ingredient_loader = ingredient_loader
+        self._dirty: Set[str] = set()
+        self._deleted: Set[str] = set()
+        self._batch_depth = 0
         self._refresh_data()
     
     def _refresh_data(self):
         """Перезагрузка данных из хранилища"""
         self.ingredients = self.ingredient_loader.load_ingredients()
+        self._dirty.clear()
+        self._deleted.clear()
+    
+    def _mark_dirty(self, name: str) -> None:
+        self._deleted.discard(name)
+        self._dirty.add(name)
+        if not self._batch_depth:
+            self.flush()
+    
+    def _mark_deleted(self, name: str) -> None:
+        self._dirty.discard(name)
+        self._deleted.add(name)
+        if not self._batch_depth:
+            self.flush()
+    
+    def flush(self) -> None:
+        """
+        Write pending edits to the storage.
+        
+        Loaders without `save_changes` get the whole catalog via `save`.
+        If the write fails, the catalog is reloaded from the storage.
+        """
+        if not self._dirty and not self._deleted:
+            return
+        save_changes = getattr(self.ingredient_loader, "save_changes", None)
+        try:
+            if save_changes is not None:
+                save_changes({name: self.ingredients[name] for name in self._dirty}, self._deleted)
+            else:
+                self.ingredient_loader.save(self.ingredients)
+        except Exception:
+            self._refresh_data()
+            raise
+        self._dirty.clear()
+        self._deleted.clear()
+    
+    @contextmanager
+    def batch(self) -> Iterator["IngredientService"]:
+        """
+        Coalesce the edits made inside the block into one write.
+        
+        If the block raises, pending edits are dropped and the catalog is
+        reloaded from the storage.
+        """
+        self._batch_depth += 1
+        try:
+            yield self
+        except Exception:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._refresh_data()
+            raise
+        self._batch_depth -= 1
+        if not self._batch_depth:
+            self.flush()
     
     def get_ingredients(self) -> List[Dict]:
         """
@@ -84,8 +147,7 @@ class IngredientService:
         nutrition = self._validate_nutrition(nutrition_data)
         new_ingredient = Ingredient(name=name, nutrition=nutrition)
         self.ingredients[name] = new_ingredient
-        self.ingredient_loader.save(self.ingredients)
-        self._refresh_data()
+        self._mark_dirty(name)
     
     def update_ingredient(self, name: str, nutrition_data: Dict):
         """
@@ -104,8 +166,7 @@ class IngredientService:
         nutrition = self._validate_nutrition(nutrition_data)
         updated_ingredient = Ingredient(name=name, nutrition=nutrition)
         self.ingredients[name] = updated_ingredient
-        self.ingredient_loader.save(self.ingredients)
-        self._refresh_data()
+        self._mark_dirty(name)
     
     def delete_ingredient(self, name: str):
         """
@@ -121,5 +182,4 @@ class IngredientService:
             raise ValueError("Ingredient not found")
         
         del self.ingredients[name]
-        self.ingredient_loader.save(self.ingredients)
-        self._refresh_data()
+        self._mark_deleted(name)
@@ -0,0 +1,377 @@
+"""
+Typo-tolerant search over ingredient and dish names.
+
+Names are normalized (casefolded, ё folded to е, whitespace collapsed) and
+split into words. Matching happens per word, against the vocabulary of
+distinct words rather than against every name:
+
+- every vocabulary word is indexed by its padded trigrams (as in
+  PostgreSQL's pg_trgm), so the words close to a query word are found by
+  counting shared trigrams and confirmed with a bit-parallel edit
+  distance (Myers); the last query word also matches as a prefix, since
+  it may still be being typed;
+- every word maps to the names containing it, as a sorted position array
+  and, for frequent words, an integer bitset.
+
+A query ORs together the bitsets of the words matching each of its words
+and ANDs the results, one distance tier at a time, so exact matches come
+before one-typo matches whatever the catalog size. The vocabulary grows
+much slower than the catalog, which keeps lookups well under a
+millisecond at 100k names.
+"""
+
+import re
+from array import array
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.database import Dish, Ingredient
+from src.services.bitsets import from_positions, iter_positions
+from src.services.catalog_index import CatalogIndex
+from src.services.catalog_version import OP_DELETED, catalog_version
+
+KINDS = ("ingredient", "dish")
+
+_WORD = re.compile(r"\w+")
+
+# Words appearing in at least this many names keep a ready-made bitset
+BITSET_MIN_NAMES = 32
+# Vocabulary words checked with edit distance per query word
+VERIFY_WORDS = 64
+# Vocabulary words matched per query word, best first
+MAX_WORD_MATCHES = 32
+# Share of dead positions that triggers compaction
+COMPACT_RATIO = 0.5
+
+
+def normalize(text: str) -> str:
+    """Casefold, fold ё into е and collapse whitespace."""
+    return " ".join(text.casefold().replace("ё", "е").split())
+
+
+def words(key: str) -> List[str]:
+    """Words of a normalized string, punctuation dropped."""
+    return _WORD.findall(key)
+
+
+def word_starts(key: str) -> List[int]:
+    """Offsets at which the words of a normalized string begin."""
+    return [match.start() for match in _WORD.finditer(key)]
+
+
+def trigrams(word: str, complete: bool = True) -> List[str]:
+    """
+    Distinct padded trigrams of a word.
+
+    Args:
+        word: Normalized word
+        complete: Pad the end too; off for a word still being typed
+    """
+    padded = "  " + word + (" " if complete else "")
+    return list(dict.fromkeys(padded[i:i + 3] for i in range(len(padded) - 2)))
+
+
+def default_distance(length: int) -> int:
+    """Edits tolerated in a word of a given length."""
+    if length <= 2:
+        return 0
+    if length <= 5:
+        return 1
+    return 2
+
+
+def edit_distance(pattern: str, text: str, prefix: bool = False) -> int:
+    """
+    Levenshtein distance between two words.
+
+    Myers' bit-vector algorithm: one pass over the text with the columns
+    of the dynamic programming matrix packed into integers.
+
+    Args:
+        pattern: Query word
+        text: Vocabulary word
+        prefix: Compare against the closest prefix of the text instead
+    """
+    m = len(pattern)
+    if m == 0:
+        return 0 if prefix else len(text)
+    peq: Dict[str, int] = {}
+    for i, char in enumerate(pattern):
+        peq[char] = peq.get(char, 0) | (1 << i)
+    mask = (1 << m) - 1
+    high = 1 << (m - 1)
+    pv, mv, score = mask, 0, m
+    best = m
+    for char in text:
+        eq = peq.get(char, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = mv | (~(xh | pv) & mask)
+        mh = pv & xh
+        if ph & high:
+            score += 1
+        elif mh & high:
+            score -= 1
+            if score < best:
+                best = score
+        ph = ((ph << 1) | 1) & mask
+        mh = (mh << 1) & mask
+        pv = mh | (~(xv | ph) & mask)
+        mv = ph & xv
+    return best if prefix else score
+
+
+class NameSearchIndex(CatalogIndex):
+    """
+    Word-level fuzzy index over ingredient and dish names.
+
+    Names are append-only parallel lists addressed by position; removed
+    and renamed names leave a dead position behind, masked out by the
+    live bitset, and the index is compacted once half of it is dead.
+    """
+
+    def __init__(self):
+        super().__init__()
+        self._reset(())
+
+    def _reset(self, entries: Iterable[Tuple[str, int, str]]) -> None:
+        """Index (kind, id, name) entries from scratch."""
+        self._kinds: List[str] = []
+        self._ids = array("q")
+        self._names: List[Optional[str]] = []
+        self._keys: List[Optional[str]] = []
+        self._positions: Dict[Tuple[str, int], int] = {}
+        self._exact: Dict[str, List[int]] = {}
+        self._dead = 0
+        # Vocabulary: word -> word id, with the trigram index over words
+        self._vocabulary: Dict[str, int] = {}
+        self._words: List[str] = []
+        self._word_positions: List[array] = []
+        self._word_bits: Dict[int, int] = {}
+        self._grams: Dict[str, array] = {}
+
+        for kind, entity_id, name in entries:
+            self._append(kind, entity_id, name)
+        self._live = from_positions(self._positions.values())
+        self._kind_bits = {
+            kind: from_positions(p for p, k in enumerate(self._kinds) if k == kind) for kind in KINDS
+        }
+        self._word_bits = {
+            word_id: from_positions(positions)
+            for word_id, positions in enumerate(self._word_positions)
+            if len(positions) >= BITSET_MIN_NAMES
+        }
+
+    def __len__(self) -> int:
+        return len(self._positions)
+
+    def _append(self, kind: str, entity_id: int, name: str) -> int:
+        """Store a name and index its words; bitsets are left to the caller."""
+        key = normalize(name)
+        position = len(self._names)
+        self._kinds.append(kind)
+        self._ids.append(entity_id)
+        self._names.append(name)
+        self._keys.append(key)
+        self._positions[(kind, entity_id)] = position
+        self._exact.setdefault(key, []).append(position)
+        for word in dict.fromkeys(words(key)):
+            word_id = self._vocabulary.get(word)
+            if word_id is None:
+                word_id = self._vocabulary[word] = len(self._words)
+                self._words.append(word)
+                self._word_positions.append(array("I"))
+                for gram in trigrams(word):
+                    self._grams.setdefault(gram, array("I")).append(word_id)
+            self._word_positions[word_id].append(position)
+        return position
+
+    def _add(self, kind: str, entity_id: int, name: str) -> None:
+        position = self._positions.get((kind, entity_id))
+        if position is not None:
+            if self._names[position] == name:
+                return
+            self._remove(kind, entity_id)
+        position = self._append(kind, entity_id, name)
+        bit = 1 << position
+        self._live |= bit
+        self._kind_bits[kind] |= bit
+        for word in dict.fromkeys(words(self._keys[position])):
+            word_id = self._vocabulary[word]
+            if word_id in self._word_bits:
+                self._word_bits[word_id] |= bit
+            elif len(self._word_positions[word_id]) >= BITSET_MIN_NAMES:
+                self._word_bits[word_id] = from_positions(self._word_positions[word_id])
+
+    def _remove(self, kind: str, entity_id: int) -> None:
+        position = self._positions.pop((kind, entity_id), None)
+        if position is None:
+            return
+        key = self._keys[position]
+        same_key = self._exact[key]
+        same_key.remove(position)
+        if not same_key:
+            del self._exact[key]
+        # Word postings keep the dead position until compaction
+        self._live &= ~(1 << position)
+        self._names[position] = self._keys[position] = None
+        self._dead += 1
+
+    def _compact(self) -> None:
+        """Drop dead positions once they make up most of the index."""
+        if self._dead > 1000 and self._dead > COMPACT_RATIO * len(self._names):
+            self._reset([
+                (self._kinds[position], self._ids[position], self._names[position])
+                for position in sorted(self._positions.values())
+            ])
+
+    def _rebuild(self, session: Session) -> None:
+        self._reset([
+            *(("ingredient", id, name) for id, name in session.query(Ingredient.id, Ingredient.name)),
+            *(("dish", id, name) for id, name in session.query(Dish.id, Dish.name)),
+        ])
+
+    def _apply(self, events: List[Dict], session: Session) -> None:
+        for event in events:
+            if event["op"] == OP_DELETED:
+                self._remove(event["entity"], event["id"])
+            elif event.get("name") is not None:
+                self._add(event["entity"], event["id"], event["name"])
+        self._compact()
+
+    def _match_word(self, word: str, prefix: bool, max_distance: int) -> List[Tuple[int, int]]:
+        """
+        Vocabulary words close to a query word.
+
+        Returns:
+            (distance, word id) pairs, closest and most frequent first
+        """
+        if max_distance == 0 and not prefix:
+            word_id = self._vocabulary.get(word)
+            return [] if word_id is None else [(0, word_id)]
+
+        grams = trigrams(word, complete=not prefix)
+        counts: Counter = Counter()
+        for gram in grams:
+            counts.update(self._grams.get(gram, ()))
+        # Every edit destroys at most three trigrams of the query word
+        needed = max(1, len(grams) - 3 * max_distance)
+        candidates = [(-shared, word_id) for word_id, shared in counts.items() if shared >= needed]
+        candidates.sort()
+
+        vocabulary, postings = self._words, self._word_positions
+        matches = []
+        for _, word_id in candidates[:VERIFY_WORDS]:
+            candidate = vocabulary[word_id]
+            if candidate == word or (prefix and candidate.startswith(word)):
+                distance = 0
+            elif abs(len(candidate) - len(word)) > max_distance and not prefix:
+                continue
+            else:
+                distance = edit_distance(word, candidate, prefix)
+            if distance <= max_distance:
+                matches.append((distance, -len(postings[word_id]), word_id))
+        matches.sort()
+        return [(distance, word_id) for distance, _, word_id in matches[:MAX_WORD_MATCHES]]
+
+    def _names_with(self, word_id: int) -> int:
+        """Bitset of the positions of names containing a word."""
+        bits = self._word_bits.get(word_id)
+        if bits is None:
+            bits = from_positions(self._word_positions[word_id])
+        return bits
+
+    def search(
+        self,
+        query: str,
+        limit: int = 10,
+        kind: Optional[str] = None,
+        max_distance: Optional[int] = None,
+    ) -> List[Dict]:
+        """
+        Find names matching every word of a query, allowing typos.
+
+        Args:
+            query: Text as typed, possibly misspelled; the last word may be partial
+            limit: Maximum number of results
+            kind: Restrict results to "ingredient" or "dish"
+            max_distance: Edits tolerated per word; defaults by word length
+
+        Returns:
+            Matches with kind, id, name and edit distance (summed over the
+            query words), closest first; exact full-name matches lead
+        """
+        key = normalize(query)
+        query_words = words(key)
+        if not query_words:
+            return []
+        # A trailing space means the last word is finished
+        typing = not query.endswith(" ")
+
+        matches = []
+        for i, word in enumerate(query_words):
+            allowed = default_distance(len(word))
+            if max_distance is not None:
+                allowed = min(allowed, max_distance)
+            found = self._match_word(word, typing and i == len(query_words) - 1, allowed)
+            if not found:
+                return []
+            matches.append(found)
+
+        allowed_bits = self._live if kind is None else self._live & self._kind_bits.get(kind, 0)
+        taken: Dict[int, None] = {}
+        for position in self._exact.get(key, ()):
+            if kind is None or self._kinds[position] == kind:
+                taken[position] = None
+
+        seen = 0
+        for tier in range(max(distance for found in matches for distance, _ in found) + 1):
+            if len(taken) >= limit:
+                break
+            hits = allowed_bits
+            for found in matches:
+                union = 0
+                for distance, word_id in found:
+                    if distance <= tier:
+                        union |= self._names_with(word_id)
+                hits &= union
+                if not hits:
+                    break
+            fresh, seen = hits & ~seen, seen | hits
+            for position in iter_positions(fresh):
+                if len(taken) >= limit:
+                    break
+                taken.setdefault(position, None)
+
+        results = []
+        for position in list(taken)[:limit]:
+            name_words = set(words(self._keys[position]))
+            distance = sum(
+                min((d for d, word_id in found if self._words[word_id] in name_words), default=0)
+                for found in matches
+            )
+            results.append({
+                "kind": self._kinds[position],
+                "id": self._ids[position],
+                "name": self._names[position],
+                "distance": distance,
+            })
+        results.sort(key=lambda result: result["distance"])
+        return results
+
+    def stats(self) -> Dict:
+        """Index size and freshness counters."""
+        return {
+            **super().stats(),
+            "names": len(self),
+            "dead": self._dead,
+            "words": len(self._words),
+            "word_bitsets": len(self._word_bits),
+        }
+
+
+# Global index, fed by catalog change events
+name_search = NameSearchIndex()
+catalog_version.add_sink(name_search)
@@ -3,10 +3,11 @@ Nutrition service for calculating dish nutrition.
 Separates business logic from data access.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from dataclasses import dataclass
 
 from src.repositories import DishRepository, IngredientRepository
+from src.tracing import trace_methods
 from src.database import Dish, DishIngredient
 
 
@@ -43,6 +44,7 @@ class NutritionInfo:
         )
 
 
+@trace_methods
 class NutritionService:
     """
     Service for calculating nutrition information.
@@ -150,29 +152,41 @@ class NutritionService:
     def get_dishes_with_nutrition(
         self, 
         skip: int = 0, 
-        limit: int = 100
+        limit: int = 100,
+        ranges: Optional[Dict[str, Tuple[Optional[float], Optional[float]]]] = None,
+        sort: str = "name"
     ) -> List[Dict]:
         """
-        Get all dishes with calculated nutrition.
+        Get dishes with nutrition, filtered and sorted in the database.
+        
+        Nutrition is read from the precomputed dish columns, so no
+        compositions are loaded.
         
         Args:
             skip: Number of records to skip
             limit: Maximum number of records to return
+            ranges: Optional nutrition ranges, e.g. {"protein": (20, None)}
+            sort: Sort key such as "name" or "protein_desc"
             
         Returns:
             List of dishes with nutrition data
+            
+        Raises:
+            ValueError: If the sort key is unknown
         """
-        dishes = self.dish_repo.get_all_with_ingredients(skip=skip, limit=limit)
-        result = []
-        
-        for dish in dishes:
-            dish_data = self._calculate_dish_nutrition_from_model(dish)
-            if dish_data:
-                result.append(dish_data)
-        
-        # Sort by name
-        result.sort(key=lambda x: x["name"].lower())
-        return result
+        dishes = self.dish_repo.get_all_by_nutrition(skip=skip, limit=limit, ranges=ranges, sort=sort)
+        return [
+            {
+                "id": dish.id,
+                "name": dish.name,
+                "weight_g": dish.weight_g,
+                "energy_kcal": dish.energy_kcal,
+                "protein_g": dish.protein_g,
+                "fat_g": dish.fat_g,
+                "carbohydrates_g": dish.carbohydrates_g,
+            }
+            for dish in dishes
+        ]
     
     def get_dish_with_ingredients(self, dish_id: int) -> Optional[Dict]:
         """
@@ -188,36 +202,34 @@ class NutritionService:
         if not dish:
             return None
         
-        ingredients_list = []
+        return self._dish_details_from_model(dish)
+    
+    def get_dishes_with_ingredients(self, dish_ids: List[int]) -> List[Dict]:
+        """
+        Get details of several dishes at once.
         
-        for di in dish.ingredients:
-            if di.ingredient:
-                nutrition = self.calculate_ingredient_nutrition(
-                    di.ingredient.name, 
-                    di.amount
-                )
-                
-                ingredient_data = {
-                    "name": di.ingredient.name,
-                    "amount": di.amount,
-                    "unit": "г",
-                }
-                
-                if nutrition:
-                    ingredient_data.update({
-                        "calories": round(nutrition.calories, 2),
-                        "proteins": round(nutrition.proteins, 2),
-                        "fats": round(nutrition.fats, 2),
-                        "carbohydrates": round(nutrition.carbohydrates, 2),
-                    })
-                
-                ingredients_list.append(ingredient_data)
+        Compositions are loaded in one eager query and ingredient macros are
+        taken from the loaded rows, so no per-ingredient lookups are made.
         
-        return {
-            "id": dish.id,
-            "name": dish.name,
-            "ingredients": ingredients_list,
+        Args:
+            dish_ids: IDs of the dishes
+            
+        Returns:
+            List of dish details in the requested order; unknown IDs are skipped
+        """
+        dishes = {
+            dish.id: dish
+            for dish in self.dish_repo.get_many_with_ingredients(dish_ids)
         }
+        
+        result = []
+        seen = set()
+        for dish_id in dish_ids:
+            dish = dishes.get(dish_id)
+            if dish is not None and dish_id not in seen:
+                seen.add(dish_id)
+                result.append(self._dish_details_from_model(dish))
+        return result
     
     def calculate_menu_nutrition(
         self, 
@@ -255,35 +267,39 @@ class NutritionService:
             "carbohydrates": round(total.carbohydrates, 2),
         }
     
-    def _calculate_dish_nutrition_from_model(self, dish: Dish) -> Optional[Dict]:
+    def _dish_details_from_model(self, dish: Dish) -> Dict:
         """
-        Calculate nutrition from a Dish model instance.
+        Build dish details from a Dish model instance.
         
         Args:
             dish: Dish model with loaded ingredients
             
         Returns:
-            Dictionary with dish data and nutrition
+            Dictionary with dish data and per-ingredient nutrition
         """
-        total_nutrition = NutritionInfo()
-        total_weight = 0.0
+        ingredients_list = []
         
         for di in dish.ingredients:
-            if di.ingredient:
-                ing_nutrition = self.calculate_ingredient_nutrition(
-                    di.ingredient.name, 
-                    di.amount
-                )
-                if ing_nutrition:
-                    total_nutrition = total_nutrition.add(ing_nutrition)
-                total_weight += di.amount
+            ingredient = di.ingredient
+            if ingredient:
+                nutrition = NutritionInfo.from_macros(
+                    proteins=ingredient.protein_g,
+                    fats=ingredient.fat_g,
+                    carbohydrates=ingredient.carbohydrates_g
+                ).multiply(di.amount / 100)
+                
+                ingredients_list.append({
+                    "name": ingredient.name,
+                    "amount": di.amount,
+                    "unit": "г",
+                    "calories": round(nutrition.calories, 2),
+                    "proteins": round(nutrition.proteins, 2),
+                    "fats": round(nutrition.fats, 2),
+                    "carbohydrates": round(nutrition.carbohydrates, 2),
+                })
         
         return {
             "id": dish.id,
             "name": dish.name,
-            "weight_g": round(total_weight, 2),
-            "energy_kcal": round(total_nutrition.calories, 2),
-            "protein_g": round(total_nutrition.proteins, 2),
-            "fat_g": round(total_nutrition.fats, 2),
-            "carbohydrates_g": round(total_nutrition.carbohydrates, 2),
+            "ingredients": ingredients_list,
         }
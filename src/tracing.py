@@ -0,0 +1,275 @@
+"""
+Request tracing with OpenTelemetry.
+
+When enabled, every request gets a server span (see `TracingMiddleware`)
+with child spans for service and repository methods (`trace_methods`),
+explicitly traced functions (`traced`, `span`) and each SQL statement.
+Spans carry the scalar arguments of traced methods (dish IDs, names),
+the sizes of list arguments (menu size) and of returned lists (rows).
+
+Spans are exported to the console, to a JSON lines file or to an OTLP
+collector, with parent-based ratio sampling. The OpenTelemetry SDK is an
+optional dependency; without it, or with `TRACING_EXPORTER=none`, every
+helper here is a no-op costing one attribute check per call.
+"""
+
+import functools
+import inspect
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+try:
+    from opentelemetry import trace
+    from opentelemetry.propagate import extract
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor, ConsoleSpanExporter
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+except ImportError:  # pragma: no cover - optional dependency
+    trace = None
+
+from src.query_stats import add_observer
+
+logger = logging.getLogger(__name__)
+
+EXPORTERS = ("none", "console", "file", "otlp")
+
+# Longest SQL text attached to a statement span
+MAX_STATEMENT_LENGTH = 2000
+
+# Tracer of the configured provider; None while tracing is disabled
+_tracer = None
+_provider = None
+_observing = False
+
+
+def tracing_enabled() -> bool:
+    """Check whether spans are being recorded."""
+    return _tracer is not None
+
+
+def install_tracer_provider(provider) -> None:
+    """Record spans with an OpenTelemetry SDK tracer provider, shutting down the previous one."""
+    global _tracer, _provider, _observing
+    if _provider is not None and _provider is not provider:
+        _provider.shutdown()
+    _provider = provider
+    _tracer = provider.get_tracer(__name__)
+    if not _observing:
+        add_observer(_statement_span)
+        _observing = True
+
+
+def disable_tracing() -> None:
+    """Stop recording spans; the provider flushes pending spans and closes its exporters."""
+    global _tracer, _provider
+    _tracer = None
+    if _provider is not None:
+        _provider.shutdown()
+        _provider = None
+
+
+if trace is not None:
+
+    class FileSpanExporter(ConsoleSpanExporter):
+        """Span exporter writing one JSON span per line to a file it owns."""
+
+        def __init__(self, path: str):
+            super().__init__(
+                out=open(path, "a", encoding="utf-8"),
+                formatter=lambda span: span.to_json(indent=None) + os.linesep,
+            )
+
+        def shutdown(self) -> None:
+            self.out.close()
+
+
+def configure_tracing(
+    exporter: str,
+    sample_rate: float = 1.0,
+    file_path: str = "traces.jsonl",
+    otlp_endpoint: Optional[str] = None,
+    service_name: str = "menu-api",
+) -> bool:
+    """
+    Set up span export.
+
+    Args:
+        exporter: One of "none", "console", "file" or "otlp"
+        sample_rate: Fraction of traces recorded (parent-based)
+        file_path: Output of the "file" exporter, one JSON span per line
+        otlp_endpoint: OTLP/HTTP traces URL; the exporter's default if empty
+        service_name: Reported `service.name` resource attribute
+
+    Returns:
+        True if tracing is enabled
+    """
+    if exporter == "none":
+        return False
+    if exporter not in EXPORTERS:
+        raise ValueError(f"Unknown tracing exporter {exporter!r}, expected one of {', '.join(EXPORTERS)}")
+    if trace is None:
+        logger.warning("Tracing requested but opentelemetry-sdk is not installed; tracing disabled")
+        return False
+
+    if exporter == "console":
+        span_exporter = ConsoleSpanExporter()
+    elif exporter == "file":
+        span_exporter = FileSpanExporter(file_path)
+    else:
+        try:
+            from opentelemetry.exporter.otlp.proto.http.trace_exporter import OTLPSpanExporter
+        except ImportError:
+            logger.warning(
+                "OTLP tracing requested but opentelemetry-exporter-otlp-proto-http "
+                "is not installed; tracing disabled"
+            )
+            return False
+        span_exporter = OTLPSpanExporter(endpoint=otlp_endpoint or None)
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": service_name}),
+        sampler=ParentBased(TraceIdRatioBased(sample_rate)),
+    )
+    provider.add_span_processor(BatchSpanProcessor(span_exporter))
+    install_tracer_provider(provider)
+    return True
+
+
+@contextmanager
+def span(name: str, attributes: Optional[Dict] = None) -> Iterator[Optional[object]]:
+    """Run a block in a child span of the current one; yields the span or None."""
+    if _tracer is None:
+        yield None
+        return
+    with _tracer.start_as_current_span(name, attributes=_clean(attributes or {})) as current:
+        yield current
+
+
+@contextmanager
+def request_span(scope) -> Iterator[Optional[object]]:
+    """
+    Run an ASGI HTTP request in a server span; yields the span or None.
+
+    A W3C `traceparent` header from the caller is honoured, so the
+    request joins the caller's trace.
+    """
+    if _tracer is None:
+        yield None
+        return
+    carrier = {name.decode("latin-1"): value.decode("latin-1") for name, value in scope["headers"]}
+    with _tracer.start_as_current_span(
+        f"{scope['method']} {scope['path']}",
+        context=extract(carrier),
+        kind=trace.SpanKind.SERVER,
+        attributes={
+            "http.request.method": scope["method"],
+            "url.path": scope["path"],
+            "url.query": scope.get("query_string", b"").decode("latin-1"),
+        },
+    ) as current:
+        yield current
+
+
+def finish_request_span(current, route: str, status_code: int) -> None:
+    """Name a request span after its route and record the response status."""
+    current.update_name(f"{current.attributes['http.request.method']} {route}")
+    current.set_attribute("http.route", route)
+    current.set_attribute("http.response.status_code", status_code)
+    if status_code >= 500:
+        current.set_status(trace.StatusCode.ERROR)
+
+
+def set_attributes(attributes: Dict) -> None:
+    """Add attributes to the current span."""
+    if _tracer is None:
+        return
+    current = trace.get_current_span()
+    if current.is_recording():
+        current.set_attributes(_clean(attributes))
+
+
+def _clean(attributes: Dict) -> Dict:
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+def _argument_attributes(signature: inspect.Signature, args, kwargs) -> Dict:
+    """Span attributes for the scalar arguments and sizes of collections."""
+    try:
+        bound = signature.bind(*args, **kwargs)
+    except TypeError:
+        return {}
+    attributes = {}
+    for name, value in bound.arguments.items():
+        if name == "self":
+            continue
+        if isinstance(value, (bool, int, float, str)):
+            attributes[f"app.{name}"] = value
+        elif isinstance(value, (list, tuple, dict, set)):
+            attributes[f"app.{name}.count"] = len(value)
+    return attributes
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """
+    Decorator running a function in its own span.
+
+    Methods are named `Class.method` after the runtime class of `self`
+    unless a name is given.
+    """
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+        is_method = next(iter(signature.parameters), None) == "self"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            span_name = name
+            if span_name is None:
+                span_name = f"{type(args[0]).__name__}.{func.__name__}" if is_method and args else func.__qualname__
+            with _tracer.start_as_current_span(
+                span_name, attributes=_argument_attributes(signature, args, kwargs)
+            ) as current:
+                result = func(*args, **kwargs)
+                if isinstance(result, (list, tuple)):
+                    current.set_attribute("app.result.count", len(result))
+                return result
+
+        return wrapper
+
+    return decorator
+
+
+def trace_methods(cls):
+    """Class decorator tracing every public method defined on the class."""
+    for attr, value in list(vars(cls).items()):
+        if not attr.startswith("_") and inspect.isfunction(value):
+            setattr(cls, attr, traced()(value))
+    return cls
+
+
+def _statement_span(conn, statement, parameters, context, executemany, duration) -> None:
+    """Query observer: record a finished statement as a client span."""
+    if _tracer is None:
+        return
+    end = time.time_ns()
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else "SQL"
+    current = _tracer.start_span(
+        f"SQL {operation}",
+        kind=trace.SpanKind.CLIENT,
+        start_time=end - int(duration * 1e9),
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.operation": operation,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            "db.executemany": executemany,
+        },
+    )
+    rowcount = getattr(context, "rowcount", -1) if context is not None else -1
+    if isinstance(rowcount, int) and rowcount >= 0:
+        current.set_attribute("db.rowcount", rowcount)
+    current.end(end_time=end)
@@ -6,12 +6,16 @@ Provides test database setup and common fixtures.
 import pytest
 import tempfile
 import os
+from contextlib import contextmanager
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker
 from fastapi.testclient import TestClient
 
 from src.database import Base, get_db
 from src.api.main import app
+from src.api.caching import payload_cache
+from src.query_stats import capture_queries
+from src.services.catalog_version import catalog_version
 
 
 # Test database setup
@@ -50,20 +54,49 @@ def db_session(test_db):
 def client(test_db):
     """Create a test client with database override."""
     def override_get_db():
+        # Mirror get_db: commit on success, roll back on error
+        db = test_db()
         try:
-            db = test_db()
             yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
         finally:
             db.close()
     
     app.dependency_overrides[get_db] = override_get_db
     
+    # Each test starts with a fresh database, so start a fresh catalog version
+    catalog_version.bump()
+    payload_cache.clear()
+    
     with TestClient(app) as test_client:
         yield test_client
     
     app.dependency_overrides.clear()
 
 
+@pytest.fixture
+def max_queries():
+    """
+    Fail when a block issues more SQL queries than allowed.
+    
+    Usage:
+        with max_queries(2):
+            client.get("/api/dishes")
+    """
+    @contextmanager
+    def check(limit: int):
+        with capture_queries() as stats:
+            yield stats
+        assert stats.count <= limit, (
+            f"Expected at most {limit} queries, got {stats.count}:\n"
+            + "\n".join(stats.statements)
+        )
+    return check
+
+
 @pytest.fixture
 def sample_ingredient_data():
     """Sample ingredient data for testing."""
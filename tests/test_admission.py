@@ -0,0 +1,146 @@
+"""
+Tests for admission control and load shedding.
+"""
+
+import asyncio
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from src.api.config import get_settings
+from src.api.middleware import (
+    AdmissionControlMiddleware,
+    AdmissionController,
+    AdmissionLimiter,
+    Overloaded,
+)
+
+
+class TestAdmissionLimiter:
+    """Unit tests for AdmissionLimiter."""
+
+    async def test_admits_up_to_limit_then_hands_off_in_order(self):
+        """Queued requests get freed slots in arrival order."""
+        limiter = AdmissionLimiter("read", limit=2, max_queue_seconds=1)
+        await limiter.acquire()
+        await limiter.acquire()
+
+        order = []
+
+        async def queued(name):
+            await limiter.acquire()
+            order.append(name)
+
+        tasks = [asyncio.ensure_future(queued(name)) for name in ("a", "b")]
+        await asyncio.sleep(0)
+        assert limiter.stats()["queued"] == 2
+
+        limiter.release(0.01)
+        limiter.release(0.01)
+        await asyncio.gather(*tasks)
+
+        assert order == ["a", "b"]
+        assert limiter.in_flight == 2
+        assert limiter.stats()["max_queued"] == 2
+
+    async def test_queue_deadline_sheds(self):
+        """A request still queued at its deadline is rejected."""
+        limiter = AdmissionLimiter("heavy", limit=1, max_queue_seconds=0.02)
+        await limiter.acquire()
+
+        with pytest.raises(Overloaded):
+            await limiter.acquire()
+
+        assert limiter.shed == 1
+        assert limiter.queued == 0
+        limiter.release(0.01)
+        assert limiter.in_flight == 0
+
+    async def test_sheds_immediately_when_wait_exceeds_budget(self):
+        """Requests are rejected up front when the expected wait is too long."""
+        limiter = AdmissionLimiter("write", limit=1, max_queue_seconds=0.5)
+        limiter.service_time = 2.0
+        await limiter.acquire()
+
+        with pytest.raises(Overloaded) as exc_info:
+            await limiter.acquire()
+
+        assert exc_info.value.retry_after == pytest.approx(2.0)
+        assert limiter.queued_total == 0
+
+    async def test_cancelled_waiter_does_not_leak_slot(self):
+        """A client disconnecting while queued leaves no slot behind."""
+        limiter = AdmissionLimiter("read", limit=1, max_queue_seconds=1)
+        await limiter.acquire()
+
+        task = asyncio.ensure_future(limiter.acquire())
+        await asyncio.sleep(0)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+        limiter.release(0.01)
+        assert limiter.in_flight == 0
+        assert limiter.queued == 0
+
+
+class TestAdmissionController:
+    """Test cases for request classification."""
+
+    @pytest.mark.parametrize("method, path, expected", [
+        ("GET", "/api/dishes", "read"),
+        ("GET", "/api/dishes/3", "read"),
+        ("POST", "/api/dishes/batch", "heavy"),
+        ("POST", "/api/menu", "heavy"),
+        ("POST", "/api/dishes/new", "write"),
+        ("DELETE", "/api/ingredients/1", "write"),
+        ("GET", "/api/events", None),
+        ("GET", "/api/admin/admission", None),
+        ("GET", "/health", None),
+    ])
+    def test_classify(self, method, path, expected):
+        controller = AdmissionController("/api", {"read": 1, "heavy": 1, "write": 1}, 1)
+        assert controller.classify(method, path) == expected
+
+
+class TestAdmissionMiddleware:
+    """Integration tests for the ASGI middleware."""
+
+    async def test_overload_returns_503_with_retry_after(self):
+        """Requests over the limit are shed once their queue budget runs out."""
+        release = asyncio.Event()
+        app = FastAPI()
+
+        @app.get("/api/dishes")
+        async def slow():
+            await release.wait()
+            return {"ok": True}
+
+        controller = AdmissionController("/api", {"read": 1}, max_queue_seconds=0.05)
+        app.add_middleware(AdmissionControlMiddleware, controller=controller)
+
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            first = asyncio.ensure_future(client.get("/api/dishes"))
+            await asyncio.sleep(0.01)
+
+            shed = await client.get("/api/dishes")
+            assert shed.status_code == 503
+            assert int(shed.headers["retry-after"]) >= 1
+            assert shed.json()["error"] == "Service overloaded"
+
+            release.set()
+            assert (await first).status_code == 200
+
+        assert controller.stats()["read"]["shed"] == 1
+        assert controller.stats()["read"]["in_flight"] == 0
+
+    def test_admin_exports_stats(self, client: TestClient, monkeypatch):
+        """Admission counters are available to admins."""
+        monkeypatch.setattr(get_settings(), "admin_token", "secret")
+        client.get("/api/dishes")
+        stats = client.get("/api/admin/admission", headers={"X-Admin-Token": "secret"}).json()
+        assert set(stats) == {"read", "heavy", "write"}
+        assert stats["read"]["admitted"] >= 1
@@ -6,6 +6,8 @@ Tests all CRUD operations and business logic.
 import pytest
 from fastapi.testclient import TestClient
 
+from src.api.caching import payload_cache
+
 
 class TestHealthEndpoints:
     """Tests for health and root endpoints."""
@@ -210,6 +212,164 @@ class TestDishEndpoints:
         assert len(response.json()) == 0
 
 
+class TestDishBatchEndpoint:
+    """Tests for batch dish details."""
+    
+    def test_batch_returns_requested_dishes_in_order(self, client: TestClient, sample_ingredient_data):
+        """Test that batch details follow the requested order and skip unknown IDs."""
+        client.post("/api/ingredients", json=sample_ingredient_data)
+        for name in ("Dish A", "Dish B"):
+            client.post("/api/dishes/new", json={
+                "name": name,
+                "ingredients": [{"name": "Test Ingredient", "amount": 50}]
+            })
+        ids = {d["name"]: d["id"] for d in client.get("/api/dishes").json()}
+        
+        response = client.post("/api/dishes/batch", json={"ids": [ids["Dish B"], 999, ids["Dish A"]]})
+        assert response.status_code == 200
+        data = response.json()
+        assert [d["name"] for d in data] == ["Dish B", "Dish A"]
+        assert data[0]["ingredients"][0]["proteins"] == 5.0
+    
+    def test_batch_matches_single_dish_details(self, client: TestClient, create_test_dish):
+        """Test that batch payloads equal the single-dish endpoint."""
+        dish_id = client.get("/api/dishes").json()[0]["id"]
+        single = client.get(f"/api/dishes/{dish_id}").json()
+        
+        response = client.post("/api/dishes/batch", json={"ids": [dish_id]})
+        assert response.json() == [single]
+    
+    def test_batch_requires_ids(self, client: TestClient):
+        """Test that an empty ID list is rejected."""
+        response = client.post("/api/dishes/batch", json={"ids": []})
+        assert response.status_code == 422
+
+
+class TestSparseFieldsets:
+    """Tests for ?fields= projections on listings."""
+    
+    def test_dish_id_name_projection_skips_nutrition(self, client: TestClient, create_test_dish, monkeypatch):
+        """Test that an id/name projection does not compute nutrition."""
+        from src.services.nutrition_service import NutritionService
+        
+        def fail(*args, **kwargs):
+            raise AssertionError("nutrition computed")
+        
+        monkeypatch.setattr(NutritionService, "get_dishes_with_nutrition", fail)
+        response = client.get("/api/dishes?fields=name,id")
+        assert response.status_code == 200
+        data = response.json()
+        assert list(data[0]) == ["id", "name"]
+        assert data[0]["name"] == "Test Dish"
+    
+    def test_dish_nutrition_projection(self, client: TestClient, create_test_dish):
+        """Test that computed fields are returned when requested."""
+        full = client.get("/api/dishes").json()[0]
+        data = client.get("/api/dishes?fields=id,energy_kcal").json()
+        assert data == [{"id": full["id"], "energy_kcal": full["energy_kcal"]}]
+    
+    def test_ingredient_projection(self, client: TestClient, create_test_ingredient):
+        """Test ingredient listings with and without search."""
+        assert client.get("/api/ingredients?fields=name").json() == [{"name": "Test Ingredient"}]
+        data = client.get("/api/ingredients?search=Test&fields=id,nutrition").json()
+        assert set(data[0]) == {"id", "nutrition"}
+    
+    def test_projections_have_distinct_etags(self, client: TestClient, create_test_dish):
+        """Test that projections are cached separately from full rows."""
+        full = client.get("/api/dishes").headers["etag"]
+        narrow = client.get("/api/dishes?fields=id,name").headers["etag"]
+        assert full != narrow
+    
+    def test_unknown_field_rejected(self, client: TestClient):
+        """Test that unknown fields are a bad request."""
+        response = client.get("/api/dishes?fields=id,price")
+        assert response.status_code == 400
+    
+    def test_projection_without_payload_cache(self, client: TestClient, create_test_dish, monkeypatch):
+        """Test that projections bypass response model validation on the uncached path."""
+        from src.api.caching import payload_cache
+        
+        monkeypatch.setattr(payload_cache, "max_bytes", 0)
+        response = client.get("/api/dishes?fields=id,name")
+        assert response.status_code == 200
+        assert set(response.json()[0]) == {"id", "name"}
+
+
+class TestNutritionFiltering:
+    """Tests for server-side nutrition filters and sorting."""
+    
+    @pytest.fixture
+    def catalog(self, client: TestClient):
+        """Create dishes with distinct macros."""
+        for name, proteins, fats, carbs in (
+            ("Chicken", 30, 3, 0),
+            ("Rice", 7, 1, 78),
+            ("Butter", 1, 82, 1),
+        ):
+            client.post("/api/ingredients", json={
+                "name": name,
+                "nutrition": {"calories": 0, "proteins": proteins, "fats": fats, "carbohydrates": carbs}
+            })
+        for name, ingredients in (
+            ("Chicken breast", {"Chicken": 200}),
+            ("Plain rice", {"Rice": 80}),
+            ("chicken with rice", {"Chicken": 100, "Rice": 100}),
+            ("Buttered rice", {"Rice": 100, "Butter": 20}),
+        ):
+            client.post("/api/dishes/new", json={
+                "name": name,
+                "ingredients": [{"name": k, "amount": v} for k, v in ingredients.items()]
+            })
+    
+    def test_name_sort_is_global_and_case_insensitive(self, client: TestClient, catalog):
+        """Test that pages follow one global case-insensitive order."""
+        first = client.get("/api/dishes?limit=2").json()
+        second = client.get("/api/dishes?skip=2&limit=2").json()
+        assert [d["name"] for d in first + second] == [
+            "Buttered rice", "Chicken breast", "chicken with rice", "Plain rice"
+        ]
+    
+    def test_protein_filter_and_sort(self, client: TestClient, catalog):
+        """Test filtering by a macro range and sorting by it."""
+        data = client.get("/api/dishes?protein_min=20&sort=protein_desc").json()
+        assert [d["name"] for d in data] == ["Chicken breast", "chicken with rice"]
+        assert data[0]["protein_g"] == 60
+    
+    def test_kcal_range(self, client: TestClient, catalog):
+        """Test an energy range with both bounds."""
+        data = client.get("/api/dishes?kcal_min=400&kcal_max=600&sort=kcal").json()
+        kcal = [d["energy_kcal"] for d in data]
+        assert kcal == sorted(kcal)
+        assert all(400 <= k <= 600 for k in kcal)
+    
+    def test_density_sort(self, client: TestClient, catalog):
+        """Test sorting by per-100g density rather than totals."""
+        by_total = client.get("/api/dishes?sort=carbs_desc").json()
+        by_density = client.get("/api/dishes?sort=carbs_density_desc").json()
+        assert by_total[0]["name"] == "Buttered rice"
+        assert by_density[0]["name"] == "Plain rice"
+    
+    def test_stored_nutrition_follows_ingredient_updates(self, client: TestClient, catalog):
+        """Test that precomputed columns are refreshed when an ingredient changes."""
+        chicken = next(i for i in client.get("/api/ingredients").json() if i["name"] == "Chicken")
+        client.put(f"/api/ingredients/{chicken['id']}", json={
+            "calories": 0, "proteins": 10, "fats": 3, "carbohydrates": 0
+        })
+        data = client.get("/api/dishes?protein_min=20").json()
+        assert [d["name"] for d in data] == ["Chicken breast"]
+        assert data[0]["protein_g"] == 20
+    
+    def test_filters_apply_to_projections(self, client: TestClient, catalog):
+        """Test that id/name projections honour filters and sorting."""
+        data = client.get("/api/dishes?fields=name&fat_min=10").json()
+        assert data == [{"name": "Buttered rice"}]
+    
+    def test_unknown_sort_rejected(self, client: TestClient):
+        """Test that an unknown sort key is a bad request."""
+        response = client.get("/api/dishes?sort=price_desc")
+        assert response.status_code == 400
+
+
 class TestGoalsEndpoints:
     """Tests for nutrition goals."""
     
@@ -274,6 +434,43 @@ class TestMenuEndpoints:
         assert "total_nutrition" in data
 
 
+class TestQueryBudgets:
+    """SQL query budgets of hot endpoints; raise a budget only deliberately."""
+
+    @pytest.mark.parametrize("method, path, body, budget", [
+        ("GET", "/api/dishes", None, 1),
+        ("GET", "/api/dishes?protein_min=1&sort=protein_desc", None, 1),
+        ("GET", "/api/dishes?fields=id,name", None, 1),
+        ("GET", "/api/dishes/{dish_id}", None, 3),
+        ("POST", "/api/dishes/batch", lambda dish_id: {"ids": [dish_id]}, 1),
+        ("GET", "/api/ingredients", None, 1),
+        # Nutrition is still looked up per ingredient of each selected dish
+        ("POST", "/api/menu", lambda dish_id: {"dishes": [{"id": dish_id, "portions": 2}]}, 7),
+        ("GET", "/api/goals", None, 0),
+    ])
+    def test_endpoint_budget(self, client: TestClient, create_test_dish, max_queries, method, path, body, budget):
+        dish_id = client.get("/api/dishes").json()[0]["id"]
+        json = body(dish_id) if body else None
+        # Looking up the dish cached the listing; measure the cold path
+        payload_cache.clear()
+        with max_queries(budget) as stats:
+            response = client.request(method, path.format(dish_id=dish_id), json=json)
+        assert response.status_code == 200
+        assert stats.count == budget
+
+    def test_writes_are_counted(self, client: TestClient, sample_ingredient_data, max_queries):
+        """Statements issued while committing after the response count too."""
+        with max_queries(3) as stats:
+            client.post("/api/ingredients", json=sample_ingredient_data)
+        assert stats.count == 3
+
+    def test_response_reports_queries(self, client: TestClient, create_test_dish):
+        response = client.get("/api/dishes")
+        assert response.headers["x-db-queries"] == "1"
+        assert response.headers["server-timing"].startswith("db;dur=")
+        assert 'desc="1 queries"' in response.headers["server-timing"]
+
+
 class TestPagination:
     """Tests for pagination functionality."""
     
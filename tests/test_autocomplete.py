@@ -0,0 +1,151 @@
+"""
+Tests for ingredient autocomplete.
+"""
+
+import asyncio
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.services.ingredient_autocomplete import IngredientAutocomplete, ingredient_autocomplete
+
+NUTRITION = {"calories": 100, "proteins": 10, "fats": 4, "carbohydrates": 6}
+
+
+@pytest.fixture
+def index():
+    """An index over a few ingredients with dish usage counts."""
+    autocomplete = IngredientAutocomplete()
+    autocomplete._load([
+        (1, "Курица", 3),
+        (2, "Куриное филе", 7),
+        (3, "Кукуруза", 7),
+        (4, "Яйцо куриное", 1),
+        (5, "Свёкла", 2),
+        (6, "Курица копчёная", 0),
+    ])
+    return autocomplete
+
+
+def _names(suggestions):
+    return [suggestion["name"] for suggestion in suggestions]
+
+
+class TestIngredientAutocomplete:
+    """Test cases for the in-memory prefix index."""
+
+    def test_ranked_by_usage_then_name(self, index):
+        assert _names(index.suggest("ку")) == [
+            "Кукуруза", "Куриное филе", "Курица", "Яйцо куриное", "Курица копчёная",
+        ]
+        assert index.suggest("кур", limit=1) == [{"id": 2, "name": "Куриное филе", "uses": 7}]
+
+    def test_matches_any_word_start(self, index):
+        assert _names(index.suggest("фил")) == ["Куриное филе"]
+        assert _names(index.suggest("коп")) == ["Курица копчёная"]
+        assert index.suggest("урица") == []
+
+    def test_exact_name_first(self, index):
+        assert _names(index.suggest("КУРИЦА")) == ["Курица", "Курица копчёная"]
+
+    def test_yo_and_empty_prefix(self, index):
+        assert _names(index.suggest("свекл")) == ["Свёкла"]
+        assert _names(index.suggest("", limit=2)) == ["Кукуруза", "Куриное филе"]
+
+    def test_usage_change_keeps_table_while_ranks_hold(self, index):
+        index._compositions = {9: (5,), 10: (4,)}
+        table = index._table
+
+        index._apply([{"entity": "dish", "id": 9, "op": "deleted"}], session=None)
+        assert index.suggest("свек") == [{"id": 5, "name": "Свёкла", "uses": 1}]
+        assert index._table is table
+
+        index._apply([{"entity": "dish", "id": 10, "op": "deleted"}], session=None)
+        assert index._table is not table
+        assert _names(index.suggest("к")) == [
+            "Кукуруза", "Куриное филе", "Курица", "Курица копчёная", "Яйцо куриное",
+        ]
+
+    def test_matches_brute_force(self, index):
+        rows = [(i, f"Продукт {i % 7} вариант {i}", (i * 37) % 11) for i in range(300)]
+        index._load(rows)
+
+        def matches(name, prefix):
+            words = name.lower().split()
+            return any(" ".join(words[i:]).startswith(prefix) for i in range(len(words)))
+
+        for prefix in ("п", "продукт 3", "вар", "вариант 1", "в", ""):
+            expected = sorted(
+                (row for row in rows if matches(row[1], prefix)),
+                key=lambda row: (-row[2], row[1].lower(), row[0]),
+            )
+            assert _names(index.suggest(prefix, limit=20)) == [row[1] for row in expected[:20]]
+
+
+class TestAutocompleteEndpoint:
+    """Test cases for GET /api/ingredients/autocomplete."""
+
+    def test_usage_follows_dish_writes(self, client: TestClient):
+        # Lowercase: SQLite's lower() used by ingredient lookups is ASCII-only
+        for name in ("морковь", "мука", "молоко"):
+            client.post("/api/ingredients", json={"name": name, "nutrition": NUTRITION})
+        response = client.get("/api/ingredients/autocomplete", params={"prefix": "мо"})
+        assert response.status_code == 200
+        assert response.json()[0]["uses"] == 0
+        assert _names(response.json()) == ["молоко", "морковь"]
+
+        client.post("/api/dishes/new", json={
+            "name": "Морковный пирог",
+            "ingredients": [{"name": "морковь", "amount": 200}, {"name": "мука", "amount": 150}],
+        })
+        suggestions = client.get("/api/ingredients/autocomplete", params={"prefix": "М"}).json()
+        assert [(s["name"], s["uses"]) for s in suggestions] == [("морковь", 1), ("мука", 1), ("молоко", 0)]
+
+    def test_follows_writes_without_rebuild(self, client: TestClient):
+        for name in ("морковь", "мука", "молоко", "масло"):
+            client.post("/api/ingredients", json={"name": name, "nutrition": NUTRITION})
+        client.post("/api/dishes/new", json={
+            "name": "Пирог",
+            "ingredients": [{"name": "морковь", "amount": 200}, {"name": "мука", "amount": 150}],
+        })
+        client.get("/api/ingredients/autocomplete", params={"prefix": "м"})
+        rebuilds = ingredient_autocomplete.rebuilds
+        table = ingredient_autocomplete._table
+
+        dish_id = client.get("/api/dishes", params={"search": "Пирог"}).json()[0]["id"]
+        client.post(f"/api/dishes/{dish_id}", json={"ingredients": [{"name": "мука", "amount": 150}]})
+        client.post("/api/dishes/new", json={
+            "name": "Блины",
+            "ingredients": [{"name": "молоко", "amount": 300}, {"name": "мука", "amount": 100}],
+        })
+        client.post("/api/ingredients", json={"name": "мёд", "nutrition": NUTRITION})
+        oil_id = next(i["id"] for i in client.get("/api/ingredients").json() if i["name"] == "масло")
+        client.delete(f"/api/ingredients/{oil_id}")
+
+        suggestions = client.get("/api/ingredients/autocomplete", params={"prefix": "м"}).json()
+        assert ingredient_autocomplete.rebuilds == rebuilds
+        assert ingredient_autocomplete._table is not table
+        assert [(s["name"], s["uses"]) for s in suggestions] == [
+            ("мука", 2), ("молоко", 1), ("мёд", 0), ("морковь", 0),
+        ]
+
+        ingredient_autocomplete.invalidate()
+        assert client.get("/api/ingredients/autocomplete", params={"prefix": "м"}).json() == suggestions
+
+    def test_index_refreshed_off_the_event_loop(self, client: TestClient, monkeypatch):
+        on_loop = []
+
+        def sync(session):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+
+        monkeypatch.setattr(ingredient_autocomplete, "sync", sync)
+        assert client.get("/api/ingredients/autocomplete", params={"prefix": "м"}).status_code == 200
+        assert on_loop == [False]
+
+    def test_limit_is_bounded(self, client: TestClient):
+        response = client.get("/api/ingredients/autocomplete", params={"prefix": "м", "limit": 500})
+        assert response.status_code == 422
@@ -0,0 +1,100 @@
+"""
+Tests for catalog ETags and conditional GET.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.config import get_settings
+from src.api.main import app
+from src.database import get_db
+from src.services.catalog_version import catalog_version
+
+
+class _UnusableSession:
+    """Session stand-in that fails the test when touched."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"database accessed via {name}")
+
+
+@pytest.fixture
+def catalog(client: TestClient, sample_ingredient_data, sample_dish_data):
+    """Create one ingredient and one dish."""
+    client.post("/api/ingredients", json=sample_ingredient_data)
+    client.post("/api/dishes/new", json=sample_dish_data)
+    return client.get("/api/dishes").json()[0]["id"]
+
+
+class TestConditionalGet:
+    """Test cases for ETag / If-None-Match handling."""
+
+    @pytest.mark.parametrize("path", ["/api/dishes", "/api/ingredients", "/api/ingredients?search=Test"])
+    def test_listing_revalidates_with_304(self, client: TestClient, catalog, path):
+        """A matching If-None-Match yields an empty 304."""
+        response = client.get(path)
+        etag = response.headers["etag"]
+        assert response.headers["cache-control"] == "public, no-cache"
+
+        response = client.get(path, headers={"If-None-Match": etag})
+        assert response.status_code == 304
+        assert response.content == b""
+        assert response.headers["etag"] == etag
+
+    def test_dish_detail_revalidates_with_304(self, client: TestClient, catalog):
+        """Dish details carry their own ETag."""
+        etag = client.get(f"/api/dishes/{catalog}").headers["etag"]
+        response = client.get(f"/api/dishes/{catalog}", headers={"If-None-Match": f'W/{etag}'})
+        assert response.status_code == 304
+
+    def test_query_shape_changes_etag(self, client: TestClient, catalog):
+        """Different pages of the same listing have different ETags."""
+        first = client.get("/api/dishes?limit=10").headers["etag"]
+        second = client.get("/api/dishes?limit=20").headers["etag"]
+        assert first != second
+
+    def test_write_bumps_version(self, client: TestClient, catalog):
+        """Any committed catalog write invalidates existing ETags."""
+        etag = client.get("/api/dishes").headers["etag"]
+        version = catalog_version.value
+
+        client.delete(f"/api/dishes/{catalog}")
+
+        assert catalog_version.value > version
+        response = client.get("/api/dishes", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert response.json() == []
+
+    def test_failed_write_keeps_version(self, client: TestClient, catalog, sample_ingredient_data):
+        """Rejected writes do not invalidate caches."""
+        version = catalog_version.value
+        response = client.post("/api/ingredients", json=sample_ingredient_data)
+        assert response.status_code == 409
+        assert catalog_version.value == version
+
+    def test_304_does_not_touch_database(self, client: TestClient, catalog):
+        """Revalidation is answered without a database session being used."""
+        etag = client.get("/api/dishes").headers["etag"]
+
+        app.dependency_overrides[get_db] = lambda: _UnusableSession()
+        response = client.get("/api/dishes", headers={"If-None-Match": etag})
+        assert response.status_code == 304
+
+    def test_no_etags_for_workers_without_snapshot(self, client: TestClient, catalog, monkeypatch):
+        """Workers that cannot see each other's writes never answer 304."""
+        etag = client.get("/api/dishes").headers["etag"]
+        monkeypatch.setattr(get_settings(), "web_concurrency", 4)
+        monkeypatch.setattr(get_settings(), "catalog_snapshot_path", "")
+
+        response = client.get("/api/dishes", headers={"If-None-Match": etag})
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+        assert response.headers["cache-control"] == "public, no-cache"
+        response = client.get(f"/api/dishes/{catalog}", headers={"If-None-Match": "*"})
+        assert response.status_code == 200
+        assert "etag" not in response.headers
+
+    def test_goals_are_not_stored(self, client: TestClient):
+        """Goals responses must not be cached."""
+        response = client.get("/api/goals")
+        assert response.headers["cache-control"] == "no-store"
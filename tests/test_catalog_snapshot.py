@@ -0,0 +1,216 @@
+"""
+Tests for the memory-mapped catalog snapshot.
+"""
+
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.routes import goals as goals_route
+from src.api.schemas import GoalsCreate
+from src.database import Dish, DishIngredient, Ingredient
+from src.services import catalog_snapshot as snapshot_module
+from src.services.catalog_snapshot import CatalogSnapshot, SnapshotStore, catalog_snapshot
+
+
+@pytest.fixture
+def catalog(db_session):
+    """A small catalog with Cyrillic names."""
+    buckwheat = Ingredient(name="Гречка", protein_g=12.6, fat_g=3.3, carbohydrates_g=62.1)
+    milk = Ingredient(name="Молоко", protein_g=3.0, fat_g=3.2, carbohydrates_g=4.7)
+    porridge = Dish(name="Гречка с молоком")
+    plain = Dish(name="Каша пустая")
+    db_session.add_all([buckwheat, milk, porridge, plain])
+    db_session.flush()
+    db_session.add_all([
+        DishIngredient(dish_id=porridge.id, ingredient_id=buckwheat.id, amount=80),
+        DishIngredient(dish_id=porridge.id, ingredient_id=milk.id, amount=200),
+        DishIngredient(dish_id=plain.id, ingredient_id=buckwheat.id, amount=50),
+    ])
+    db_session.commit()
+    return db_session
+
+
+@pytest.fixture
+def store(tmp_path, test_db):
+    """Snapshot store writing to a temporary directory."""
+    return SnapshotStore(str(tmp_path / "catalog.snap"), session_factory=test_db)
+
+
+class TestCatalogSnapshot:
+    """Test cases for building and mapping snapshots."""
+
+    def test_round_trip(self, store: SnapshotStore, catalog):
+        """Published data is readable through the mapping."""
+        assert store.current() is None
+        assert store.publish() == 1
+
+        snapshot = store.current()
+        position = snapshot.find_dish("ГРЕЧКА С МОЛОКОМ")
+        assert snapshot.dish_name(position) == "Гречка с молоком"
+        assert snapshot.dish_position(snapshot.dish_id(position)) == position
+
+        components = {
+            snapshot.ingredient_name(ingredient): amount
+            for ingredient, amount in snapshot.dish_components(position)
+        }
+        assert components == {"Гречка": 80, "Молоко": 200}
+
+        nutrition = snapshot.dish_nutrition(position)
+        assert nutrition["weight_g"] == 280
+        assert nutrition["protein_g"] == round(80 * 12.6 / 100 + 200 * 3.0 / 100, 2)
+
+        ingredient = snapshot.find_ingredient("молоко")
+        assert snapshot.ingredient_macros(ingredient) == (3.0, 3.2, 4.7)
+        assert snapshot.find_dish("Борщ") is None
+        assert snapshot.dish_position(10_000) is None
+
+    def test_publish_replaces_file_atomically(self, store: SnapshotStore, catalog):
+        """New generations replace the file; old mappings stay readable."""
+        store.publish()
+        first = store.current()
+
+        catalog.query(Dish).filter_by(name="Каша пустая").one().name = "Каша"
+        catalog.commit()
+        assert store.publish() == 2
+
+        second = store.current()
+        assert second is not first
+        assert second.lineage == first.lineage
+        assert second.version != first.version
+        assert second.find_dish("Каша") is not None
+        assert first.find_dish("Каша пустая") is not None
+
+    def test_other_worker_sees_new_version(self, store: SnapshotStore, tmp_path, test_db, catalog):
+        """Independent stores on the same file agree on the version."""
+        reader = SnapshotStore(store.path, session_factory=test_db)
+        store.publish()
+        assert reader.version() == store.version()
+        store.publish()
+        assert reader.version() == store.version()
+
+    def test_foreign_generations(self, store: SnapshotStore, test_db, catalog):
+        """A store tells generations published by other processes from its own."""
+        other = SnapshotStore(store.path, session_factory=test_db)
+        store.publish()
+        assert store.foreign_generation() is None
+        assert other.foreign_generation() == 1
+
+        other.publish()
+        assert other.foreign_generation() == 1
+        assert store.foreign_generation() == 2
+
+    def test_commits_publish_in_background(self, store: SnapshotStore, monkeypatch):
+        """Commit hooks return at once and a burst of commits publishes once or twice."""
+        release = threading.Event()
+        publishes = []
+
+        def publish():
+            release.wait(timeout=5)
+            publishes.append(time.monotonic())
+
+        monkeypatch.setattr(store, "publish", publish)
+        for version in range(20):
+            store.publish_later(version)
+        assert store.pending
+        assert publishes == []
+
+        release.set()
+        assert store.flush(timeout=5)
+        assert not store.pending
+        assert 1 <= len(publishes) <= 2
+
+    def test_failed_publish_stays_pending_and_retries(self, store: SnapshotStore, monkeypatch):
+        """A failed publish keeps the commit pending until a retry succeeds."""
+        monkeypatch.setattr(snapshot_module, "PUBLISH_RETRY_S", 0.01)
+        retrying, release = threading.Event(), threading.Event()
+        attempts = []
+
+        def publish():
+            attempts.append(time.monotonic())
+            if len(attempts) == 1:
+                raise OSError("disk full")
+            retrying.set()
+            release.wait(timeout=5)
+
+        monkeypatch.setattr(store, "publish", publish)
+        store.publish_later(1)
+        assert retrying.wait(timeout=5)
+        assert store.pending
+
+        release.set()
+        assert store.flush(timeout=5)
+        assert len(attempts) == 2
+        assert store.publish_failures == 1
+
+    def test_rejects_foreign_file(self, tmp_path):
+        """Files that are not snapshots are refused."""
+        path = tmp_path / "garbage.snap"
+        path.write_bytes(b"\0" * 128)
+        with pytest.raises(ValueError):
+            CatalogSnapshot(str(path))
+
+
+class TestSnapshotEndpoints:
+    """Test cases for API reads backed by the snapshot."""
+
+    @pytest.fixture
+    def shared(self, tmp_path, test_db, monkeypatch):
+        """Enable the global snapshot store for one test."""
+        monkeypatch.setattr(catalog_snapshot, "path", str(tmp_path / "catalog.snap"))
+        monkeypatch.setattr(catalog_snapshot, "session_factory", test_db)
+        monkeypatch.setattr(catalog_snapshot, "_snapshot", None)
+        yield catalog_snapshot
+        catalog_snapshot.flush(timeout=5)
+
+    def test_menu_matches_database_path(self, client: TestClient, create_test_dish, shared, monkeypatch):
+        """Menus computed from the snapshot equal those computed from the database."""
+        from src.api.routes import menu as menu_route
+
+        dish_id = client.get("/api/dishes").json()[0]["id"]
+        payload = {"dishes": [{"id": dish_id, "portions": 3}, {"id": 999, "portions": 1}]}
+        from_database = client.post("/api/menu", json=payload).json()
+
+        shared.publish()
+
+        def fail(*args):
+            raise AssertionError("menu built from the database")
+
+        monkeypatch.setattr(menu_route, "_build_menu", fail)
+        from_snapshot = client.post("/api/menu", json=payload).json()
+        assert from_snapshot == from_database
+        assert from_snapshot["total_nutrition"]["protein"] == 30
+
+    def test_writes_publish_new_generation(self, client: TestClient, create_test_dish, shared):
+        """Committed catalog writes republish the snapshot and change ETags."""
+        shared.publish()
+        etag = client.get("/api/dishes").headers["etag"]
+        version = shared.version()
+        assert version is not None
+
+        client.delete(f"/api/dishes/{client.get('/api/dishes').json()[0]['id']}")
+        # Until the write is published, ETags also carry the local version
+        assert client.get("/api/dishes", headers={"If-None-Match": etag}).status_code == 200
+
+        assert shared.flush(timeout=5)
+        assert shared.version() != version
+        assert shared.current().dish_count == 0
+        assert client.get("/api/dishes", headers={"If-None-Match": etag}).status_code == 200
+
+
+class TestGoalsStorage:
+    """Test cases for file-backed goals."""
+
+    def test_goals_are_shared_through_file(self, tmp_path):
+        """A second worker sees goals written by the first."""
+        path = str(tmp_path / "goals.json")
+        first = goals_route.GoalsStorage(path)
+        second = goals_route.GoalsStorage(path)
+
+        first.set(GoalsCreate(protein=100, fat=70, carbohydrates=250, calories=2000))
+        assert second.get()["protein"] == 100
+
+        second.set(GoalsCreate(protein=120, fat=60, carbohydrates=200, calories=1800))
+        assert first.get()["calories"] == 1800
@@ -0,0 +1,118 @@
+"""
+Tests for composition search.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.services.composition_index import CompositionIndex, composition_index
+
+NUTRITION = {"calories": 100, "proteins": 10, "fats": 4, "carbohydrates": 6}
+
+
+@pytest.fixture
+def index():
+    """An index over a few dishes: (id, name, weight, kcal, protein, fat, carbs)."""
+    composition = CompositionIndex()
+    composition._reset(
+        [(1, "Гречка"), (2, "Курица"), (3, "Молоко"), (4, "Свёкла"), (5, "Лук")],
+        [
+            (10, "Гречка с курицей", 300, 450, 35, 10, 50),
+            (11, "Гречка на молоке", 300, 380, 14, 9, 60),
+            (12, "Борщ", 400, 200, 6, 5, 25),
+            (13, "Курица с луком", 250, 350, 40, 15, 5),
+        ],
+        [(10, 1), (10, 2), (10, 5), (11, 1), (11, 3), (12, 4), (12, 5), (13, 2), (13, 5)],
+    )
+    return composition
+
+
+def _ids(rows):
+    return [row["id"] for row in rows]
+
+
+class TestCompositionIndex:
+    """Test cases for the in-memory ingredient bitsets."""
+
+    def test_and_or_not(self, index):
+        assert _ids(index.rows(index.match(include=[1]))) == [10, 11]
+        assert _ids(index.rows(index.match(include=[1, 2]))) == [10]
+        assert _ids(index.rows(index.match(any_of=[3, 4]))) == [11, 12]
+        assert _ids(index.rows(index.match(include=[5], exclude=[2]))) == [12]
+        assert _ids(index.rows(index.match(exclude=[5]))) == [11]
+
+    def test_rows_carry_nutrition(self, index):
+        row = index.rows(index.match(include=[4]))[0]
+        assert row == {
+            "id": 12, "name": "Борщ", "weight_g": 400.0, "energy_kcal": 200.0,
+            "protein_g": 6.0, "fat_g": 5.0, "carbohydrates_g": 25.0,
+        }
+
+    def test_macro_filters_and_paging(self, index):
+        bits = index.match(any_of=[1, 2])
+        assert _ids(index.rows(bits, {"protein": (30, None)})) == [10, 13]
+        assert _ids(index.rows(bits, {"protein": (30, None), "kcal": (None, 400)})) == [13]
+        assert _ids(index.rows(bits, skip=1, limit=1)) == [11]
+
+    def test_resolve_ignores_case_and_yo(self, index):
+        assert index.resolve(["СВЕКЛА", "гречка", "сахар"]) == ([4, 1], ["сахар"])
+
+    def test_composition_change_flips_only_its_bits(self, index):
+        index._set_composition(index._positions[12], (4,))
+        assert _ids(index.rows(index.match(include=[5]))) == [10, 13]
+        index._remove_dish(10)
+        assert _ids(index.rows(index.match(include=[5]))) == [13]
+        assert _ids(index.rows(index.match(include=[1]))) == [11]
+        assert index.stats()["dishes"] == 3
+
+
+class TestCompositionSearchEndpoint:
+    """Test cases for GET /api/dishes/search."""
+
+    @pytest.fixture
+    def dishes(self, client: TestClient):
+        # Lowercase: SQLite's lower() used by ingredient lookups is ASCII-only
+        for name in ("гречка", "курица", "молоко", "лук"):
+            client.post("/api/ingredients", json={"name": name, "nutrition": NUTRITION})
+        for name, ingredients in (
+            ("Гречка с курицей", ("гречка", "курица", "лук")),
+            ("Гречка на молоке", ("гречка", "молоко")),
+            ("Курица с луком", ("курица", "лук")),
+        ):
+            client.post("/api/dishes/new", json={
+                "name": name,
+                "ingredients": [{"name": ingredient, "amount": 100} for ingredient in ingredients],
+            })
+        found = client.get("/api/dishes/search", params={"any": ["гречка", "курица"]}).json()
+        return {dish["name"]: dish["id"] for dish in found}
+
+    def test_include_any_exclude(self, client: TestClient, dishes):
+        response = client.get("/api/dishes/search", params={"include": ["ГРЕЧКА"], "exclude": "молоко"})
+        assert response.status_code == 200
+        assert [dish["name"] for dish in response.json()] == ["Гречка с курицей"]
+        assert response.json()[0]["energy_kcal"] == pytest.approx(300)
+
+        response = client.get("/api/dishes/search", params={"any": ["молоко", "лук"], "exclude": "гречка"})
+        assert [dish["name"] for dish in response.json()] == ["Курица с луком"]
+
+    def test_unknown_ingredients(self, client: TestClient, dishes):
+        assert client.get("/api/dishes/search", params={"include": ["гречка", "сахар"]}).json() == []
+        assert client.get("/api/dishes/search", params={"any": "сахар"}).json() == []
+        response = client.get("/api/dishes/search", params={"include": "лук", "exclude": "сахар"})
+        assert len(response.json()) == 2
+
+    def test_follows_dish_writes_without_rebuild(self, client: TestClient, dishes):
+        client.get("/api/dishes/search", params={"include": "молоко"})
+        rebuilds = composition_index.rebuilds
+
+        client.post(f"/api/dishes/{dishes['Курица с луком']}", json={
+            "ingredients": [{"name": "курица", "amount": 100}, {"name": "молоко", "amount": 100}],
+        })
+        client.delete(f"/api/dishes/{dishes['Гречка на молоке']}")
+        response = client.get("/api/dishes/search", params={"include": "молоко"})
+        assert [dish["name"] for dish in response.json()] == ["Курица с луком"]
+        assert composition_index.rebuilds == rebuilds
+
+    def test_requires_a_condition(self, client: TestClient):
+        assert client.get("/api/dishes/search").status_code == 400
+        assert client.get("/api/dishes/search", params={"include": "лук", "limit": 500}).status_code == 422
@@ -5,7 +5,8 @@ import pytest
 
 from src.models.dish_loader import DishLoader
 from src.models.ingredient_data_loader import IngredientDataLoader
-from src.database import Base, engine
+from src.query_stats import capture_queries
+from src.database import Base, engine, get_session, Ingredient as DbIngredient
 
 
 class TestDishLoader:
@@ -69,3 +70,50 @@ class TestDishLoader:
         
         # Should return a list (may have existing dishes from other tests)
         assert isinstance(dishes, list)
+
+    def test_load_dishes_single_query(self):
+        """All dishes and compositions are read with one query."""
+        with capture_queries() as stats:
+            dishes = self.dish_loader.load_dishes({})
+        assert stats.count == 1
+        assert len(dishes) == len(self.dish_loader.load_columns())
+
+    def test_columns_match_dishes(self):
+        """Columnar and object views describe the same compositions."""
+        columns = self.dish_loader.load_columns()
+        dishes = self.dish_loader.load_dishes({})
+        assert list(columns.ids) == [dish.id for dish in dishes]
+        for position, dish in enumerate(dishes):
+            assert columns.ingredients(position) == dish.ingredients
+
+    def test_dish_without_ingredients_is_loaded(self):
+        """Dishes with an empty composition are kept."""
+        self.dish_loader.save({"name": "Test Empty Dish", "ingredients": {}})
+        try:
+            dishes = {dish.name: dish for dish in self.dish_loader.load_dishes({})}
+            assert dishes["Test Empty Dish"].ingredients == {}
+        finally:
+            self.dish_loader.delete_dish(dishes["Test Empty Dish"].id)
+
+    def test_get_dish_by_id(self):
+        """Single-dish lookups compute nutrition from a targeted query."""
+        with get_session() as session:
+            session.add(DbIngredient(name="Test Loader Ingredient", protein_g=10, fat_g=5, carbohydrates_g=20))
+        self.dish_loader.save({"name": "Test Loader Dish", "ingredients": {"Test Loader Ingredient": 150}})
+        dish = next(dish for dish in self.dish_loader.load_dishes({}) if dish.name == "Test Loader Dish")
+        try:
+            with capture_queries() as stats:
+                loaded = self.dish_loader.get_dish_by_id(dish.id)
+            assert stats.count == 1
+            assert loaded.ingredients == {"Test Loader Ingredient": 150}
+            assert loaded.weight_g == 150
+            assert loaded.protein_g == pytest.approx(15)
+            assert loaded.energy_kcal == pytest.approx((10 * 4 + 5 * 9 + 20 * 4) * 1.5)
+        finally:
+            self.dish_loader.delete_dish(dish.id)
+            with get_session() as session:
+                session.query(DbIngredient).filter_by(name="Test Loader Ingredient").delete()
+
+    def test_get_missing_dish(self):
+        """Unknown IDs return None."""
+        assert self.dish_loader.get_dish_by_id(10_000_000) is None
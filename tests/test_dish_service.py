@@ -0,0 +1,118 @@
+"""
+Tests for the legacy DishService and its incremental dish index.
+"""
+
+from typing import Dict, List
+
+import pytest
+
+from src.models import Dish, Ingredient, NutritionCalculator, NutritionInfo
+from src.models.interfaces import DishLoaderInterface, IngredientLoaderInterface
+from src.services.dish_service import DishService
+
+
+class MemoryIngredientLoader(IngredientLoaderInterface):
+    """Ingredient storage in a dict shared with the dish loader."""
+
+    def __init__(self):
+        self.items = {
+            "рис": Ingredient("рис", NutritionInfo.from_protein_fat_carb(7, 1, 78)),
+            "курица": Ingredient("курица", NutritionInfo.from_protein_fat_carb(21, 8, 0)),
+        }
+
+    def load_ingredients(self) -> Dict[str, Ingredient]:
+        return dict(self.items)
+
+
+class MemoryDishLoader(DishLoaderInterface):
+    """Dish storage in a dict, counting full loads."""
+
+    def __init__(self, ingredient_loader: MemoryIngredientLoader):
+        self.ingredient_loader = ingredient_loader
+        self.rows = {1: ("Плов", {"рис": 150, "курица": 100}), 2: ("Каша", {"рис": 80})}
+        self.loads = 0
+
+    def load_dishes(self, ingredient_dict) -> List[Dish]:
+        self.loads += 1
+        return [Dish(id=i, name=name, ingredients=dict(ing)) for i, (name, ing) in self.rows.items()]
+
+    def save(self, dish_data: dict) -> int:
+        known = self.ingredient_loader.items
+        ingredients = {n: a for n, a in dish_data["ingredients"].items() if n in known}
+        for dish_id, (name, _) in self.rows.items():
+            if name == dish_data["name"]:
+                self.rows[dish_id] = (name, ingredients)
+                return dish_id
+        dish_id = max(self.rows) + 1
+        self.rows[dish_id] = (dish_data["name"], ingredients)
+        return dish_id
+
+    def delete_dish(self, dish_id: int) -> None:
+        del self.rows[dish_id]
+
+
+@pytest.fixture
+def ingredient_loader():
+    return MemoryIngredientLoader()
+
+
+@pytest.fixture
+def loader(ingredient_loader):
+    return MemoryDishLoader(ingredient_loader)
+
+
+@pytest.fixture
+def service(loader, ingredient_loader):
+    return DishService(loader, ingredient_loader, NutritionCalculator())
+
+
+class TestDishService:
+    """Test cases for DishService reads and incremental writes."""
+
+    def test_get_dishes_sorted_with_nutrition(self, service):
+        dishes = service.get_dishes()
+        assert [dish["name"] for dish in dishes] == ["Каша", "Плов"]
+        assert dishes[1]["weight_g"] == 250
+        assert dishes[1]["protein_g"] == round(7 * 1.5 + 21, 2)
+        assert dishes[1]["energy_kcal"] == round((7 * 4 + 1 * 9 + 78 * 4) * 1.5 + (21 * 4 + 8 * 9), 2)
+
+    def test_lookups(self, service):
+        assert [i["name"] for i in service.get_dish_ingredients(1)["ingredients"]] == ["рис", "курица"]
+        menu = service.process_menu([{"id": 1, "portions": 2}, {"id": 2}, {"id": 99}])
+        assert menu["ingredients"]["рис"]["amount"] == 380
+        with pytest.raises(ValueError):
+            service.get_dish_ingredients(99)
+
+    def test_writes_do_not_reload(self, service, loader):
+        service.create_dish("Ароматный рис", [{"name": "рис", "amount": 200}, {"name": "соль", "amount": 5}])
+        service.update_dish(1, [{"name": "курица", "amount": 300}])
+        service.delete_dish(2)
+        assert loader.loads == 1
+
+        dishes = service.get_dishes()
+        assert [dish["name"] for dish in dishes] == ["Ароматный рис", "Плов"]
+        assert dishes[0]["weight_g"] == 200
+        assert dishes[1]["protein_g"] == 63
+        assert service.process_menu([{"id": 1}])["ingredients"] == {"курица": {"amount": 300, "unit": "г"}}
+
+    def test_index_matches_full_reload(self, service, loader, ingredient_loader):
+        service.create_dish("Плов", [{"name": "рис", "amount": 10}])
+        service.create_dish("Бульон", [{"name": "курица", "amount": 50}])
+        fresh = DishService(loader, ingredient_loader, NutritionCalculator())
+        assert service.get_dishes() == fresh.get_dishes()
+
+    def test_ingredient_added_after_start(self, service, loader, ingredient_loader):
+        """A dish using an ingredient the service has not loaded yet is indexed with it."""
+        ingredient_loader.items["морковь"] = Ingredient("морковь", NutritionInfo.from_protein_fat_carb(1, 0, 7))
+        service.create_dish("Салат", [{"name": "морковь", "amount": 100}, {"name": "соль", "amount": 2}])
+
+        fresh = DishService(loader, ingredient_loader, NutritionCalculator())
+        assert service.get_dishes() == fresh.get_dishes()
+        salad = next(dish for dish in service.get_dishes() if dish["name"] == "Салат")
+        assert salad["weight_g"] == 100
+        assert salad["carbohydrates_g"] == 7
+        assert loader.loads == 2
+
+    def test_delete_unknown_dish(self, service):
+        with pytest.raises(ValueError):
+            service.delete_dish(99)
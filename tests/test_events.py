@@ -0,0 +1,175 @@
+"""
+Tests for the catalog change feed.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.broadcaster import Broadcaster, CLOSE, encode_event
+from src.api.routes import events as events_route
+from src.database import Dish
+from src.repositories.dish_repository import DishRepository
+from src.services.catalog_version import catalog_version
+
+
+class RecordingSink:
+    """Catalog event sink that keeps everything it receives."""
+
+    active = True
+
+    def __init__(self):
+        self.batches = []
+
+    def publish(self, version, events):
+        self.batches.append((version, events))
+
+    @property
+    def events(self):
+        return [item for _, batch in self.batches for item in batch]
+
+
+@pytest.fixture
+def sink():
+    """Register a recording sink for the duration of a test."""
+    recorder = RecordingSink()
+    catalog_version.add_sink(recorder)
+    yield recorder
+    catalog_version.remove_sink(recorder)
+
+
+def _parse(frame: bytes) -> dict:
+    """Split an SSE frame into its fields."""
+    fields = {}
+    for line in frame.decode().strip().split("\n"):
+        name, _, value = line.partition(": ")
+        fields[name] = value
+    return fields
+
+
+class TestChangeEvents:
+    """Test cases for events produced by catalog writes."""
+
+    def test_ingredient_update_reaches_dependent_dishes(
+        self, client: TestClient, sink, create_test_dish, sample_ingredient_data
+    ):
+        """Updating an ingredient reports it and the new totals of dishes using it."""
+        ingredient_id = client.get("/api/ingredients").json()[0]["id"]
+        dish_id = client.get("/api/dishes").json()[0]["id"]
+        sink.batches.clear()
+
+        client.put(
+            f"/api/ingredients/{ingredient_id}",
+            json={"calories": 0, "proteins": 20, "fats": 5, "carbohydrates": 15},
+        )
+
+        assert len(sink.batches) == 1
+        version, events = sink.batches[0]
+        assert version == catalog_version.value
+        ingredient, dish = events
+        assert ingredient["entity"] == "ingredient"
+        assert ingredient["id"] == ingredient_id
+        assert ingredient["op"] == "updated"
+        assert ingredient["nutrition"]["proteins"] == 20
+        assert dish["entity"] == "dish"
+        assert dish["id"] == dish_id
+        assert dish["name"] == "Test Dish"
+        assert dish["nutrition"]["protein_g"] == 20
+        assert dish["nutrition"]["energy_kcal"] == 20 * 4 + 5 * 9 + 15 * 4
+
+    def test_dish_lifecycle(self, client: TestClient, sink, create_test_ingredient, sample_dish_data):
+        """Creating and deleting a dish emit created and deleted events."""
+        client.post("/api/dishes/new", json=sample_dish_data)
+        created = [item for item in sink.events if item["entity"] == "dish"]
+        assert [item["op"] for item in created] == ["created"]
+        assert created[0]["nutrition"]["weight_g"] == 100
+
+        client.delete(f"/api/dishes/{created[0]['id']}")
+        assert sink.events[-1] == {"entity": "dish", "id": created[0]["id"], "op": "deleted"}
+
+    def test_dish_without_ingredients_has_zero_totals(self, db_session):
+        """Totals of a dish with an empty composition are zero, not an error."""
+        dish = Dish(name="Empty Dish")
+        db_session.add(dish)
+        db_session.flush()
+
+        totals = DishRepository(db_session).get_nutrition_totals([dish.id])
+        assert totals == {dish.id: {
+            "weight_g": 0.0, "energy_kcal": 0.0, "protein_g": 0.0, "fat_g": 0.0, "carbohydrates_g": 0.0,
+        }}
+
+    def test_failed_write_emits_nothing(self, client: TestClient, sink, create_test_ingredient, sample_ingredient_data):
+        """Rolled back writes are not published."""
+        sink.batches.clear()
+        response = client.post("/api/ingredients", json=sample_ingredient_data)
+        assert response.status_code == 409
+        assert sink.batches == []
+
+
+class TestBroadcaster:
+    """Unit tests for the SSE broadcaster."""
+
+    async def test_fan_out(self):
+        """Every subscriber receives the same encoded frame."""
+        hub = Broadcaster()
+        subscribers = [hub.subscribe() for _ in range(3)]
+
+        hub.publish(7, [{"entity": "dish", "id": 1, "op": "deleted"}])
+
+        frames = [subscriber.queue.get_nowait() for subscriber in subscribers]
+        assert all(frame is frames[0] for frame in frames)
+        fields = _parse(frames[0])
+        assert fields["id"] == "7"
+        assert fields["event"] == "change"
+        assert json.loads(fields["data"])["version"] == 7
+
+    async def test_slow_consumer_is_dropped(self):
+        """A full queue is replaced with a reset frame and the subscriber removed."""
+        hub = Broadcaster(queue_size=4)
+        slow = hub.subscribe()
+        fast = hub.subscribe()
+
+        for version in range(5):
+            hub.publish(version, [{"entity": "dish", "id": 1, "op": "updated"}])
+            if version < 4:
+                fast.queue.get_nowait()
+
+        assert hub.stats() == {"subscribers": 1, "published": 5, "dropped": 1}
+        assert _parse(slow.queue.get_nowait())["event"] == "reset"
+        assert slow.queue.get_nowait() is CLOSE
+        assert _parse(fast.queue.get_nowait())["id"] == "4"
+
+    async def test_publish_from_worker_thread(self):
+        """Commits in threadpool workers are delivered on the subscriber's loop."""
+        hub = Broadcaster()
+        subscriber = hub.subscribe()
+
+        thread = threading.Thread(target=hub.publish, args=(3, [{"entity": "dish", "id": 2, "op": "deleted"}]))
+        thread.start()
+        thread.join()
+
+        frame = await asyncio.wait_for(subscriber.queue.get(), 1)
+        assert _parse(frame)["id"] == "3"
+
+    async def test_stream_sends_hello_heartbeat_and_changes(self, monkeypatch):
+        """The stream starts with hello, keeps alive when idle and ends on close."""
+        hub = Broadcaster()
+        monkeypatch.setattr(events_route, "broadcaster", hub)
+        subscriber = hub.subscribe()
+        stream = events_route.event_stream(subscriber, heartbeat_interval=0.01)
+
+        hello = await stream.__anext__()
+        assert b"retry: " in hello
+        assert b"event: hello" in hello
+        assert await stream.__anext__() == b": keep-alive\n\n"
+
+        subscriber.queue.put_nowait(encode_event("change", {"id": 1}, 9))
+        assert _parse(await stream.__anext__())["id"] == "9"
+
+        subscriber.queue.put_nowait(CLOSE)
+        with pytest.raises(StopAsyncIteration):
+            await stream.__anext__()
+        assert hub.stats()["subscribers"] == 0
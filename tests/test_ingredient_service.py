@@ -0,0 +1,91 @@
+"""
+Tests for IngredientService delta persistence.
+"""
+import pytest
+
+from src.query_stats import capture_queries
+from src.database import Base, engine, get_session, Ingredient as DbIngredient
+from src.models.dish_loader import DishLoader
+from src.models.ingredient_data_loader import IngredientDataLoader
+from src.services.ingredient_service import IngredientService
+
+NAMES = ["Тест дельта 1", "Тест дельта 2", "Тест дельта 3", "Тест дельта 4"]
+NUTRITION = {"calories": 100, "proteins": 10, "fats": 4, "carbohydrates": 6}
+
+
+def _writes(statements, table):
+    return [s for s in statements if s.split()[0] in ("INSERT", "UPDATE", "DELETE") and f" {table}" in s]
+
+
+def _rows():
+    with get_session() as session:
+        return {
+            row.name: (row.id, row.protein_g)
+            for row in session.query(DbIngredient).filter(DbIngredient.name.in_(NAMES))
+        }
+
+
+class TestIngredientService:
+    """Test cases for IngredientService writes."""
+
+    @pytest.fixture(autouse=True)
+    def setup(self):
+        """Start from two test ingredients; remove all test rows afterwards."""
+        Base.metadata.create_all(bind=engine)
+        self.loader = IngredientDataLoader()
+        self.service = IngredientService(self.loader)
+        with self.service.batch():
+            self.service.add_ingredient(NAMES[0], NUTRITION)
+            self.service.add_ingredient(NAMES[1], NUTRITION)
+        yield
+        self.loader.save_changes({}, NAMES)
+
+    def test_update_writes_one_row(self):
+        """An edit updates its own row in place."""
+        before = _rows()
+        with capture_queries() as stats:
+            self.service.update_ingredient(NAMES[0], {**NUTRITION, "proteins": 12})
+        writes = _writes(stats.statements, "ingredients")
+        assert len(writes) == 1
+        assert writes[0].startswith("UPDATE ingredients")
+        after = _rows()
+        assert after[NAMES[0]] == (before[NAMES[0]][0], 12)
+        assert after[NAMES[1]] == before[NAMES[1]]
+
+    def test_batch_coalesces_edits(self):
+        """Edits inside a batch are written together on exit."""
+        with capture_queries() as stats:
+            with self.service.batch():
+                self.service.add_ingredient(NAMES[2], NUTRITION)
+                self.service.add_ingredient(NAMES[3], NUTRITION)
+                self.service.update_ingredient(NAMES[2], {**NUTRITION, "proteins": 1})
+                self.service.delete_ingredient(NAMES[1])
+                assert not _writes(stats.statements, "ingredients")
+        rows = _rows()
+        assert set(rows) == {NAMES[0], NAMES[2], NAMES[3]}
+        assert rows[NAMES[2]][1] == 1
+        # Two new rows (the update folded into an insert) and one delete
+        assert len(_writes(stats.statements, "ingredients")) == 3
+
+    def test_delete_keeps_other_ids_and_compositions(self):
+        """Deleting one ingredient leaves other rows and their dish links alone."""
+        dish_loader = DishLoader()
+        dish_id = dish_loader.save({"name": "Тест дельта блюдо", "ingredients": {NAMES[0]: 50, NAMES[1]: 70}})
+        try:
+            before = _rows()
+            self.service.delete_ingredient(NAMES[1])
+            assert _rows() == {NAMES[0]: before[NAMES[0]]}
+            dish = dish_loader.get_dish_by_id(dish_id)
+            assert dish.ingredients == {NAMES[0]: 50}
+            assert dish.protein_g == pytest.approx(5)
+        finally:
+            dish_loader.delete_dish(dish_id)
+
+    def test_failed_batch_is_discarded(self):
+        """A batch that raises writes nothing and restores the catalog."""
+        with pytest.raises(RuntimeError):
+            with self.service.batch():
+                self.service.delete_ingredient(NAMES[0])
+                raise RuntimeError("abort")
+        assert NAMES[0] in self.service.ingredients
+        assert NAMES[0] in _rows()
@@ -0,0 +1,92 @@
+"""
+Tests for the tracemalloc memory diagnostics.
+"""
+
+import asyncio
+import os
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.config import get_settings
+from src.api.memory import SRC_ROOT, memory_tracer, module_group
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(get_settings(), "admin_token", "secret")
+
+
+@pytest.fixture
+def tracer():
+    """Leave tracing stopped and the snapshot ring empty after a test."""
+    memory_tracer.clear()
+    yield memory_tracer
+    memory_tracer.stop()
+    memory_tracer.clear()
+
+
+class TestModuleGroup:
+    """Unit tests for grouping allocation sites."""
+
+    def test_application_packages(self):
+        assert module_group(os.path.join(SRC_ROOT, "services", "dish_service.py")) == "src.services"
+        assert module_group(os.path.join(SRC_ROOT, "repositories", "base.py")) == "src.repositories"
+
+    def test_libraries(self):
+        assert module_group("/venv/lib/python3.11/site-packages/sqlalchemy/orm/identity.py") == "sqlalchemy"
+        assert module_group("/venv/lib/python3.11/site-packages/pydantic/main.py") == "pydantic"
+        assert module_group("/venv/lib/python3.11/site-packages/idna/core.py") == "other"
+
+
+class TestMemoryEndpoints:
+    """Integration tests for the admin memory API."""
+
+    def test_snapshot_requires_tracing(self, client: TestClient, admin_token, tracer):
+        response = client.post("/api/admin/memory/snapshots", headers=ADMIN)
+        assert response.status_code == 400
+
+    def test_snapshots_and_diff(self, client: TestClient, create_test_dish, admin_token, tracer):
+        assert client.post("/api/admin/memory/start", headers=ADMIN).json()["tracing"] is True
+
+        base = client.post("/api/admin/memory/snapshots?label=before", headers=ADMIN).json()
+        retained = [client.get("/api/dishes").json() for _ in range(20)]
+        target = client.post("/api/admin/memory/snapshots", headers=ADMIN).json()
+        assert base["label"] == "before"
+        assert base["top"] and base["groups"]
+
+        listed = client.get("/api/admin/memory", headers=ADMIN).json()
+        assert [snapshot["id"] for snapshot in listed["snapshot_list"]] == [target["id"], base["id"]]
+
+        diff = client.get("/api/admin/memory/diff", headers=ADMIN).json()
+        assert diff["base"]["id"] == base["id"]
+        assert diff["target"]["id"] == target["id"]
+        assert {group["group"] for group in diff["groups"]}
+        assert len(retained) == 20
+
+        stored = client.get(f"/api/admin/memory/snapshots/{base['id']}?limit=3", headers=ADMIN).json()
+        assert len(stored["top"]) == 3
+
+        assert client.post("/api/admin/memory/stop", headers=ADMIN).json()["tracing"] is False
+
+    def test_snapshots_taken_off_the_event_loop(self, client: TestClient, admin_token, tracer, monkeypatch):
+        """Slow tracemalloc work runs in the threadpool, not on the event loop."""
+        on_loop = []
+
+        def take(label):
+            try:
+                asyncio.get_running_loop()
+                on_loop.append(True)
+            except RuntimeError:
+                on_loop.append(False)
+            raise RuntimeError("Memory tracing is not running")
+
+        monkeypatch.setattr(tracer, "take", take)
+        assert client.post("/api/admin/memory/snapshots", headers=ADMIN).status_code == 400
+        assert on_loop == [False]
+
+    def test_unknown_snapshot(self, client: TestClient, admin_token, tracer):
+        response = client.get("/api/admin/memory/diff?base=a&target=b", headers=ADMIN)
+        assert response.status_code == 404
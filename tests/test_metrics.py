@@ -0,0 +1,85 @@
+"""
+Tests for the Prometheus metrics endpoint.
+"""
+
+import re
+
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.pool import SingletonThreadPool
+
+from src.api.metrics import MetricsRegistry, RequestMetrics
+from src.api.routes import metrics as metrics_route
+
+
+def _sample(text: str, name: str, **labels) -> float:
+    """Value of one sample in an exposition text."""
+    for line in text.splitlines():
+        if line.startswith("#") or not line.startswith(name):
+            continue
+        match = re.fullmatch(r"([a-z_]+)(?:\{(.*)\})? (\S+)", line)
+        found = dict(re.findall(r'(\w+)="((?:[^"\\]|\\.)*)"', match.group(2) or ""))
+        if match.group(1) == name and found == labels:
+            return float(match.group(3))
+    raise AssertionError(f"No sample {name} {labels}")
+
+
+class TestRequestMetrics:
+    """Unit tests for histogram rendering."""
+
+    def test_histogram_buckets_are_cumulative(self):
+        metrics = RequestMetrics()
+        for duration in (0.002, 0.002, 0.3, 20.0):
+            metrics.observe("GET", "/api/dishes", 200, duration, queries=1, db_duration=0.001)
+        registry = MetricsRegistry()
+        registry.register(metrics.collect)
+        text = registry.render()
+
+        labels = {"method": "GET", "route": "/api/dishes"}
+        assert _sample(text, "http_request_duration_seconds_bucket", le="0.001", **labels) == 0
+        assert _sample(text, "http_request_duration_seconds_bucket", le="0.0025", **labels) == 2
+        assert _sample(text, "http_request_duration_seconds_bucket", le="0.5", **labels) == 3
+        assert _sample(text, "http_request_duration_seconds_bucket", le="10", **labels) == 3
+        assert _sample(text, "http_request_duration_seconds_bucket", le="+Inf", **labels) == 4
+        assert _sample(text, "http_request_duration_seconds_count", **labels) == 4
+        assert _sample(text, "http_request_db_queries_total", **labels) == 4
+        assert "# TYPE http_request_duration_seconds histogram" in text
+
+    def test_label_values_are_escaped(self):
+        metrics = RequestMetrics()
+        metrics.observe("GET", 'a"b\\c', 200, 0.1, queries=0, db_duration=0.0)
+        registry = MetricsRegistry()
+        registry.register(metrics.collect)
+        assert r'route="a\"b\\c"' in registry.render()
+
+
+class TestMetricsEndpoint:
+    """Integration tests for /metrics."""
+
+    def test_exposes_route_process_and_cache_metrics(self, client: TestClient, create_test_dish):
+        dish_id = client.get("/api/dishes").json()[0]["id"]
+        client.get(f"/api/dishes/{dish_id}")
+        client.get("/api/dishes/999")
+
+        response = client.get("/metrics")
+        assert response.status_code == 200
+        assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+        text = response.text
+
+        route = {"method": "GET", "route": "/api/dishes/{dish_id}"}
+        assert _sample(text, "http_requests_total", status="200", **route) >= 1
+        assert _sample(text, "http_requests_total", status="404", **route) >= 1
+        assert _sample(text, "http_request_db_queries_total", **route) >= 1
+        assert _sample(text, "http_requests_in_flight") >= 1  # the scrape itself
+        assert _sample(text, "process_resident_memory_bytes") > 0
+        assert _sample(text, "python_gc_collections_total", generation="0") >= 0
+        assert _sample(text, "payload_cache_requests_total", result="miss") >= 1
+        assert _sample(text, "admission_admitted_total", **{"class": "read"}) >= 1
+
+    def test_pool_without_counters(self, monkeypatch):
+        """Pools without the QueuePool counters export no pool gauges instead of failing."""
+        memory = create_engine("sqlite:///:memory:")
+        assert isinstance(memory.pool, SingletonThreadPool)
+        monkeypatch.setattr(metrics_route, "engine", memory)
+
+        assert list(metrics_route.collect_db_pool()) == []
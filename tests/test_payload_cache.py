@@ -0,0 +1,134 @@
+"""
+Tests for the precompressed catalog payload cache.
+"""
+
+import gzip
+import json
+from typing import List
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api import payload_cache as payload_cache_module
+from src.api.caching import payload_cache_bytes, serialize_payload
+from src.api.config import Settings, get_settings
+from src.api.main import app
+from src.api import serialization
+from src.api.schemas import DishResponse
+from src.api.payload_cache import CachedPayload, PayloadCache, parse_accept_encoding
+from src.database import get_db
+
+
+class _UnusableSession:
+    """Session stand-in that fails the test when touched."""
+
+    def __getattr__(self, name):
+        raise AssertionError(f"database accessed via {name}")
+
+
+class TestPayloadCache:
+    """Unit tests for PayloadCache."""
+
+    def test_lru_eviction_by_bytes(self):
+        """Least recently used entries are evicted once the byte budget is exceeded."""
+        entry_size = CachedPayload(identity=b"x" * 100).size
+        cache = PayloadCache(max_bytes=entry_size * 2)
+        cache.put("a", CachedPayload(identity=b"x" * 100))
+        cache.put("b", CachedPayload(identity=b"x" * 100))
+        cache.get("a")
+        cache.put("c", CachedPayload(identity=b"x" * 100))
+
+        assert cache.get("b") is None
+        assert cache.get("a") is not None
+        assert cache.get("c") is not None
+        assert cache.size <= cache.max_bytes
+        assert cache.stats()["evictions"] == 1
+
+    def test_oversized_payload_is_not_cached(self):
+        """A payload larger than the whole budget is skipped."""
+        cache = PayloadCache(max_bytes=10)
+        cache.put("a", CachedPayload(identity=b"x" * 100))
+        assert len(cache) == 0
+
+    def test_encoding_negotiation(self):
+        """The best accepted encoding is served."""
+        body = b"[" + b"1," * 2000 + b"1]"
+        payload = CachedPayload.build(body)
+
+        data, encoding = payload.encoded("gzip, deflate")
+        assert encoding == "gzip"
+        assert gzip.decompress(data) == body
+
+        assert payload.encoded("gzip;q=0") == (body, None)
+        assert payload.encoded(None) == (body, None)
+
+    def test_parse_accept_encoding(self):
+        """q-values are parsed per coding."""
+        assert parse_accept_encoding("br;q=0.5, GZIP") == {"br": 0.5, "gzip": 1.0}
+
+    def test_disabled_for_workers_without_snapshot(self):
+        """Workers that cannot see each other's writes get no payload cache."""
+        assert payload_cache_bytes(Settings(payload_cache_mb=8)) == 8 * 1024 * 1024
+        assert payload_cache_bytes(Settings(payload_cache_mb=8, web_concurrency=4)) == 0
+        assert payload_cache_bytes(
+            Settings(payload_cache_mb=8, web_concurrency=4, catalog_snapshot_path="/tmp/catalog.snap")
+        ) == 8 * 1024 * 1024
+
+    def test_payload_validated_unless_fast_json(self, monkeypatch):
+        """Cached bytes go through the response model unless the fast path is on."""
+        dish = {
+            "id": 1, "name": "Суп", "weight_g": 300.0, "energy_kcal": 120.0,
+            "protein_g": 5.0, "carbohydrates_g": 15.0, "fat_g": 4.0,
+        }
+        content = [{**dish, "internal": True}]
+        assert json.loads(serialize_payload(content, List[DishResponse])) == [dish]
+        assert json.loads(serialize_payload(content)) == content
+
+        if serialization.orjson is None:
+            pytest.skip("orjson is not installed")
+        monkeypatch.setattr(get_settings(), "fast_json", True)
+        assert json.loads(serialize_payload(content, List[DishResponse])) == content
+
+
+class TestCatalogPayloads:
+    """API tests for cached catalog responses."""
+
+    @pytest.fixture
+    def catalog(self, client: TestClient):
+        """Create enough ingredients for the payload to be compressed."""
+        for i in range(30):
+            client.post("/api/ingredients", json={
+                "name": f"Ингредиент {i}",
+                "nutrition": {"calories": 100, "proteins": 10, "fats": 5, "carbohydrates": 15}
+            })
+
+    def test_gzip_encoded_response(self, client: TestClient, catalog, monkeypatch):
+        """Clients accepting gzip receive the precompressed body."""
+        monkeypatch.setattr(payload_cache_module, "brotli", None)
+        response = client.get("/api/ingredients", headers={"Accept-Encoding": "gzip"})
+        assert response.status_code == 200
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        assert len(response.json()) == 30
+
+    def test_identity_response(self, client: TestClient, catalog):
+        """Clients without Accept-Encoding receive plain JSON."""
+        response = client.get("/api/ingredients", headers={"Accept-Encoding": "identity"})
+        assert "content-encoding" not in response.headers
+        assert len(response.json()) == 30
+
+    def test_cache_hit_skips_database(self, client: TestClient, catalog):
+        """A second identical request is served from cached bytes."""
+        first = client.get("/api/ingredients?limit=50").json()
+
+        app.dependency_overrides[get_db] = lambda: _UnusableSession()
+        second = client.get("/api/ingredients?limit=50")
+        assert second.status_code == 200
+        assert second.json() == first
+
+    def test_write_invalidates_payload(self, client: TestClient, catalog):
+        """A committed write changes the cache key."""
+        before = client.get("/api/ingredients?limit=100").json()
+        client.delete(f"/api/ingredients/{before[0]['id']}")
+        after = client.get("/api/ingredients?limit=100").json()
+        assert len(after) == len(before) - 1
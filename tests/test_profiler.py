@@ -0,0 +1,89 @@
+"""
+Tests for the on-demand request profiler.
+"""
+
+from collections import Counter
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.config import get_settings
+from src.api.profiler import RequestProfile
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(get_settings(), "admin_token", "secret")
+
+
+class TestRequestProfile:
+    """Unit tests for profile rendering."""
+
+    @pytest.fixture
+    def profile(self):
+        profile = RequestProfile("1-1", "GET", "/api/dishes", "", interval=0.001)
+        main = ("/x/app.py", 1, "main")
+        profile.stacks = Counter({
+            (main, ("/x/app.py", 10, "load")): 3,
+            (main, ("/x/app.py", 20, "render")): 1,
+        })
+        profile.duration = 0.004
+        return profile
+
+    def test_summary_counts_own_and_inclusive_samples(self, profile):
+        summary = profile.summary()
+        assert summary["self"][0] == {"function": "load (app.py:10)", "samples": 3, "percent": 75.0}
+        assert summary["total"][0]["function"] == "main (app.py:1)"
+        assert summary["total"][0]["samples"] == 4
+
+    def test_collapsed_stacks(self, profile):
+        assert profile.collapsed().splitlines() == [
+            "main (app.py:1);load (app.py:10) 3",
+            "main (app.py:1);render (app.py:20) 1",
+        ]
+
+    def test_speedscope_shares_frames(self, profile):
+        data = profile.speedscope()
+        assert [frame["name"] for frame in data["shared"]["frames"]] == ["main", "load", "render"]
+        assert data["profiles"][0]["samples"] == [[0, 1], [0, 2]]
+        assert data["profiles"][0]["weights"] == [3.0, 1.0]
+
+
+class TestProfilerMiddleware:
+    """Integration tests for profiling through the API."""
+
+    def test_header_ignored_without_admin_access(self, client: TestClient, admin_token):
+        response = client.get("/api/dishes", headers={"X-Profile": "1"})
+        assert response.status_code == 200
+        assert "x-profile-id" not in response.headers
+
+    def test_profiles_request_with_sql(self, client: TestClient, create_test_dish, admin_token):
+        dish_id = client.get("/api/dishes").json()[0]["id"]
+        response = client.post(
+            "/api/menu",
+            json={"dishes": [{"id": dish_id, "portions": 2}]},
+            headers={"X-Profile": "1", **ADMIN},
+        )
+        assert response.status_code == 200
+        profile_id = response.headers["x-profile-id"]
+
+        listed = client.get("/api/admin/profiles", headers=ADMIN).json()
+        assert listed[0]["id"] == profile_id
+        assert listed[0]["path"] == "/api/menu"
+
+        summary = client.get(f"/api/admin/profiles/{profile_id}", headers=ADMIN).json()
+        assert summary["status"] == 200
+        assert summary["queries"] == len(summary["sql"]) > 0
+        assert any("FROM dishes" in statement for statement in summary["sql"])
+
+        collapsed = client.get(f"/api/admin/profiles/{profile_id}?format=collapsed", headers=ADMIN)
+        assert collapsed.headers["content-type"].startswith("text/plain")
+
+        speedscope = client.get(f"/api/admin/profiles/{profile_id}?format=speedscope", headers=ADMIN)
+        assert speedscope.json()["profiles"][0]["type"] == "sampled"
+
+    def test_unknown_profile(self, client: TestClient, admin_token):
+        response = client.get("/api/admin/profiles/nope", headers=ADMIN)
+        assert response.status_code == 404
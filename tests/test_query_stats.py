@@ -0,0 +1,72 @@
+"""
+Tests for per-request SQL query accounting.
+"""
+
+import logging
+
+import httpx
+import pytest
+from fastapi import FastAPI
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from src.api.middleware import QueryStatsMiddleware
+from src.query_stats import capture_queries, track_queries
+
+
+@pytest.fixture
+def engine():
+    engine = create_engine("sqlite://")
+    yield engine
+    engine.dispose()
+
+
+class TestQueryStats:
+    """Unit tests for the engine event listeners."""
+
+    def test_track_counts_only_its_context(self, engine):
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+            with track_queries() as stats:
+                conn.execute(text("SELECT 2"))
+                conn.execute(text("SELECT 3"))
+            conn.execute(text("SELECT 4"))
+
+        assert stats.count == 2
+        assert stats.statements is None
+        assert stats.duration_ms >= 0
+
+    def test_capture_keeps_statements_and_survives_errors(self, engine):
+        with capture_queries() as stats, engine.connect() as conn:
+            with pytest.raises(OperationalError):
+                conn.execute(text("SELECT * FROM missing"))
+            conn.execute(text("SELECT 1"))
+            assert conn.info["query_stats_start"] == []
+
+        assert stats.statements == ["SELECT 1"]
+
+
+class TestQueryStatsMiddleware:
+    """Integration tests for the ASGI middleware."""
+
+    async def test_headers_and_budget_warning(self, engine, caplog):
+        app = FastAPI()
+
+        @app.get("/api/chatty")
+        async def chatty():
+            with engine.connect() as conn:
+                for i in range(3):
+                    conn.execute(text(f"SELECT {i}"))
+            return {"ok": True}
+
+        app.add_middleware(QueryStatsMiddleware, budget=2)
+
+        transport = httpx.ASGITransport(app=app)
+        with caplog.at_level(logging.WARNING, logger="src.api.middleware"):
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                response = await client.get("/api/chatty")
+
+        assert response.headers["x-db-queries"] == "3"
+        assert 'desc="3 queries"' in response.headers["server-timing"]
+        assert "app;dur=" in response.headers["server-timing"]
+        assert "issued 3 SQL queries (budget 2" in caplog.text
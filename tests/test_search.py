@@ -0,0 +1,106 @@
+"""
+Tests for typo-tolerant name search.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.services.name_search import NameSearchIndex, edit_distance, name_search, normalize
+
+NUTRITION = {"calories": 100, "proteins": 10, "fats": 4, "carbohydrates": 6}
+
+
+@pytest.fixture
+def index():
+    """An index over a few ingredients and dishes."""
+    search_index = NameSearchIndex()
+    search_index._reset([
+        ("ingredient", 1, "Курица"),
+        ("ingredient", 2, "Куриное филе"),
+        ("ingredient", 3, "Свёкла"),
+        ("ingredient", 4, "Картофель молодой"),
+        ("dish", 1, "Суп из курица"),
+        ("dish", 2, "Салат «Свёкла с чесноком»"),
+    ])
+    return search_index
+
+
+def _names(results):
+    return [result["name"] for result in results]
+
+
+class TestNameSearchIndex:
+    """Test cases for the in-memory name index."""
+
+    def test_normalize_folds_case_and_yo(self):
+        assert normalize("  Свёкла   ВАРЁНАЯ ") == "свекла вареная"
+
+    def test_edit_distance(self):
+        assert edit_distance("курица", "курица") == 0
+        assert edit_distance("курийа", "курица") == 1
+        assert edit_distance("кортофль", "картофель") == 2
+        assert edit_distance("карт", "картофель", prefix=True) == 0
+        assert edit_distance("корт", "картофель", prefix=True) == 1
+
+    def test_typos_and_yo(self, index):
+        assert _names(index.search("курийа ")) == ["Курица", "Суп из курица"]
+        assert _names(index.search("свекла", kind="ingredient")) == ["Свёкла"]
+        assert index.search("кортофель")[0] == {
+            "kind": "ingredient", "id": 4, "name": "Картофель молодой", "distance": 1,
+        }
+
+    def test_every_word_must_match(self, index):
+        assert _names(index.search("суп курица")) == ["Суп из курица"]
+        assert _names(index.search("салат чеснок")) == ["Салат «Свёкла с чесноком»"]
+        assert index.search("суп свекла") == []
+
+    def test_exact_before_typos(self, index):
+        results = index.search("курица ")
+        assert [r["distance"] for r in results] == [0, 0]
+        assert results[0]["name"] == "Курица"
+        # A finished word no longer matches as a prefix
+        assert _names(index.search("кур ")) == []
+        assert "Куриное филе" in _names(index.search("кур"))
+
+    def test_max_distance(self, index):
+        assert index.search("курийа", max_distance=0) == []
+
+    def test_incremental_updates(self, index):
+        index._apply([
+            {"entity": "ingredient", "id": 1, "op": "deleted"},
+            {"entity": "dish", "id": 1, "op": "updated", "name": "Бульон"},
+            {"entity": "dish", "id": 3, "op": "created", "name": "Курица гриль"},
+        ], session=None)
+        assert _names(index.search("курица ")) == ["Курица гриль"]
+        assert _names(index.search("бульон")) == ["Бульон"]
+        assert index.search("суп") == []
+
+
+class TestSearchEndpoint:
+    """Test cases for GET /api/search."""
+
+    def test_search_follows_writes(self, client: TestClient):
+        """Writes after the first search are applied without a rebuild."""
+        # Lowercase: SQLite's lower() used by ingredient lookups is ASCII-only
+        client.post("/api/ingredients", json={"name": "гречка ядрица", "nutrition": NUTRITION})
+        response = client.get("/api/search", params={"q": "гречко"})
+        assert response.status_code == 200
+        assert _names(response.json()) == ["гречка ядрица"]
+        rebuilds = name_search.rebuilds
+
+        client.post("/api/ingredients", json={"name": "Ёжевика", "nutrition": NUTRITION})
+        client.post("/api/dishes/new", json={
+            "name": "Каша гречневая", "ingredients": [{"name": "гречка ядрица", "amount": 80}],
+        })
+        assert _names(client.get("/api/search", params={"q": "ежевика"}).json()) == ["Ёжевика"]
+        results = client.get("/api/search", params={"q": "каша", "kind": "dish"}).json()
+        assert results == [{"kind": "dish", "id": results[0]["id"], "name": "Каша гречневая", "distance": 0}]
+
+        ingredient_id = client.get("/api/ingredients", params={"search": "Ёжевика"}).json()[0]["id"]
+        client.delete(f"/api/ingredients/{ingredient_id}")
+        assert client.get("/api/search", params={"q": "ежевика"}).json() == []
+        assert name_search.rebuilds == rebuilds
+
+    def test_invalid_kind(self, client: TestClient):
+        response = client.get("/api/search", params={"q": "рис", "kind": "menu"})
+        assert response.status_code == 400
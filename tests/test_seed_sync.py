@@ -0,0 +1,81 @@
+"""
+Tests for incremental seed data synchronization.
+"""
+
+import json
+
+import pytest
+
+from src import database_init
+from src.database import Ingredient, Dish, DishIngredient, SeedRecord
+
+
+def _write_seed(tmp_path, ingredients, dishes):
+    """Write seed files and point database_init at them."""
+    (tmp_path / "ingredients.json").write_text(
+        json.dumps({"ingredients": ingredients}, ensure_ascii=False), encoding="utf-8"
+    )
+    (tmp_path / "dishes.json").write_text(
+        json.dumps({"dishes": dishes}, ensure_ascii=False), encoding="utf-8"
+    )
+
+
+@pytest.fixture
+def seed_files(tmp_path, monkeypatch):
+    """Redirect seed file paths to a temporary directory."""
+    monkeypatch.setattr(database_init, "INGREDIENTS_FILE", str(tmp_path / "ingredients.json"))
+    monkeypatch.setattr(database_init, "DISHES_FILE", str(tmp_path / "dishes.json"))
+    ingredients = [
+        {"name": "Гречка", "protein_g": 12.6, "fat_g": 3.3, "carbohydrates_g": 62.1},
+        {"name": "Молоко", "protein_g": 3.0, "fat_g": 3.2, "carbohydrates_g": 4.7},
+    ]
+    dishes = [
+        {"name": "Гречка с молоком", "ingredients": {"Гречка": 80, "Молоко": 200}},
+    ]
+    _write_seed(tmp_path, ingredients, dishes)
+    return tmp_path, ingredients, dishes
+
+
+class TestSeedSync:
+    """Test cases for sync_database."""
+
+    def test_initial_sync_inserts_everything(self, db_session, seed_files):
+        """First sync inserts all records and stores their hashes."""
+        result = database_init.sync_database(db_session)
+
+        assert result == {"ingredients": 2, "dishes": 1}
+        assert db_session.query(Ingredient).count() == 2
+        assert db_session.query(DishIngredient).count() == 2
+        assert db_session.query(SeedRecord).count() == 4
+        dish = db_session.query(Dish).one()
+        assert dish.weight_g == 280
+        assert dish.protein_g == round(80 * 12.6 / 100 + 200 * 3.0 / 100, 2)
+
+    def test_unchanged_files_are_skipped(self, db_session, seed_files):
+        """A second sync with identical files does nothing."""
+        database_init.sync_database(db_session)
+
+        result = database_init.sync_database(db_session)
+        assert result == {"ingredients": 0, "dishes": 0}
+
+    def test_only_changed_records_are_upserted(self, db_session, seed_files):
+        """Changed records are updated in place, unchanged ones are left alone."""
+        tmp_path, ingredients, dishes = seed_files
+        database_init.sync_database(db_session)
+        milk_id = db_session.query(Ingredient).filter_by(name="Молоко").one().id
+
+        ingredients[1] = {"name": "Молоко", "protein_g": 3.4, "fat_g": 2.5, "carbohydrates_g": 4.7}
+        ingredients.append({"name": "Сахар", "protein_g": 0.0, "fat_g": 0.0, "carbohydrates_g": 99.8})
+        dishes[0] = {"name": "Гречка с молоком", "ingredients": {"Гречка": 80, "Молоко": 150, "Сахар": 10}}
+        _write_seed(tmp_path, ingredients, dishes)
+
+        result = database_init.sync_database(db_session)
+        assert result == {"ingredients": 2, "dishes": 1}
+
+        milk = db_session.query(Ingredient).filter_by(name="Молоко").one()
+        assert milk.id == milk_id
+        assert milk.fat_g == 2.5
+
+        dish = db_session.query(Dish).filter_by(name="Гречка с молоком").one()
+        amounts = {di.ingredient.name: di.amount for di in dish.ingredients}
+        assert amounts == {"Гречка": 80, "Молоко": 150, "Сахар": 10}
@@ -0,0 +1,63 @@
+"""
+Tests for the fast JSON serialization path.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.config import get_settings
+from src.api import serialization
+
+
+@pytest.fixture
+def fast_json(monkeypatch):
+    """Enable the fast serialization path for one test."""
+    if serialization.orjson is None:
+        pytest.skip("orjson is not installed")
+    monkeypatch.setattr(get_settings(), "fast_json", True)
+
+
+@pytest.fixture
+def catalog(client: TestClient, sample_ingredient_data, sample_dish_data):
+    """Create one ingredient and one dish."""
+    client.post("/api/ingredients", json=sample_ingredient_data)
+    client.post("/api/dishes/new", json=sample_dish_data)
+    return client.get("/api/dishes").json()[0]["id"]
+
+
+class TestFastJSON:
+    """Fast path responses must match the standard path byte for byte in content."""
+
+    @pytest.mark.parametrize("path", ["/api/dishes", "/api/ingredients"])
+    def test_listing_matches_standard_path(self, client: TestClient, catalog, monkeypatch, path):
+        """Listings are identical with and without the fast path."""
+        expected = client.get(path).json()
+
+        monkeypatch.setattr(get_settings(), "fast_json", True)
+        response = client.get(path)
+        assert response.status_code == 200
+        assert response.headers["content-type"] == "application/json"
+        assert response.json() == expected
+
+    def test_menu_matches_standard_path(self, client: TestClient, catalog, fast_json):
+        """Menu processing decodes and encodes through orjson."""
+        menu = {"dishes": [{"id": catalog, "portions": 2}]}
+        response = client.post("/api/menu", json=menu)
+        assert response.status_code == 200
+        data = response.json()
+        assert data["dishes"][0]["portions"] == 2
+        assert data["ingredients"]["Test Ingredient"] == {"amount": 200.0, "unit": "г"}
+
+    def test_menu_invalid_json(self, client: TestClient, fast_json):
+        """Malformed bodies are still rejected with 422."""
+        response = client.post(
+            "/api/menu",
+            content="{not json",
+            headers={"Content-Type": "application/json"}
+        )
+        assert response.status_code == 422
+
+    def test_menu_validation_error(self, client: TestClient, fast_json):
+        """Decoded bodies are still validated against MenuProcessRequest."""
+        response = client.post("/api/menu", json={"dishes": [{"id": "x"}]})
+        assert response.status_code == 422
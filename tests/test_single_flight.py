@@ -0,0 +1,126 @@
+"""
+Tests for single-flight request coalescing.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import text
+
+from src.api.config import get_settings
+from src.api.single_flight import SingleFlight
+from src.database import with_own_session
+
+
+class TestSingleFlight:
+    """Unit tests for SingleFlight."""
+
+    async def test_concurrent_calls_share_one_computation(self):
+        """Identical concurrent calls run the function once."""
+        flight = SingleFlight()
+        calls = []
+        release = threading.Event()
+
+        def compute():
+            calls.append(1)
+            release.wait(timeout=5)
+            return {"value": 42}
+
+        tasks = [asyncio.ensure_future(flight.do("dishes", compute)) for _ in range(10)]
+        for _ in range(100):
+            await asyncio.sleep(0.01)
+            if flight.waiters().get("dishes") == 10:
+                break
+        assert flight.waiters() == {"dishes": 10}
+
+        release.set()
+        results = await asyncio.gather(*tasks)
+
+        assert len(calls) == 1
+        assert all(result is results[0] for result in results)
+        assert flight.stats()["coalesced"] == 9
+        assert flight.waiters() == {}
+
+    async def test_different_keys_run_separately(self):
+        """Calls with different keys are not coalesced."""
+        flight = SingleFlight()
+        results = await asyncio.gather(
+            flight.do("a", lambda: "a"),
+            flight.do("b", lambda: "b"),
+        )
+        assert results == ["a", "b"]
+        assert flight.executed == 2
+
+    async def test_errors_reach_every_waiter(self):
+        """A failing computation fails all coalesced callers."""
+        flight = SingleFlight()
+
+        def fail():
+            time.sleep(0.05)
+            raise ValueError("boom")
+
+        results = await asyncio.gather(
+            *(flight.do("k", fail) for _ in range(3)), return_exceptions=True
+        )
+        assert all(isinstance(r, ValueError) for r in results)
+        assert flight.executed == 1
+
+    async def test_finished_key_is_recomputed(self):
+        """Sequential calls are not cached, only concurrent ones are shared."""
+        flight = SingleFlight()
+        await flight.do("k", lambda: 1)
+        await flight.do("k", lambda: 2)
+        assert flight.executed == 2
+
+
+class TestOwnSession:
+    """Shared computations must not depend on the starting request's session."""
+
+    def test_outlives_the_request_session(self, db_session):
+        """The work gets a session of its own, usable after the request's is closed."""
+        run = with_own_session(
+            db_session, lambda session: (session is db_session, session.execute(text("SELECT 1")).scalar())
+        )
+        db_session.close()
+        assert run() == (False, 1)
+
+
+class TestAdminSingleFlight:
+    """Tests for the admin stats endpoint."""
+
+    def test_stats_endpoint(self, client: TestClient, monkeypatch):
+        """Stats are exposed to admins."""
+        monkeypatch.setattr(get_settings(), "admin_token", "secret")
+        response = client.get("/api/admin/single-flight", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+        assert set(response.json()) == {"executed", "coalesced", "inflight"}
+
+    def test_requires_admin_token(self, client: TestClient, monkeypatch):
+        """The admin token is required, in debug mode too."""
+        monkeypatch.setattr(get_settings(), "debug", True)
+        monkeypatch.setattr(get_settings(), "admin_token", "secret")
+
+        assert client.get("/api/admin/single-flight").status_code == 403
+        assert client.get("/api/admin/single-flight", headers={"X-Admin-Token": "wrong"}).status_code == 403
+        response = client.get("/api/admin/single-flight", headers={"X-Admin-Token": "secret"})
+        assert response.status_code == 200
+
+    def test_non_ascii_token_is_rejected(self, client: TestClient, monkeypatch):
+        """A non-ASCII token is a mismatch, not a server error, on admin and profiled routes."""
+        monkeypatch.setattr(get_settings(), "admin_token", "secret")
+        token = "пароль".encode("utf-8")
+
+        assert client.get("/api/admin/single-flight", headers={"X-Admin-Token": token}).status_code == 403
+        response = client.get("/api/goals", headers={"X-Admin-Token": token, "X-Profile": "1"})
+        assert response.status_code == 200
+
+    def test_closed_without_configured_token(self, client: TestClient, monkeypatch):
+        """With no admin token configured, admin endpoints are closed."""
+        monkeypatch.setattr(get_settings(), "debug", True)
+        monkeypatch.setattr(get_settings(), "admin_token", "")
+
+        assert client.get("/api/admin/single-flight").status_code == 403
+        assert client.get("/api/admin/single-flight", headers={"X-Admin-Token": ""}).status_code == 403
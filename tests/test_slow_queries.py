@@ -0,0 +1,127 @@
+"""
+Tests for the slow query log.
+"""
+
+from collections import deque
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src.api.config import get_settings
+from src.api.slow_queries import SlowQueryLog, _is_select, slow_query_log
+
+ADMIN = {"X-Admin-Token": "secret"}
+
+
+@pytest.fixture
+def admin_token(monkeypatch):
+    monkeypatch.setattr(get_settings(), "admin_token", "secret")
+
+
+@pytest.fixture
+def log_everything(monkeypatch):
+    """Treat every statement as slow and explain all of them."""
+    monkeypatch.setattr(slow_query_log, "threshold", 1e-9)
+    monkeypatch.setattr(slow_query_log, "explain_sample", 1.0)
+    monkeypatch.setattr(slow_query_log, "explain_per_minute", 1000)
+    monkeypatch.setattr(slow_query_log, "_explain_times", deque())
+    slow_query_log.clear()
+    yield slow_query_log
+    slow_query_log.clear()
+
+
+class _Cursor:
+    """DBAPI cursor stand-in that records statements and fails EXPLAIN."""
+
+    def __init__(self, executed):
+        self.executed = executed
+
+    def execute(self, statement, parameters=None):
+        self.executed.append(statement)
+        if statement.startswith("EXPLAIN"):
+            raise RuntimeError("canceling statement due to statement timeout")
+
+    def close(self):
+        pass
+
+
+def _postgresql_connection(executed):
+    """SQLAlchemy connection stand-in on a PostgreSQL dialect."""
+    dbapi_connection = SimpleNamespace(cursor=lambda: _Cursor(executed))
+    return SimpleNamespace(
+        dialect=SimpleNamespace(name="postgresql"),
+        connection=SimpleNamespace(dbapi_connection=dbapi_connection),
+    )
+
+
+class TestSlowQueryLog:
+    """Unit tests for thresholds and plan rate limiting."""
+
+    def test_fast_statements_ignored(self):
+        log = SlowQueryLog(threshold_ms=100)
+        log.observe(None, "SELECT 1", (), None, False, 0.01)
+        assert log.recent() == []
+
+    def test_disabled_with_zero_threshold(self):
+        log = SlowQueryLog(threshold_ms=0)
+        log.observe(None, "SELECT 1", (), None, False, 10.0)
+        assert log.stats()["logged"] == 0
+
+    def test_plans_rate_limited(self):
+        log = SlowQueryLog(threshold_ms=1, explain_per_minute=2)
+        assert [log._may_explain() for _ in range(3)] == [True, True, False]
+        assert log.stats()["explained"] == 2
+
+    def test_writes_not_explained(self, monkeypatch):
+        log = SlowQueryLog(threshold_ms=1)
+        monkeypatch.setattr(log, "_explain", lambda *args: pytest.fail("explained a write"))
+        log.observe(None, "UPDATE ingredients SET calories = ?", (1,), None, False, 1.0)
+        assert log.recent()[0]["plan"] is None
+
+
+    def test_write_ctes_not_explained(self):
+        assert _is_select("  select 1")
+        assert _is_select("WITH totals AS (SELECT 1) SELECT * FROM totals")
+        assert not _is_select("WITH gone AS (DELETE FROM dishes RETURNING id) SELECT count(*) FROM gone")
+        assert not _is_select("with moved as (update dishes set name = 'x' returning id) select 1")
+
+    def test_failed_plan_rolls_back_to_savepoint(self):
+        """A failed EXPLAIN on PostgreSQL leaves the request's transaction usable."""
+        executed = []
+        plan = SlowQueryLog(threshold_ms=1)._explain(_postgresql_connection(executed), "SELECT 1", ())
+
+        assert plan == ["EXPLAIN failed: canceling statement due to statement timeout"]
+        assert executed == [
+            "SAVEPOINT slow_query_explain",
+            "EXPLAIN (ANALYZE, BUFFERS) SELECT 1",
+            "ROLLBACK TO SAVEPOINT slow_query_explain",
+            "RELEASE SAVEPOINT slow_query_explain",
+        ]
+
+
+class TestSlowQueryEndpoint:
+    """Integration tests for slow query capture through the API."""
+
+    def test_records_caller_and_plan(self, client: TestClient, sample_ingredient_data, log_everything, admin_token):
+        client.post("/api/ingredients", json=sample_ingredient_data)
+
+        data = client.get("/api/admin/slow-queries", headers=ADMIN).json()
+        lookups = [
+            entry for entry in data["queries"]
+            if entry["caller"] and entry["caller"].startswith("IngredientRepository.name_exists")
+        ]
+        assert lookups
+        entry = lookups[0]
+        assert "lower(ingredients.name)" in entry["statement"]
+        assert entry["parameters"]
+        # The case-insensitive lookup cannot use the index on name
+        assert any(line.startswith("SCAN ingredients") for line in entry["plan"])
+
+    def test_clear(self, client: TestClient, log_everything, admin_token):
+        client.get("/api/ingredients")
+        assert client.delete("/api/admin/slow-queries", headers=ADMIN).status_code == 200
+        assert log_everything.recent() == []
+
+    def test_requires_admin(self, client: TestClient, admin_token):
+        assert client.get("/api/admin/slow-queries").status_code == 403
@@ -0,0 +1,127 @@
+"""
+Tests for request tracing.
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+from src import tracing
+from src.api.main import app
+from src.api.middleware import TracingMiddleware
+
+sdk = pytest.importorskip("opentelemetry.sdk.trace")
+from opentelemetry.sdk.trace.export import SimpleSpanProcessor  # noqa: E402
+from opentelemetry.sdk.trace.export.in_memory_span_exporter import InMemorySpanExporter  # noqa: E402
+
+
+@pytest.fixture
+def spans():
+    """Record spans in memory for one test."""
+    exporter = InMemorySpanExporter()
+    provider = sdk.TracerProvider()
+    provider.add_span_processor(SimpleSpanProcessor(exporter))
+    tracing.install_tracer_provider(provider)
+    yield exporter
+    tracing.disable_tracing()
+
+
+@pytest.fixture
+def traced_client(client):
+    """Client whose requests pass through the tracing middleware."""
+    return TestClient(TracingMiddleware(app))
+
+
+def _by_name(finished):
+    return {span.name: span for span in finished}
+
+
+class TestTracingHelpers:
+    """Unit tests for the tracing helpers."""
+
+    def test_disabled_helpers_are_no_ops(self):
+        @tracing.traced()
+        def double(value):
+            return value * 2
+
+        assert not tracing.tracing_enabled()
+        assert double(2) == 4
+        with tracing.span("block") as current:
+            assert current is None
+        tracing.set_attributes({"app.ignored": 1})
+
+    def test_traced_records_arguments_and_result_size(self, spans):
+        class Repository:
+            def find(self, dish_id, names):
+                return names[:1]
+
+        tracing.trace_methods(Repository)
+        assert Repository().find(7, ["a", "b"]) == ["a"]
+
+        span = spans.get_finished_spans()[0]
+        assert span.name == "Repository.find"
+        assert span.attributes["app.dish_id"] == 7
+        assert span.attributes["app.names.count"] == 2
+        assert span.attributes["app.result.count"] == 1
+
+    def test_file_exporter_closes_its_file(self, tmp_path, monkeypatch):
+        """Reconfiguring or disabling tracing flushes and closes the span file."""
+        exporters = []
+
+        class RecordingFileExporter(tracing.FileSpanExporter):
+            def __init__(self, path):
+                super().__init__(path)
+                exporters.append(self)
+
+        monkeypatch.setattr(tracing, "FileSpanExporter", RecordingFileExporter)
+        first, second = tmp_path / "first.jsonl", tmp_path / "second.jsonl"
+
+        assert tracing.configure_tracing("file", file_path=str(first))
+        with tracing.span("before"):
+            pass
+        tracing.configure_tracing("file", file_path=str(second))
+        assert exporters[0].out.closed
+        assert '"name": "before"' in first.read_text()
+
+        tracing.disable_tracing()
+        assert exporters[1].out.closed
+        assert not tracing.tracing_enabled()
+
+
+class TestTracingMiddleware:
+    """Integration tests for request spans."""
+
+    def test_menu_spans_nest_down_to_sql(self, traced_client: TestClient, create_test_dish, spans):
+        dish_id = traced_client.get("/api/dishes").json()[0]["id"]
+        spans.clear()
+
+        response = traced_client.post("/api/menu", json={"dishes": [{"id": dish_id, "portions": 2}]})
+        assert response.status_code == 200
+
+        finished = spans.get_finished_spans()
+        named = _by_name(finished)
+        request = named["POST /api/menu"]
+        assert request.attributes["http.route"] == "/api/menu"
+        assert request.attributes["http.response.status_code"] == 200
+        assert request.attributes["app.menu.size"] == 1
+
+        build = named["menu.build"]
+        assert build.parent.span_id == request.context.span_id
+        assert build.attributes["app.selection.count"] == 1
+
+        lookup = named["DishRepository.get_by_id_with_ingredients"]
+        assert lookup.attributes["app.dish_id"] == dish_id
+        assert "NutritionService.calculate_menu_nutrition" in named
+
+        statements = [span for span in finished if span.name == "SQL SELECT"]
+        assert statements
+        assert all(span.context.trace_id == request.context.trace_id for span in statements)
+        assert any(span.parent.span_id == lookup.context.span_id for span in statements)
+
+    def test_joins_caller_trace(self, traced_client: TestClient, spans):
+        trace_id = "4bf92f3577b34da6a3ce929d0e0e4736"
+        traced_client.get(
+            "/api/dishes",
+            headers={"traceparent": f"00-{trace_id}-00f067aa0ba902b7-01"},
+        )
+        request = _by_name(spans.get_finished_spans())["GET /api/dishes"]
+        assert format(request.context.trace_id, "032x") == trace_id